@@ -5,7 +5,7 @@ a = Analysis(
     ['app.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('innovative_unifi/core/model_capabilities.json', 'innovative_unifi/core')],
     hiddenimports=[
         'PyQt5.QtCore',
         'PyQt5.QtWidgets', 
@@ -18,8 +18,32 @@ a = Analysis(
         'innovative_unifi.core.discovery',
         'innovative_unifi.core.settings_store',
         'innovative_unifi.core.logger_bus',
+        'innovative_unifi.core.workers',
+        'innovative_unifi.core.fleet',
+        'innovative_unifi.core.journal',
+        'innovative_unifi.core.device_poller',
+        'innovative_unifi.core.migration',
+        'innovative_unifi.core.upgrades',
+        'innovative_unifi.core.naming',
+        'innovative_unifi.core.tasks',
+        'innovative_unifi.core.refresh',
+        'innovative_unifi.core.capabilities',
+        'innovative_unifi.core.projection',
+        'innovative_unifi.core.device_record',
+        'innovative_unifi.core.jsonstream',
+        'innovative_unifi.core.device_detail',
+        'innovative_unifi.core.diffing',
+        'innovative_unifi.core.wlan_deploy',
+        'innovative_unifi.core.wlan_sync',
+        'innovative_unifi.core.psk_rotation',
+        'innovative_unifi.core.wlan_inventory',
+        'innovative_unifi.core.backup',
+        'innovative_unifi.core.cache',
         'innovative_unifi.ui.main_window',
         'innovative_unifi.ui.devices_view',
+        'innovative_unifi.ui.device_model',
+        'innovative_unifi.ui.log_view',
+        'innovative_unifi.ui.device_detail',
         'innovative_unifi.ui.wifi_view',
         'innovative_unifi.ui.wizard_page',
         'innovative_unifi.ui.settings_dialog'
@@ -0,0 +1,282 @@
+import hashlib, io, json, os, tarfile, time
+from typing import Callable, Dict, List, Optional, Tuple
+from .wlan_deploy import site_body
+from .diffing import diff_fields
+from .wlan_sync import CREATE, UPDATE, OK, IGNORED_FIELDS, diff_wlan
+from .workers import run_bounded, shared_limit
+
+FORMAT = 1
+# One JSON member per section per site, in this order
+SECTIONS = ("wlans", "networks", "wlan_groups", "ap_groups", "settings", "aliases")
+# Sections a restore replays; group IDs are controller-generated, so groups are kept for
+# reference only and created WLANs are linked to the site's current groups instead
+RESTORED = ("networks", "settings", "aliases", "wlans")
+MISSING = "missing"  # backed-up device no longer on the site; its alias cannot be replayed
+
+_NETWORK_IGNORED = frozenset(("_id", "site_id", "attr_hidden_id", "attr_no_delete", "attr_hidden"))
+_SETTING_IGNORED = frozenset(("_id", "site_id", "key"))
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _add_member(tar: tarfile.TarFile, name: str, data: bytes):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(data))
+
+def read_archive(path: str, site_keys: Optional[List[str]] = None) -> Tuple[Dict, Dict[str, Dict[str, list]]]:
+    """(manifest, {site: {section: data}}) from a backup archive, every member checked against
+    its manifest hash. Sites that failed at backup time are left out. Raises ValueError."""
+    with tarfile.open(path, "r:gz") as tar:
+        try:
+            manifest = json.load(tar.extractfile("manifest.json"))
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"{path} is not a site backup (no manifest): {e}")
+        if manifest.get("format") != FORMAT:
+            raise ValueError(f"unsupported backup format {manifest.get('format')!r}")
+        wanted = manifest["sites"] if site_keys is None else {s: manifest["sites"][s] for s in site_keys if s in manifest["sites"]}
+        data: Dict[str, Dict[str, list]] = {}
+        for site, entry in wanted.items():
+            if entry.get("error"):
+                continue
+            sections = {}
+            for name, f in entry.get("files", {}).items():
+                raw = tar.extractfile(f["path"]).read()
+                if _sha256(raw) != f["sha256"]:
+                    raise ValueError(f"{f['path']} does not match its manifest hash; the archive is damaged")
+                sections[name] = json.loads(raw.decode("utf-8"))
+            data[site] = sections
+    return manifest, data
+
+def _network_id_map(saved: List[Dict], current: List[Dict]) -> Dict[str, str]:
+    """Backed-up network _id -> current _id, matched by network name."""
+    current_ids = {n.get("name"): n.get("_id") for n in current}
+    return {n["_id"]: current_ids[n.get("name")] for n in saved
+            if n.get("_id") and current_ids.get(n.get("name"))}
+
+def _remap_networks(wlan: Dict, id_map: Dict[str, str]) -> Dict:
+    if wlan.get("networkconf_id") in id_map:
+        wlan = dict(wlan, networkconf_id=id_map[wlan["networkconf_id"]])
+    return wlan
+
+def plan_restore(site: str, current: Dict[str, list], saved: Dict[str, list]) -> List[Dict]:
+    """Actions that bring one site back to its backed-up state. Only differences are replayed:
+    missing WLANs/networks are created and changed fields updated; nothing is deleted."""
+    plan: List[Dict] = []
+
+    def add(section, item, op, **extra):
+        plan.append(dict({"site": site, "section": section, "item": item, "op": op, "changes": {}}, **extra))
+
+    cur_nets = {n.get("name"): n for n in current.get("networks", [])}
+    for n in saved.get("networks", []):
+        cur = cur_nets.get(n.get("name"))
+        if cur is None:
+            body = {k: v for k, v in n.items() if k not in _NETWORK_IGNORED}
+            add("networks", n.get("name", ""), CREATE, body=body, saved_id=n.get("_id"),
+                changes={k: (None, v) for k, v in body.items()})
+            continue
+        changes = diff_fields(cur, n, _NETWORK_IGNORED)
+        add("networks", n.get("name", ""), UPDATE if changes else OK, current=cur, changes=changes)
+
+    cur_settings = {s.get("key"): s for s in current.get("settings", [])}
+    for s in saved.get("settings", []):
+        cur = cur_settings.get(s.get("key"))
+        if cur is None:
+            continue  # setting sections cannot be created, only changed
+        changes = diff_fields(cur, s, _SETTING_IGNORED)
+        add("settings", s.get("key", ""), UPDATE if changes else OK, current=cur, changes=changes)
+
+    cur_devices = {(a.get("mac") or "").lower(): a for a in current.get("aliases", [])}
+    for a in saved.get("aliases", []):
+        if not a.get("name"):
+            continue  # unnamed at backup time; nothing to replay
+        cur = cur_devices.get((a.get("mac") or "").lower())
+        if cur is None:
+            add("aliases", a.get("mac", ""), MISSING)
+            continue
+        changes = {} if cur.get("name") == a.get("name") else {"name": (cur.get("name"), a.get("name"))}
+        add("aliases", a.get("mac", ""), UPDATE if changes else OK, current=cur, changes=changes)
+
+    id_map = _network_id_map(saved.get("networks", []), current.get("networks", []))
+    recreated = set(a["saved_id"] for a in plan if a["section"] == "networks" and a["op"] == CREATE)
+    cur_wlans = {w.get("name"): w for w in current.get("wlans", [])}
+    for w in saved.get("wlans", []):
+        w = _remap_networks(w, id_map)
+        cur = cur_wlans.get(w.get("name"))
+        if cur is None:
+            body = {k: v for k, v in w.items() if k not in IGNORED_FIELDS}
+            add("wlans", w.get("name", ""), CREATE, body=body, changes={k: (None, v) for k, v in body.items()})
+            continue
+        changes = diff_wlan(cur, w)
+        if w.get("networkconf_id") in recreated:
+            # Points at a network this restore recreates; relinked to its new _id on apply
+            changes["networkconf_id"] = (cur.get("networkconf_id"), w["networkconf_id"])
+        add("wlans", w.get("name", ""), UPDATE if changes else OK, current=cur, changes=changes)
+    return plan
+
+class SiteBackup:
+    """Backs up sites into one .tar.gz and restores them by replaying only what differs.
+
+    Every site is exported concurrently (WLANs, networks, WLAN/AP groups, site settings and
+    device aliases); each site's sections are written into the archive as soon as that site
+    completes, and a manifest with the controller version and a sha256 per member goes last.
+    """
+    def __init__(self, ctrl, max_workers: int = 16, max_writes: int = 8):
+        self.ctrl = ctrl
+        self.log = ctrl.log
+        self.max_workers = max_workers
+        self.wlan_slots = shared_limit(f"wlan-writes:{ctrl.base}", max_writes)
+        self.write_slots = shared_limit(f"config-writes:{ctrl.base}", max_writes)
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def export_site(self, site: str) -> Dict[str, list]:
+        if self._stop:
+            raise RuntimeError("stopped")
+        groups = self.ctrl.get_group_lists(site)
+        return {
+            "wlans": self.ctrl.get_wlans(site) or [],
+            "networks": self.ctrl.get_networks(site),
+            "wlan_groups": groups.get("wlangroups") or [],
+            "ap_groups": groups.get("v2_apgroups") or groups.get("apgroups") or [],
+            "settings": self.ctrl.get_site_settings(site),
+            "aliases": [{"mac": d.get("mac"), "_id": d.get("_id") or d.get("device_id"), "name": d.get("name") or ""}
+                        for d in self.ctrl.get_device_records(site)],
+        }
+
+    def backup(self, path: str, site_keys: Optional[List[str]] = None,
+               on_progress: Optional[Callable[[str, Dict], None]] = None) -> Dict:
+        """Write site_keys (default: every site) to path. Returns the manifest; sites whose
+        export failed are listed there with an 'error' and no files."""
+        self._stop = False
+        t0 = time.monotonic()
+        descs = {(s.get("name") or s.get("key")): (s.get("desc") or "") for s in self.ctrl.get_sites() or []}
+        if site_keys is None:
+            site_keys = [s for s in descs if s]
+        manifest = {"format": FORMAT, "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "controller": self.ctrl.base, "controller_version": self.ctrl.get_system_version(),
+                    "sections": list(SECTIONS), "sites": {}}
+        tmp = path + ".tmp"
+        with tarfile.open(tmp, "w:gz", compresslevel=6) as tar:
+            for site, sections, exc in run_bounded(self.export_site, site_keys, self.max_workers):
+                entry = {"desc": descs.get(site, ""), "files": {}}
+                if exc is not None:
+                    entry["error"] = str(exc)
+                    self.log(f"Backup: {site} failed: {exc}")
+                else:
+                    for name in SECTIONS:
+                        raw = json.dumps(sections[name], indent=1, sort_keys=True).encode("utf-8")
+                        member = f"sites/{site}/{name}.json"
+                        _add_member(tar, member, raw)
+                        entry["files"][name] = {"path": member, "sha256": _sha256(raw), "count": len(sections[name])}
+                manifest["sites"][site] = entry
+                if on_progress:
+                    on_progress(site, entry)
+            _add_member(tar, "manifest.json", json.dumps(manifest, indent=1).encode("utf-8"))
+        os.replace(tmp, path)
+        ok = sum(1 for e in manifest["sites"].values() if not e.get("error"))
+        self.log(f"Backup: {ok}/{len(site_keys)} site(s) written to {path} in {time.monotonic() - t0:.1f}s")
+        return manifest
+
+    def plan(self, path: str, site_keys: Optional[List[str]] = None) -> List[Dict]:
+        """Diff every backed-up site (or site_keys) against the controller, all sites concurrently.
+        Sites that could not be read get one {'op': 'error'} entry."""
+        manifest, saved = read_archive(path, site_keys)
+        if manifest.get("controller_version") != self.ctrl.get_system_version():
+            self.log(f"Restore: backup is from controller {manifest.get('controller_version')}, "
+                     f"this controller runs {self.ctrl.get_system_version()}")
+        t0 = time.monotonic()
+        plan: List[Dict] = []
+        for site, current, exc in run_bounded(self.export_site, list(saved), self.max_workers):
+            if exc is not None:
+                plan.append({"site": site, "section": "", "item": "", "op": "error", "error": str(exc), "changes": {}})
+                continue
+            plan.extend(plan_restore(site, current, saved[site]))
+        writes = sum(1 for a in plan if a["op"] in (CREATE, UPDATE))
+        self.log(f"Restore: compared {len(saved)} site(s) in {time.monotonic() - t0:.1f}s, {writes} change(s)")
+        return plan
+
+    def _apply_one(self, action: Dict, id_maps: Dict[str, Dict[str, str]]) -> bool:
+        if self._stop:
+            return False
+        site, section, op = action["site"], action["section"], action["op"]
+        new = {k: v[1] for k, v in action["changes"].items()}
+        if section == "wlans":
+            if op == UPDATE:
+                with self.wlan_slots:
+                    return self.ctrl.update_wlan(site, action["current"], _remap_networks(new, id_maps.get(site, {})))
+            body = site_body(_remap_networks(action["body"], id_maps.get(site, {})), self.ctrl.get_group_ids(site))
+            with self.wlan_slots:
+                return self.ctrl.post_wlanconf(site, body) is not None
+        with self.write_slots:
+            if section == "networks" and op == CREATE:
+                created = self.ctrl.create_network(site, action["body"])
+                if created and action.get("saved_id"):
+                    id_maps.setdefault(site, {})[action["saved_id"]] = created.get("_id")
+                return created is not None
+            if section == "networks":
+                return self.ctrl.update_network(site, action["current"]["_id"], new)
+            if section == "settings":
+                return self.ctrl.update_site_setting(site, action["current"], new)
+            return self.ctrl.set_device_name(site, action["current"]["_id"], new["name"])
+
+    def apply(self, plan: List[Dict], on_progress: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Run the writes in plan; each write action gets 'ok' and 'error' set. Networks, settings
+        and aliases go first so WLANs created afterwards can point at recreated networks."""
+        self._stop = False
+        t0 = time.monotonic()
+        id_maps: Dict[str, Dict[str, str]] = {}
+        todo = [a for a in plan if a["op"] in (CREATE, UPDATE)]
+        for phase in ([a for a in todo if a["section"] != "wlans"], [a for a in todo if a["section"] == "wlans"]):
+            for action, ok, exc in run_bounded(lambda a: self._apply_one(a, id_maps), phase, self.max_workers):
+                action["ok"] = bool(ok) and exc is None
+                action["error"] = "" if action["ok"] else (str(exc) if exc else ("stopped" if self._stop else "controller rejected change"))
+                self.log(f"Restore: {action['site']} {action['op']} {action['section']} {action['item']} "
+                         f"{'OK' if action['ok'] else 'FAILED: ' + action['error']}")
+                if on_progress:
+                    on_progress(action)
+        ok = sum(1 for a in todo if a.get("ok"))
+        self.log(f"Restore: applied {ok}/{len(todo)} change(s) in {time.monotonic() - t0:.1f}s")
+        return plan
+
+    def run(self, path: str, site_keys: Optional[List[str]] = None, dry_run: bool = True,
+            on_progress: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        plan = self.plan(path, site_keys)
+        return plan if dry_run else self.apply(plan, on_progress)
+
+def format_manifest(manifest: Dict) -> str:
+    lines = [f"Controller: {manifest.get('controller', '')} ({manifest.get('controller_version', '')})",
+             f"Created: {manifest.get('created', '')}", "",
+             "SITE                 " + " ".join(f"{s[:11]:>11}" for s in SECTIONS)]
+    for site, e in sorted(manifest.get("sites", {}).items()):
+        if e.get("error"):
+            lines.append(f"{site:<20} FAILED: {e['error']}")
+        else:
+            lines.append(f"{site:<20} " + " ".join(f"{e['files'][s]['count']:>11}" for s in SECTIONS))
+    return "\n".join(lines)
+
+def format_plan(plan: List[Dict], show_ok: bool = False) -> str:
+    lines = []
+    for a in sorted(plan, key=lambda x: (x["site"], RESTORED.index(x["section"]) if x["section"] in RESTORED else -1, x["item"])):
+        if a["op"] == OK and not show_ok:
+            continue
+        if a["op"] == "error":
+            lines.append(f"{a['site']}: could not read site: {a['error']}")
+            continue
+        status = "" if "ok" not in a else ("  [OK]" if a["ok"] else f"  [FAILED: {a['error']}]")
+        lines.append(f"{a['site']}: {a['op']} {a['section']} {a['item']}{status}")
+        for k, (old, new) in sorted(a["changes"].items()):
+            if k.startswith("x_"):
+                lines.append(f"    {k}: (changed)")
+            elif old == new:
+                lines.append(f"    {k}: relinked to the recreated network")
+            else:
+                lines.append(f"    {k}: {old!r} -> {new!r}")
+    counts = {}
+    for a in plan:
+        counts[a["op"]] = counts.get(a["op"], 0) + 1
+    summary = ", ".join(f"{n} {op}" for op, n in sorted(counts.items()))
+    return "\n".join(lines + ["", f"Total: {summary or 'nothing to do'}"])
@@ -0,0 +1,134 @@
+import threading, time, weakref
+from typing import Any, Callable, Dict, Iterable, Optional
+
+class SWRCache:
+    """Stale-while-revalidate cache for controller reads.
+
+    get() returns a fresh value straight away. Once a value is older than ttl it is still
+    returned immediately, and a single background refresh replaces it. Only a miss (or
+    force) makes the caller wait for the loader. Empty answers (None, [], {}) are not cached,
+    so the next call retries.
+
+    Entries carry tags ("sites", "devices:<site>", "wlans:<site>"). invalidate(tag=...) drops
+    every entry with that tag and tells listeners, so other caches can follow writes too.
+    """
+    def __init__(self, ttl: float = 300.0, log: Optional[Callable[[str], None]] = None):
+        self.ttl = ttl
+        self.log = log or (lambda s: None)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, tuple] = {}  # key -> (stored_at, value, tags)
+        # Bumped by invalidate(); a load (first fetch or refresh) only stores its value if none of
+        # the generations it started under moved, so data read before an invalidation is dropped
+        self._gen: Dict[str, int] = {}
+        self._tag_gen: Dict[str, int] = {}
+        self._all_gen = 0
+        self._refreshing: set = set()
+        self._listeners: list = []
+        self._metrics = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0,
+                         "refresh_errors": 0, "invalidations": 0}
+
+    def get(self, key: str, loader: Callable[[], Any], tags: Iterable[str] = (), force: bool = False):
+        tags = tuple(tags)
+        with self._lock:
+            hit = None if force else self._entries.get(key)
+            if hit is not None:
+                if time.monotonic() - hit[0] < self.ttl:
+                    self._metrics["hits"] += 1
+                    return hit[1]
+                self._metrics["stale_hits"] += 1
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    threading.Thread(target=self._refresh, args=(key, loader, tags, self._stamp(key, tags)),
+                                     name=f"swr:{key}", daemon=True).start()
+                return hit[1]
+            self._metrics["misses"] += 1
+            stamp = self._stamp(key, tags)
+        value = loader()
+        self._store(key, value, tags, stamp)
+        return value
+
+    def _stamp(self, key: str, tags: tuple) -> tuple:
+        """Generations a load starts under (lock held)."""
+        return self._all_gen, self._gen.get(key, 0), tuple(self._tag_gen.get(t, 0) for t in tags)
+
+    def _store(self, key: str, value, tags: tuple, stamp: tuple):
+        if not value:
+            return
+        with self._lock:
+            if self._stamp(key, tags) == stamp:
+                self._entries[key] = (time.monotonic(), value, tags)
+
+    def _refresh(self, key: str, loader: Callable[[], Any], tags: tuple, stamp: tuple):
+        try:
+            value = loader()
+            with self._lock:
+                self._metrics["refreshes"] += 1
+            self._store(key, value, tags, stamp)
+        except Exception as e:
+            with self._lock:
+                self._metrics["refresh_errors"] += 1
+            self.log(f"Background refresh of {key} failed (keeping cached value): {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def peek(self, key: str):
+        """Cached value regardless of age, or None (never loads)."""
+        with self._lock:
+            hit = self._entries.get(key)
+            return hit[1] if hit else None
+
+    def invalidate(self, key: Optional[str] = None, tag: Optional[str] = None):
+        """Drop one key, every entry tagged tag, or (neither given) everything. Never raises."""
+        with self._lock:
+            if key is not None:
+                self._entries.pop(key, None)
+                self._gen[key] = self._gen.get(key, 0) + 1
+            elif tag is not None:
+                for k in [k for k, e in self._entries.items() if tag in e[2]]:
+                    del self._entries[k]
+                self._tag_gen[tag] = self._tag_gen.get(tag, 0) + 1
+            else:
+                self._entries.clear()
+                self._all_gen += 1
+            self._metrics["invalidations"] += 1
+            listeners = list(self._listeners)
+        if tag is not None:
+            for ref in listeners:
+                fn = ref()
+                if fn is None:
+                    continue
+                # Callers invalidate right after a successful write; a failing listener must not
+                # turn that into an exception (the write would look failed and be retried)
+                try:
+                    fn(tag)
+                except Exception as e:
+                    self.log(f"Cache listener failed for {tag}: {e}")
+
+    def add_listener(self, fn: Callable[[str], None]):
+        """Call fn(tag) after every tag invalidation. Held weakly, so a view's cache going away
+        does not keep it alive."""
+        ref = weakref.WeakMethod(fn) if hasattr(fn, "__self__") else weakref.ref(fn)
+        with self._lock:
+            self._listeners = [r for r in self._listeners if r() is not None] + [ref]
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            m = dict(self._metrics, entries=len(self._entries))
+        served = m["hits"] + m["stale_hits"] + m["misses"]
+        m["hit_rate"] = round((m["hits"] + m["stale_hits"]) / served, 3) if served else 0.0
+        return m
+
+_registry: Dict[tuple, SWRCache] = {}
+_registry_lock = threading.Lock()
+
+def cache_for(base: str, user: str = "", ttl: float = 300.0, log: Optional[Callable[[str], None]] = None) -> SWRCache:
+    """The process-wide cache for one controller login, so rebuilding ControllerClient
+    (e.g. after the settings dialog) keeps what was already fetched."""
+    with _registry_lock:
+        cache = _registry.get((base, user))
+        if cache is None:
+            cache = _registry[(base, user)] = SWRCache(ttl, log)
+        elif log is not None:
+            cache.log = log
+        return cache
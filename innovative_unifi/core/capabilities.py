@@ -0,0 +1,71 @@
+import json, os
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_capabilities.json")
+
+_by_model: Dict[str, Dict] = {}
+_prefix_lengths: List[int] = []
+
+def _load():
+    """Index model_capabilities.json by lower-cased model name (done once, on first lookup)."""
+    global _prefix_lengths
+    if _by_model:
+        return
+    try:
+        with open(TABLE_PATH, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except Exception:
+        entries = []
+    for e in entries:
+        key = (e.get("model") or "").strip().lower()
+        if key:
+            _by_model[key] = e
+    _prefix_lengths = sorted(set(len(k) for k in _by_model), reverse=True)
+
+@lru_cache(maxsize=None)
+def lookup(model: str) -> Optional[Dict]:
+    """Capability entry for a model: an exact match, else the longest table key the model starts
+    with ('u6-enterprise-in-wall' wins over 'u6-enterprise'). Entries are shared; don't modify them.
+    """
+    _load()
+    m = (model or "").strip().lower()
+    if not m:
+        return None
+    if m in _by_model:
+        return _by_model[m]
+    for n in _prefix_lengths:
+        if n < len(m):
+            e = _by_model.get(m[:n])
+            if e is not None:
+                return e
+    return None
+
+def model_uplink_mbps(model: str) -> Optional[int]:
+    e = lookup(model)
+    return e.get("uplink_mbps") if e else None
+
+def max_uplink_mbps(dev: Dict) -> Optional[int]:
+    """Maximum uplink capability for a controller device: the uplink port's speed_caps when the
+    controller reports them (otherwise the best port), else the model table.
+    """
+    uplink_port = None
+    upl = dev.get("uplink") or {}
+    if isinstance(upl, dict):
+        uplink_port = upl.get("port_idx")
+
+    best = 0
+    for key in ("ethernet_table", "port_table"):
+        for p in dev.get(key, []) or []:
+            caps = p.get("speed_caps") or []
+            if isinstance(caps, list):
+                best = max(best, max(caps) if caps else 0)
+                if uplink_port is not None and p.get("port_idx") == uplink_port and caps:
+                    return max(caps)
+            elif isinstance(caps, int):
+                best = max(best, caps)
+                if uplink_port is not None and p.get("port_idx") == uplink_port:
+                    return caps
+    if best > 0:
+        return best
+    return model_uplink_mbps(dev.get("model") or "")
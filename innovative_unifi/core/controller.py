@@ -2,11 +2,58 @@ import requests
 from typing import List, Dict, Optional
 import paramiko
 import time
+import threading
+from .workers import run_bounded
+from .device_record import DeviceRecord
+from .jsonstream import iter_response_items
+from .cache import cache_for
+
+# cmd/devmgr payload variants accepted by different controller builds, with the URL variants
+# (proxy_first values) to try for each. ControllerClient learns which one works per command.
+DEVMGR_VARIANTS = {
+    "adopt": ([{"cmd": "adopt"}], (True, False)),
+    "upgrade": ([{"cmd": "upgrade"}], (True, False)),
+    # Direct endpoint first: the proxy path returns 404 for locate on some builds
+    "set-locate": ([
+        {"cmd": "set-locate", "duration": 60},
+        {"cmd": "set-locate", "enabled": True},
+    ], (False, True)),
+    "unset-locate": ([
+        {"cmd": "unset-locate"},
+        {"cmd": "set-locate", "duration": 0},
+        {"cmd": "set-locate", "enabled": False},
+        {"cmd": "set-locate", "enabled": False, "duration": 0},
+        {"cmd": "set-locate", "duration": -1},
+        {"cmd": "locate", "duration": 0},
+    ], (False, True)),
+}
+
+# WLAN create strategies as (body kind, wlanconf path under /api/s/<site>/, proxy_first), in
+# default order. ControllerClient ranks them by past success per controller version.
+WLAN_CREATE_STRATEGIES = [
+    ("api_browser", "rest/wlanconf", False),
+    ("api_browser", "rest/wlanconf", True),
+    ("wlangroup", "rest/wlanconf", False),
+    ("wlangroup", "rest/wlanconf", True),
+    ("wlangroup", "wlanconf", False),
+    ("wlangroup", "wlanconf", True),
+    ("wlangroup", "cmd/wlanconf", False),
+    ("wlangroup", "cmd/wlanconf", True),
+]
+
+# WLAN update variants as (kind, proxy_first), in default order: "upd" POSTs {_id, enabled} to
+# upd/wlanconf, "rest" PUTs the full object to rest/wlanconf/<id>, "add" POSTs it to add/wlanconf.
+# "add" is only a last resort for the enable/disable toggle and is never learned: POSTing a full
+# object there can create a second WLAN on builds that ignore _id.
+WLAN_UPDATE_VARIANTS = [("upd", True), ("upd", False), ("rest", True), ("rest", False), ("add", True), ("add", False)]
+
+# Server-managed or secret-derived wlanconf fields that are never sent back in an update
+WLAN_VOLATILE_FIELDS = ("attr_hidden_id", "x_password", "x_passphrase_hash", "not_supported", "attr_no_delete")
 
 class ControllerClient:
     def __init__(self, store, log_bus=None):
         self.store = store
-        self.log = (log_bus.log if log_bus else (lambda s: None))
+        self.log = ((lambda s: log_bus.log(s, source="controller")) if log_bus else (lambda s: None))
         self.base = (store.get_value("controller_url") or "https://127.0.0.1:8443").rstrip("/")
         self.inform_url = (store.get_value("inform_url") or self.base).rstrip("/")
         self.user = store.get_value("controller_user") or ""
@@ -19,12 +66,14 @@ class ControllerClient:
             "Accept": "application/json, text/plain, */*",
             "User-Agent": "InnovativeSolutions-UnifiGUI"
         })
-        # Cache for system info and site data
-        self._system_info_cache = None
-        self._system_info_cache_time = 0
-        self._sites_cache = None
-        self._sites_cache_time = 0
         self._cache_duration = 300  # 5 minutes
+        # System info and sites; shared by every client for this controller login, so it
+        # survives the client being rebuilt after a settings change
+        self.cache = cache_for(self.base, self.user, self._cache_duration, log=self.log)
+        self._group_cache: Dict[str, tuple] = {}  # site -> (fetched_at, group ids)
+        self._group_lock = threading.Lock()
+        self._wlan_endpoint_cache: Dict[str, str] = {}
+        self._learn_lock = threading.Lock()
 
     # ----- helpers -----
     def _host_root(self) -> str:
@@ -117,15 +166,11 @@ class ControllerClient:
 
     # ----- system info -----
     def get_system_info(self, force_refresh: bool = False) -> Optional[Dict]:
-        """Get comprehensive system information from v2 API info endpoint"""
-        current_time = time.time()
-        
-        # Return cached data if still valid and not forcing refresh
-        if (not force_refresh and 
-            self._system_info_cache and 
-            (current_time - self._system_info_cache_time) < self._cache_duration):
-            return self._system_info_cache
-        
+        """Get comprehensive system information from v2 API info endpoint (cached; an expired
+        entry is returned at once and refreshed in the background)"""
+        return self.cache.get("system_info", self._fetch_system_info, tags=("sites",), force=force_refresh)
+
+    def _fetch_system_info(self) -> Optional[Dict]:
         try:
             self.log("Fetching system information from v2 API...")
             r = self.sess.get(self._u("/v2/api/info", proxy_first=False), timeout=15)
@@ -133,10 +178,6 @@ class ControllerClient:
             if r.ok:
                 system_info = self._j(r)
                 if system_info:
-                    # Cache the result
-                    self._system_info_cache = system_info
-                    self._system_info_cache_time = current_time
-                    
                     # Log key information
                     system_data = system_info.get("system", {})
                     version = system_data.get("version", "Unknown")
@@ -238,18 +279,15 @@ class ControllerClient:
 
     # ----- enhanced sites -----
     def get_sites(self, force_refresh: bool = False) -> List[Dict]:
-        """Get sites list with enhanced information from v2 API when available"""
-        current_time = time.time()
-        
-        # Return cached data if still valid and not forcing refresh
-        if (not force_refresh and 
-            self._sites_cache and 
-            (current_time - self._sites_cache_time) < self._cache_duration):
-            return self._sites_cache
-        
+        """Get sites list with enhanced information from v2 API when available (cached like
+        get_system_info; invalidate_sites() after creating or removing sites)"""
+        return self.cache.get("sites", self._fetch_sites, tags=("sites",), force=force_refresh) or []
+
+    def _fetch_sites(self) -> List[Dict]:
         # Try to get sites from v2 API info first (most comprehensive)
         try:
-            system_info = self.get_system_info(force_refresh)
+            # Always refetched with the list so a background refresh never reuses stale info
+            system_info = self.get_system_info(force_refresh=True)
             if system_info and "sites" in system_info:
                 sites = system_info["sites"]
                 if sites:
@@ -258,10 +296,6 @@ class ControllerClient:
                         if 'name' in site and 'key' not in site:
                             site['key'] = site['name']
                     
-                    # Cache the result
-                    self._sites_cache = sites
-                    self._sites_cache_time = current_time
-                    
                     self.log(f"Retrieved {len(sites)} sites from v2 API info")
                     return sites
         except Exception as e:
@@ -292,10 +326,6 @@ class ControllerClient:
                         if 'name' in site and 'key' not in site:
                             site['key'] = site['name']
                     
-                    # Cache the result
-                    self._sites_cache = sites
-                    self._sites_cache_time = current_time
-                    
                     self.log(f"Retrieved {len(sites)} sites from traditional API")
                     return sites
             except Exception:
@@ -304,6 +334,10 @@ class ControllerClient:
         self.log("Failed to retrieve sites from any API endpoint")
         return []
     
+    def invalidate_sites(self):
+        """Drop the cached site list (and the system info it is read from) after site changes."""
+        self.cache.invalidate(tag="sites")
+
     def get_active_sites(self) -> List[Dict]:
         """Get only active sites (sites with is_active=True or device_count > 0)"""
         all_sites = self.get_sites()
@@ -321,16 +355,17 @@ class ControllerClient:
         return active_sites
     
     def validate_site_key(self, site_key: str) -> bool:
-        """Validate that a site key exists and is accessible"""
+        """Validate that a site key exists and is accessible. A key missing from the cached
+        site list is checked again against a fresh one (the site may have just been created)."""
         if not site_key:
             return False
-        
-        sites = self.get_sites()
-        for site in sites:
-            if site.get("name") == site_key or site.get("key") == site_key:
-                self.log(f"Site key '{site_key}' is valid")
-                return True
-        
+
+        for force in (False, True):
+            for site in self.get_sites(force_refresh=force) or []:
+                if site.get("name") == site_key or site.get("key") == site_key:
+                    self.log(f"Site key '{site_key}' is valid")
+                    return True
+
         self.log(f"Site key '{site_key}' not found in available sites")
         return False
     
@@ -348,14 +383,16 @@ class ControllerClient:
             try:
                 r = self.sess.post(self._u("/api/s/default/cmd/sitemgr", proxy_first=proxy), json=body, timeout=15)
                 if r.ok:
+                    self.invalidate_sites()
                     return True
             except Exception:
                 pass
         return False
 
     # ----- devices -----
-    def get_devices(self, site_key: str) -> List[Dict]:
-        results: List[Dict] = []
+    def _iter_device_entries(self, site_key: str):
+        """Raw device entries from every device endpoint, decoded one at a time as each
+        response streams in rather than after the whole body has been read and parsed."""
         paths = [
             (f"/api/s/{site_key}/stat/device", True),
             (f"/api/s/{site_key}/stat/device", False),
@@ -366,35 +403,69 @@ class ControllerClient:
         ]
         for path, proxy in paths:
             try:
-                r = self.sess.get(self._u(path, proxy_first=proxy), timeout=20)
-                if not r.ok:
-                    continue
-                obj = self._j(r)
-                lst = []
-                if isinstance(obj, dict):
-                    if isinstance(obj.get("data"), list): lst = obj.get("data")
-                    elif isinstance(obj.get("devices"), list): lst = obj.get("devices")
-                    elif isinstance(obj.get("items"), list): lst = obj.get("items")
-                    else:
-                        for v in obj.values():
-                            if isinstance(v, list): lst = v; break
-                elif isinstance(obj, list):
-                    lst = obj
-                if lst:
-                    results.extend(lst)
+                with self.sess.get(self._u(path, proxy_first=proxy), timeout=20, stream=True) as r:
+                    if not r.ok:
+                        continue
+                    for d in iter_response_items(r, ("data", "devices", "items")):
+                        if isinstance(d, dict):
+                            yield d
             except Exception:
                 continue
+
+    @staticmethod
+    def _device_key(d: Dict) -> str:
+        mac = (d.get("mac") or "").lower()
+        return mac or (d.get("_id") or d.get("device_id") or "")
+
+    def get_devices(self, site_key: str) -> List[Dict]:
         # De-dup by mac/id
         by_mac: Dict[str, Dict] = {}
-        for d in results:
-            mac = (d.get("mac") or "").lower()
-            key = mac or (d.get("_id") or d.get("device_id") or "")
-            if not key:
-                continue
-            if key not in by_mac:
+        for d in self._iter_device_entries(site_key):
+            key = self._device_key(d)
+            if key and key not in by_mac:
                 by_mac[key] = d
         return list(by_mac.values())
 
+    def get_device_records(self, site_key: str) -> List[DeviceRecord]:
+        """get_devices() as compact DeviceRecords, for callers that keep device lists around.
+        Each entry is reduced as soon as it is decoded, so the full list never exists as dicts."""
+        by_mac: Dict[str, DeviceRecord] = {}
+        for d in self._iter_device_entries(site_key):
+            key = self._device_key(d)
+            if key and key not in by_mac:
+                by_mac[key] = DeviceRecord(d)
+        return list(by_mac.values())
+
+    def get_device_basics(self, site_key: str) -> Optional[List[Dict]]:
+        """stat/device-basic only: mac, state, adopted, name, model and type per device, without
+        the port/radio tables and stats. None when the controller does not offer the endpoint."""
+        for proxy in (True, False):
+            try:
+                with self.sess.get(self._u(f"/api/s/{site_key}/stat/device-basic", proxy_first=proxy),
+                                   timeout=20, stream=True) as r:
+                    if not r.ok:
+                        continue
+                    return [d for d in iter_response_items(r, ("data", "devices", "items")) if isinstance(d, dict)]
+            except Exception:
+                continue
+        return None
+
+    def get_device_detail(self, site_key: str, mac: str) -> Optional[Dict]:
+        """Full stat/device entry for one device (port/radio tables, stats)."""
+        mac = (mac or "").lower()
+        for proxy in (True, False):
+            try:
+                r = self.sess.get(self._u(f"/api/s/{site_key}/stat/device/{mac}", proxy_first=proxy), timeout=15)
+                if not r.ok:
+                    continue
+                data = self._j(r).get("data") or []
+                for d in data:
+                    if (d.get("mac") or "").lower() == mac:
+                        return d
+            except Exception:
+                continue
+        return None
+
     def device_id_by_mac(self, site_key: str, mac: str) -> Optional[str]:
         for d in self.get_devices(site_key):
             if (d.get("mac") or "").lower() == mac.lower():
@@ -402,125 +473,82 @@ class ControllerClient:
         return None
 
     def adopt_device(self, site_key: str, mac: str) -> bool:
-        for proxy in (True, False):
-            try:
-                r = self.sess.post(self._u(f"/api/s/{site_key}/cmd/devmgr", proxy_first=proxy),
-                                   json={"cmd": "adopt", "mac": mac}, timeout=15)
-                if r.ok:
-                    return True
-            except Exception:
-                pass
-        return False
+        return self._devmgr(site_key, "adopt", mac)
 
     def set_alias(self, site_key: str, mac: str, alias: str) -> bool:
         dev_id = self.device_id_by_mac(site_key, mac)
         if not dev_id:
             return False
-        body = {"name": alias}
+        return self.set_device_name(site_key, dev_id, alias)
+
+    def set_device_name(self, site_key: str, dev_id: str, name: str) -> bool:
+        """Rename a device by controller id (no device-list lookup)."""
+        body = {"name": name}
         for proxy in (True, False):
             try:
                 r = self.sess.put(self._u(f"/api/s/{site_key}/rest/device/{dev_id}", proxy_first=proxy),
                                   json=body, timeout=15)
                 if r.ok:
+                    self.cache.invalidate(tag=f"devices:{site_key}")
                     return True
             except Exception:
                 pass
         return False
 
     def set_locate(self, site_key: str, mac: str, enabled: bool) -> bool:
-        # For turning OFF, we need to try multiple methods as some devices don't respond to the first command
-        if not enabled:
-            success_count = 0
-            
-            # Method 1: Standard UniFi API format with duration=0
-            for proxy in (False, True):
-                try:
-                    r = self.sess.post(self._u(f"/api/s/{site_key}/cmd/devmgr", proxy_first=proxy),
-                                           json={"cmd": "set-locate", "mac": mac, "duration": 0},
-                                           timeout=15)
-                    if r.ok:
-                        success_count += 1
-                except Exception:
-                    pass
-            
-            # Method 2: Try with enabled=False
-            for proxy in (False, True):
-                try:
-                    r = self.sess.post(self._u(f"/api/s/{site_key}/cmd/devmgr", proxy_first=proxy),
-                                       json={"cmd": "set-locate", "mac": mac, "enabled": False},
-                                       timeout=15)
-                    if r.ok:
-                        success_count += 1
-                except Exception:
-                    pass
-            
-            # Method 3: Try with combined parameters
-            for proxy in (False, True):
-                try:
-                    r = self.sess.post(self._u(f"/api/s/{site_key}/cmd/devmgr", proxy_first=proxy),
-                                       json={"cmd": "set-locate", "mac": mac, "enabled": False, "duration": 0},
-                                       timeout=15)
-                    if r.ok:
-                        success_count += 1
-                except Exception:
-                    pass
-            
-            # Method 4: Try with negative duration
-            for proxy in (False, True):
-                try:
-                    r = self.sess.post(self._u(f"/api/s/{site_key}/cmd/devmgr", proxy_first=proxy),
-                                       json={"cmd": "set-locate", "mac": mac, "duration": -1},
-                                       timeout=15)
-                    if r.ok:
-                        success_count += 1
-                except Exception:
-                    pass
-            
-            # Method 5: Try with locate command
-            for proxy in (False, True):
-                try:
-                    r = self.sess.post(self._u(f"/api/s/{site_key}/cmd/devmgr", proxy_first=proxy),
-                                       json={"cmd": "locate", "mac": mac, "duration": 0},
-                                       timeout=15)
-                    if r.ok:
-                        success_count += 1
-                except Exception:
-                    pass
-            
-            return success_count > 0
-        
-        # For turning ON, use the standard method
-        else:
-            # Method 1: Standard UniFi API format with duration (works with direct endpoint)
-            for proxy in (False, True):  # Try direct endpoint first since proxy returns 404
-                try:
-                    r = self.sess.post(self._u(f"/api/s/{site_key}/cmd/devmgr", proxy_first=proxy),
-                                       json={"cmd": "set-locate", "mac": mac, "duration": 60},
-                                       timeout=15)
-                    if r.ok:
-                        return True
-                except Exception:
-                    pass
-            
-            # Fallback methods for Locate ON if the first method fails
-            for proxy in (False, True):
-                try:
-                    r = self.sess.post(self._u(f"/api/s/{site_key}/cmd/devmgr", proxy_first=proxy),
-                                       json={"cmd": "set-locate", "mac": mac, "enabled": True},
-                                       timeout=15)
-                    if r.ok:
-                        return True
-                except Exception:
-                    pass
-        
-        return False
+        return self._devmgr(site_key, "set-locate" if enabled else "unset-locate", mac)
+
+    def set_locate_many(self, site_key: str, macs: List[str], enabled: bool, max_workers: int = 8) -> Dict[str, bool]:
+        """Toggle locate on many devices concurrently. Returns {mac: ok}."""
+        out = {}
+        for mac, ok, exc in run_bounded(lambda m: self.set_locate(site_key, m, enabled), macs, max_workers):
+            out[mac] = bool(ok) and exc is None
+        return out
 
     def upgrade_device(self, site_key: str, mac: str) -> bool:
-        for proxy in (True, False):
+        return self._devmgr(site_key, "upgrade", mac, timeout=20)
+
+    # ----- cmd/devmgr with learned variants -----
+    def _devmgr_ok(self, r) -> bool:
+        if not r.ok:
+            return False
+        obj = self._j(r)
+        return not (isinstance(obj, dict) and (obj.get("meta") or {}).get("rc") == "error")
+
+    def _devmgr_candidates(self, command: str):
+        """(payload, proxy) pairs to try: the learned one first, then the rest in default order."""
+        variants, proxies = DEVMGR_VARIANTS[command]
+        combos = [(v, p) for v in variants for p in proxies]
+        learned = (self.store.get_value("devmgr_variants") or {}).get(self.base, {}).get(command)
+        if learned:
+            hit = (learned.get("payload"), learned.get("proxy"))
+            if hit in combos:
+                combos.remove(hit)
+                combos.insert(0, hit)
+        return combos
+
+    def _learn_devmgr(self, command: str, payload: Dict, proxy: bool):
+        with self._learn_lock:
+            learned = self.store.get_value("devmgr_variants") or {}
+            mine = learned.setdefault(self.base, {})
+            if mine.get(command) == {"payload": payload, "proxy": proxy}:
+                return
+            mine[command] = {"payload": payload, "proxy": proxy}
+            self.store.set_value("devmgr_variants", learned)
+        self.log(f"Learned cmd/devmgr variant for {command}: {payload} (proxy={proxy})")
+
+    def _devmgr(self, site_key: str, command: str, mac: str, timeout: float = 15) -> bool:
+        """Send one cmd/devmgr command, using the payload/URL variant this controller accepted last time.
+        Other variants are only tried when that one fails; the first that works is remembered.
+        """
+        for i, (payload, proxy) in enumerate(self._devmgr_candidates(command)):
             try:
                 r = self.sess.post(self._u(f"/api/s/{site_key}/cmd/devmgr", proxy_first=proxy),
-                                   json={"cmd": "upgrade", "mac": mac}, timeout=20)
-                if r.ok:
+                                   json=dict(payload, mac=mac), timeout=timeout)
+                if self._devmgr_ok(r):
+                    if i > 0:
+                        self._learn_devmgr(command, payload, proxy)
+                    self.cache.invalidate(tag=f"devices:{site_key}")
                     return True
             except Exception:
                 pass
@@ -547,60 +575,138 @@ class ControllerClient:
                 continue
         return []
 
+    # ----- WLAN / AP group IDs -----
+    def _fetch_group_lists(self, site_key: str) -> Dict[str, Optional[list]]:
+        """rest/wlangroup, v2 apgroups and list/apgroups for a site, fetched concurrently.
+        Each value is the group list from the first endpoint variant that answered, or None."""
+        def wlangroups():
+            for path, proxy in ((f"/api/s/{site_key}/rest/wlangroup", False), (f"/api/s/{site_key}/rest/wlangroup", True),
+                                (f"/api/s/{site_key}/wlangroup", True), (f"/api/s/{site_key}/wlangroup", False)):
+                try:
+                    r = self.sess.get(self._u(path, proxy_first=proxy), timeout=15)
+                    if r.ok:
+                        obj = self._j(r)
+                        groups = obj if isinstance(obj, list) else obj.get("data", [])
+                        if groups:
+                            return groups
+                except Exception as e:
+                    self.log(f"Error getting wlangroup from {path}: {e}")
+                    continue
+            return None
+
+        def v2_apgroups():
+            r = self.sess.get(self._u(f"/v2/api/site/{site_key}/apgroups", proxy_first=False), timeout=15)
+            if r.ok:
+                obj = self._j(r)
+                return obj if isinstance(obj, list) else None
+            self.log(f"v2 API AP groups failed: {r.status_code}")
+            return None
+
+        def list_apgroups():
+            # POST with an empty JSON body; legacy URL first, then UniFi OS
+            for proxy in (False, True):
+                try:
+                    r = self.sess.post(self._u(f"/api/s/{site_key}/list/apgroups", proxy_first=proxy), json={}, timeout=15)
+                    if r.status_code == 200:
+                        obj = self._j(r)
+                        groups = obj.get("data", []) if isinstance(obj, dict) else obj
+                        if groups:
+                            return groups
+                except Exception as e:
+                    self.log(f"Error getting apgroups for site {site_key}: {e}")
+                    continue
+            return None
+
+        out: Dict[str, Optional[list]] = {}
+        loaders = {"wlangroups": wlangroups, "v2_apgroups": v2_apgroups, "apgroups": list_apgroups}
+        for name, groups, exc in run_bounded(lambda n: loaders[n](), list(loaders), 3):
+            if exc is not None:
+                self.log(f"Error getting {name} for site {site_key}: {exc}")
+            out[name] = groups
+        return out
+
+    @staticmethod
+    def _pick_group(groups: Optional[list], prefer) -> Optional[str]:
+        """_id of the first group prefer() accepts, else of the first group."""
+        if not groups:
+            return None
+        for g in groups:
+            if prefer(g):
+                return g.get("_id")
+        return groups[0].get("_id")
+
+    def get_group_ids(self, site_key: str, force_refresh: bool = False) -> Dict[str, Optional[str]]:
+        """Group IDs WLAN creation needs for a site, resolved by one combined fetch and cached.
+
+        Keys: wlangroup_id (first WLAN group), default_wlangroup_id (the default/undeletable WLAN
+        group), ap_group_id_v2 (v2 default/"All" AP group) and all_ap_group_id (list/apgroups
+        "All" group). Entries live for _cache_duration or until invalidate_group_ids() is
+        called after a change to the site's groups.
+        """
+        current_time = time.time()
+        with self._group_lock:
+            hit = self._group_cache.get(site_key)
+        if not force_refresh and hit and (current_time - hit[0]) < self._cache_duration:
+            return hit[1]
+
+        lists = self._fetch_group_lists(site_key)
+        wlangroups = lists.get("wlangroups")
+        ids = {
+            "wlangroup_id": wlangroups[0].get("_id") if wlangroups else None,
+            "default_wlangroup_id": self._pick_group(
+                wlangroups, lambda g: g.get("attr_hidden_id") == "default" or g.get("attr_no_delete") is True),
+            "ap_group_id_v2": self._pick_group(
+                lists.get("v2_apgroups"), lambda g: g.get("attr_hidden_id") == "default" or "all" in (g.get("name") or "").lower()),
+            "all_ap_group_id": self._pick_group(
+                lists.get("apgroups"), lambda g: g.get("attr_hidden_id") == "all" or (g.get("name") or "").lower() == "all"),
+        }
+        self.log(f"Group IDs for site {site_key}: {ids}")
+        if any(v is not None for v in lists.values()):
+            # Nothing answered at all: leave uncached so the next call tries again
+            with self._group_lock:
+                self._group_cache[site_key] = (current_time, ids)
+        return ids
+
+    def invalidate_group_ids(self, site_key: Optional[str] = None):
+        """Forget cached group IDs for one site (or all sites) after a group write."""
+        with self._group_lock:
+            if site_key is None:
+                self._group_cache.clear()
+            else:
+                self._group_cache.pop(site_key, None)
+
+    def _remember_group_id(self, site_key: str, name: str, group_id: Optional[str]):
+        with self._group_lock:
+            hit = self._group_cache.get(site_key)
+            if hit and group_id:
+                hit[1][name] = group_id
+
     def get_all_aps_group_id(self, site_key: str):
-        """Get the 'All APs' group ID using multiple endpoint approaches"""
-        # Try multiple endpoints for different controller types
-        endpoints = [
-            (f"/api/s/{site_key}/rest/wlangroup", True),   # UniFi OS
-            (f"/api/s/{site_key}/rest/wlangroup", False),  # Legacy
-            (f"/api/s/{site_key}/wlangroup", True),        # Alternative UniFi OS
-            (f"/api/s/{site_key}/wlangroup", False),       # Alternative Legacy
-            (f"/api/s/{site_key}/rest/wlanconf", True),    # Sometimes wlangroup is in wlanconf
-            (f"/api/s/{site_key}/rest/wlanconf", False),   # Legacy wlanconf
-        ]
-        
-        for endpoint, proxy_first in endpoints:
+        """Get the 'All APs' (default) WLAN group ID; cached per site via get_group_ids()"""
+        group_id = self.get_group_ids(site_key).get("default_wlangroup_id")
+        if group_id:
+            self.log(f"Using default WLAN group ID: {group_id}")
+            return group_id
+
+        # Sometimes wlangroup is only visible through wlanconf
+        for endpoint, proxy_first in ((f"/api/s/{site_key}/rest/wlanconf", True), (f"/api/s/{site_key}/rest/wlanconf", False)):
             self.log(f"Trying wlangroup endpoint: {endpoint} (proxy_first={proxy_first})")
             try:
                 r = self.sess.get(self._u(endpoint, proxy_first=proxy_first), timeout=15)
                 if not r.ok:
                     self.log(f"Failed to get wlangroup from {endpoint}: {r.status_code} - {r.text[:100]}...")
                     continue
-                
                 obj = self._j(r)
                 groups = obj if isinstance(obj, list) else obj.get("data", [])
-                
-                if not groups:
-                    self.log(f"No WLAN groups found in {endpoint}")
-                    continue
-                
-                self.log(f"Found {len(groups)} WLAN groups in {endpoint}")
-                
-                # Look for the "Default" or "All" group as per methodology
-                for g in groups:
-                    group_name = g.get("name", "")
-                    group_id = g.get("_id")
-                    attr_hidden_id = g.get("attr_hidden_id")
-                    attr_no_delete = g.get("attr_no_delete")
-                    
-                    self.log(f"Group: {group_name} (ID: {group_id}, hidden_id: {attr_hidden_id}, no_delete: {attr_no_delete})")
-                    
-                    # Prefer groups with attr_hidden_id="default" or attr_no_delete=true
-                    if attr_hidden_id == "default" or attr_no_delete is True:
-                        self.log(f"Found default WLAN group: {group_name} (ID: {group_id})")
-                        return group_id
-                
-                # If no default group found, use the first one
-                first_group = groups[0]
-                group_id = first_group.get("_id")
-                group_name = first_group.get("name", "Unknown")
-                self.log(f"Using first WLAN group: {group_name} (ID: {group_id})")
-                return group_id
-                
+                group_id = self._pick_group(groups, lambda g: g.get("attr_hidden_id") == "default" or g.get("attr_no_delete") is True)
+                if group_id:
+                    self.log(f"Using WLAN group from {endpoint}: {group_id}")
+                    self._remember_group_id(site_key, "default_wlangroup_id", group_id)
+                    return group_id
             except Exception as e:
                 self.log(f"Error getting wlangroup from {endpoint}: {e}")
                 continue
-        
+
         # If all endpoints failed, try to get from existing WLANs
         self.log("All wlangroup endpoints failed, trying to get from existing WLANs...")
         try:
@@ -610,9 +716,11 @@ class ControllerClient:
                 for wlan in existing_wlans:
                     if 'wlangroup_id' in wlan:
                         self.log(f"Found wlangroup_id from existing WLAN: {wlan['wlangroup_id']}")
+                        self._remember_group_id(site_key, "default_wlangroup_id", wlan['wlangroup_id'])
                         return wlan['wlangroup_id']
                     if 'ap_group_ids' in wlan and wlan['ap_group_ids']:
                         self.log(f"Found ap_group_ids from existing WLAN: {wlan['ap_group_ids'][0]}")
+                        self._remember_group_id(site_key, "default_wlangroup_id", wlan['ap_group_ids'][0])
                         return wlan['ap_group_ids'][0]
         except Exception as e:
             self.log(f"Error getting wlangroup from existing WLANs: {e}")
@@ -620,127 +728,18 @@ class ControllerClient:
         raise Exception("Could not find wlangroup_id from any endpoint")
 
     def get_site_all_ap_group_id(self, site_key: str):
-        """Get the 'All APs' group ID using POST with empty JSON (as per user's working code)"""
-        try:
-            # Use POST with empty JSON body as per the working code
-            endpoint = f"/api/s/{site_key}/list/apgroups"
-            url = self._u(endpoint, proxy_first=False)  # Try legacy first
-            self.log(f"Trying AP group endpoint: {endpoint}")
-            
-            r = self.sess.post(url, json={}, timeout=15)
-            self.log(f"AP group response status: {r.status_code}")
-            
-            if r.status_code == 200:
-                obj = self._j(r)
-                groups = obj.get("data", []) if isinstance(obj, dict) else obj
-                
-                if groups:
-                    self.log(f"Found {len(groups)} AP groups")
-                    # Look for groups with attr_hidden_id == "all" or name.lower() == "all"
-                    for group in groups:
-                        group_name = group.get("name", "")
-                        group_id = group.get("_id")
-                        attr_hidden_id = group.get("attr_hidden_id")
-                        
-                        self.log(f"Group: {group_name} (ID: {group_id}, attr_hidden_id: {attr_hidden_id})")
-                        
-                        if attr_hidden_id == "all" or group_name.lower() == "all":
-                            self.log(f"Found 'All' AP group: {group_name} (ID: {group_id})")
-                            return group_id
-                    
-                    # If no "All" group found, use the first one
-                    first_group = groups[0]
-                    group_id = first_group.get("_id")
-                    group_name = first_group.get("name", "Unknown")
-                    self.log(f"Using first AP group: {group_name} (ID: {group_id})")
-                    return group_id
-                else:
-                    self.log(f"No AP groups found in response")
-            else:
-                self.log(f"AP group endpoint failed: {r.status_code} - {r.text}")
-        except Exception as e:
-            self.log(f"Error getting AP groups: {e}")
-        
-        # Try with proxy if legacy failed
-        try:
-            endpoint = f"/api/s/{site_key}/list/apgroups"
-            url = self._u(endpoint, proxy_first=True)  # Try UniFi OS
-            self.log(f"Trying AP group endpoint with proxy: {endpoint}")
-            
-            r = self.sess.post(url, json={}, timeout=15)
-            self.log(f"AP group response status: {r.status_code}")
-            
-            if r.status_code == 200:
-                obj = self._j(r)
-                groups = obj.get("data", []) if isinstance(obj, dict) else obj
-                
-                if groups:
-                    self.log(f"Found {len(groups)} AP groups")
-                    # Look for groups with attr_hidden_id == "all" or name.lower() == "all"
-                    for group in groups:
-                        group_name = group.get("name", "")
-                        group_id = group.get("_id")
-                        attr_hidden_id = group.get("attr_hidden_id")
-                        
-                        self.log(f"Group: {group_name} (ID: {group_id}, attr_hidden_id: {attr_hidden_id})")
-                        
-                        if attr_hidden_id == "all" or group_name.lower() == "all":
-                            self.log(f"Found 'All' AP group: {group_name} (ID: {group_id})")
-                            return group_id
-                    
-                    # If no "All" group found, use the first one
-                    first_group = groups[0]
-                    group_id = first_group.get("_id")
-                    group_name = first_group.get("name", "Unknown")
-                    self.log(f"Using first AP group: {group_name} (ID: {group_id})")
-                    return group_id
-                else:
-                    self.log(f"No AP groups found in response")
-            else:
-                self.log(f"AP group endpoint failed: {r.status_code} - {r.text}")
-        except Exception as e:
-            self.log(f"Error getting AP groups with proxy: {e}")
-        
-        self.log("No AP groups found on any endpoint")
-        return None
+        """Get the 'All APs' group ID from list/apgroups (POST with empty JSON); cached per site"""
+        group_id = self.get_group_ids(site_key).get("all_ap_group_id")
+        if not group_id:
+            self.log("No AP groups found on any endpoint")
+        return group_id
     
     def _get_ap_group_id_v2(self, site_key: str) -> Optional[str]:
-        """Get AP group ID using v2 API with enhanced error handling"""
-        try:
-            self.log(f"Getting AP groups using v2 API for site: {site_key}")
-            ap_groups_response = self.sess.get(self._u(f"/v2/api/site/{site_key}/apgroups", proxy_first=False), timeout=15)
-            
-            if ap_groups_response.ok:
-                ap_groups_data = ap_groups_response.json()
-                if ap_groups_data and len(ap_groups_data) > 0:
-                    # Look for the "All APs" group or default group
-                    for group in ap_groups_data:
-                        group_name = group.get("name", "")
-                        group_id = group.get("_id")
-                        attr_hidden_id = group.get("attr_hidden_id")
-                        
-                        self.log(f"AP Group: {group_name} (ID: {group_id}, hidden_id: {attr_hidden_id})")
-                        
-                        # Prefer groups with attr_hidden_id="default" or name contains "All"
-                        if attr_hidden_id == "default" or "all" in group_name.lower():
-                            self.log(f"Found default AP group: {group_name} (ID: {group_id})")
-                            return group_id
-                    
-                    # If no default found, use the first one
-                    first_group = ap_groups_data[0]
-                    group_id = first_group.get("_id")
-                    group_name = first_group.get("name", "Unknown")
-                    self.log(f"Using first AP group: {group_name} (ID: {group_id})")
-                    return group_id
-                else:
-                    self.log("No AP groups found in v2 API response")
-                    return None
-            else:
-                self.log(f"v2 API AP groups failed: {ap_groups_response.status_code}")
-                return None
-        except Exception as e:
-            self.log(f"Error getting AP groups from v2 API: {e}")
-            return None
+        """Get AP group ID using v2 API; cached per site"""
+        group_id = self.get_group_ids(site_key).get("ap_group_id_v2")
+        if not group_id:
+            self.log("No AP groups found in v2 API response")
+        return group_id
     
     def get_all_aps_ap_group_id(self, site_key: str):
         """Get the 'All APs' group ID for broadcasting WLANs (legacy method)"""
@@ -787,6 +786,7 @@ class ControllerClient:
                     group_id = response.get("_id") or response.get("id")
                     if group_id:
                         self.log(f"Successfully created 'All APs' group with ID: {group_id}")
+                        self.invalidate_group_ids(site_key)
                         return group_id
                 else:
                     self.log(f"Failed to create group via {endpoint}: {r.status_code} - {r.text}")
@@ -808,6 +808,7 @@ class ControllerClient:
                     group_id = response.get("_id") or response.get("id")
                     if group_id:
                         self.log(f"Successfully created simplified 'All APs' group with ID: {group_id}")
+                        self.invalidate_group_ids(site_key)
                         return group_id
             except Exception as e:
                 self.log(f"Exception creating simplified group via {endpoint}: {e}")
@@ -823,141 +824,154 @@ class ControllerClient:
             self.log(f"Default group ID also failed: {e}")
             raise Exception("Failed to create AP group via all endpoints")
 
-    def create_wlan_api_browser_method(self, site_key: str, ssid: str, password: str) -> bool:
-        """Create WLAN using the exact payload structure discovered via API Browser"""
-        try:
-            # Validate site key first
-            if not self.validate_site_key(site_key):
-                self.log(f"✗ Invalid site key: {site_key}")
-                return False
-            
-            # Handle site names with spaces (convert to underscore for API)
-            api_site_key = site_key.replace(" ", "_")
-            
-            # Get the correct group IDs for this site
-            self.log(f"Getting group IDs for site: {api_site_key}")
-            
-            # Try to get AP groups using v2 API (enhanced method)
-            ap_group_id = self._get_ap_group_id_v2(api_site_key)
-            
-            # Try to get WLAN groups using v1 API
-            try:
-                wlan_groups_response = self.sess.get(self._u(f"/api/s/{api_site_key}/rest/wlangroup", proxy_first=False), timeout=15)
-                if wlan_groups_response.ok:
-                    wlan_groups_data = wlan_groups_response.json()
-                    if wlan_groups_data.get("data") and len(wlan_groups_data["data"]) > 0:
-                        wlangroup_id = wlan_groups_data["data"][0].get("_id")
-                        self.log(f"Found WLAN group ID: {wlangroup_id}")
-                    else:
-                        self.log("No WLAN groups found, will try without WLAN group ID")
-                        wlangroup_id = None
-                else:
-                    self.log(f"Failed to get WLAN groups: {wlan_groups_response.status_code}")
-                    wlangroup_id = None
-            except Exception as e:
-                self.log(f"Error getting WLAN groups: {e}")
-                wlangroup_id = None
-            
-            # Build payload with discovered group IDs - EXACT structure from working tests
-            wlan_payload = {
-                "name": ssid,
-                "x_passphrase": password,
-                "security": "wpapsk",
-                "wpa_mode": "wpa2",
-                "enabled": True,
-                "is_guest": False,
-                "vlan_enabled": False,
-                # WiFi Performance Settings
-                "fast_roaming_enabled": True,        # Fast Roaming On
-                "bss_transition": True,              # BSS Transition On  
-                "minrate_ng_enabled": True,          # Minimum Data Rate Control Auto
-                "minrate_na_enabled": True,          # Minimum Data Rate Control Auto for 5GHz
-                "minrate_setting_preference": "auto" # Auto minimum rate setting
-            }
-            
-            # Add group IDs if we found them
-            if wlangroup_id:
-                wlan_payload["wlangroup_id"] = wlangroup_id
-                
-            if ap_group_id:
-                wlan_payload["ap_group_mode"] = "all"
-                wlan_payload["ap_group_ids"] = [ap_group_id]
-            
-            # Try the EXACT working endpoint from our successful tests
-            endpoint = f"/api/s/{api_site_key}/rest/wlanconf"
-            self.log(f"Creating WLAN with API Browser payload structure: {endpoint}")
-            self.log(f"Payload: {wlan_payload}")
-            
-            # Try direct endpoint first (this worked in our tests)
-            r = self.sess.post(self._u(endpoint, proxy_first=False), json=wlan_payload, timeout=30)
-            self.log(f"Direct endpoint response status: {r.status_code}")
-            self.log(f"Direct endpoint response: {r.text}")
-            
-            if r.ok:
-                response_data = r.json()
-                if (response_data.get("meta", {}).get("rc") == "ok" and 
-                    "data" in response_data and 
-                    len(response_data["data"]) > 0):
-                    self.log(f"✓ WLAN created successfully using direct endpoint")
-                    self.log(f"Created WLAN ID: {response_data['data'][0].get('_id', 'Unknown')}")
-                    return True
-                else:
-                    self.log(f"✗ Unexpected response format: {response_data}")
-            
-            # If direct endpoint failed, try proxy endpoint
-            self.log("Direct endpoint failed, trying proxy endpoint...")
-            r = self.sess.post(self._u(endpoint, proxy_first=True), json=wlan_payload, timeout=30)
-            self.log(f"Proxy endpoint response status: {r.status_code}")
-            self.log(f"Proxy endpoint response: {r.text}")
-            
-            if r.ok:
-                response_data = r.json()
-                if (response_data.get("meta", {}).get("rc") == "ok" and 
-                    "data" in response_data and 
-                    len(response_data["data"]) > 0):
-                    self.log(f"✓ WLAN created successfully using proxy endpoint")
-                    self.log(f"Created WLAN ID: {response_data['data'][0].get('_id', 'Unknown')}")
-                    return True
-                else:
-                    self.log(f"✗ Unexpected response format: {response_data}")
-            
-            self.log(f"✗ WLAN creation failed with both endpoints")
+    def _api_browser_wlan_body(self, site_key: str, ssid: str, password: str):
+        """(api site key, body) using the exact payload structure discovered via API Browser"""
+        # Handle site names with spaces (convert to underscore for API)
+        api_site_key = site_key.replace(" ", "_")
+        self.log(f"Getting group IDs for site: {api_site_key}")
+        ap_group_id = self._get_ap_group_id_v2(api_site_key)
+        wlangroup_id = self.get_group_ids(api_site_key).get("wlangroup_id")
+        if wlangroup_id:
+            self.log(f"Found WLAN group ID: {wlangroup_id}")
+        else:
+            self.log("No WLAN groups found, will try without WLAN group ID")
+
+        # EXACT structure from working tests
+        body = {
+            "name": ssid,
+            "x_passphrase": password,
+            "security": "wpapsk",
+            "wpa_mode": "wpa2",
+            "enabled": True,
+            "is_guest": False,
+            "vlan_enabled": False,
+            # WiFi Performance Settings
+            "fast_roaming_enabled": True,        # Fast Roaming On
+            "bss_transition": True,              # BSS Transition On  
+            "minrate_ng_enabled": True,          # Minimum Data Rate Control Auto
+            "minrate_na_enabled": True,          # Minimum Data Rate Control Auto for 5GHz
+            "minrate_setting_preference": "auto" # Auto minimum rate setting
+        }
+        if wlangroup_id:
+            body["wlangroup_id"] = wlangroup_id
+        if ap_group_id:
+            body["ap_group_mode"] = "all"
+            body["ap_group_ids"] = [ap_group_id]
+        return api_site_key, body
+
+    def _wlangroup_wlan_body(self, site_key: str, ssid: str, password: str):
+        """(site key, body) using the default wlangroup_id and the 'All' AP group from list/apgroups"""
+        wlangroup_id = self.get_all_aps_group_id(site_key)
+        self.log(f"Using wlangroup_id: {wlangroup_id}")
+        ap_group_id = self.get_site_all_ap_group_id(site_key)
+        self.log(f"Using ap_group_id: {ap_group_id}")
+        body = {
+            "name": ssid,
+            "enabled": True,
+            "wlangroup_id": wlangroup_id,
+            "security": "wpapsk",
+            "wpa_mode": "wpa2",
+            "x_passphrase": password,
+            # WiFi Performance Settings
+            "fast_roaming_enabled": True,        # Fast Roaming On
+            "bss_transition": True,              # BSS Transition On  
+            "minrate_ng_enabled": True,          # Minimum Data Rate Control Auto
+            "minrate_na_enabled": True,          # Minimum Data Rate Control Auto for 5GHz
+            "minrate_setting_preference": "auto" # Auto minimum rate setting
+        }
+        if ap_group_id:
+            body["ap_group_mode"] = "selected"
+            body["ap_group_ids"] = [ap_group_id]
+            # Some builds accept (or prefer) singular too; harmless to include both:
+            body["ap_group_id"] = ap_group_id
+        else:
+            self.log("No AP group ID found, omitting AP group fields")
+        return site_key, body
+
+    @staticmethod
+    def _wlan_created(r) -> bool:
+        if not r.ok:
             return False
-                
-        except Exception as e:
-            self.log(f"✗ Exception during API Browser WLAN creation: {e}")
+        try:
+            data = r.json()
+            return data.get("meta", {}).get("rc") == "ok" and len(data.get("data") or []) > 0
+        except Exception:
             return False
 
+    def _wlan_strategy_scores(self) -> Dict[str, int]:
+        ranks = self.store.get_value("wlan_strategies") or {}
+        return ranks.get(self.base, {}).get(self.get_system_version(), {})
+
+    def _wlan_strategies(self) -> List[tuple]:
+        """WLAN_CREATE_STRATEGIES, best past record on this controller version first."""
+        scores = self._wlan_strategy_scores()
+        order = {s: i for i, s in enumerate(WLAN_CREATE_STRATEGIES)}
+        return sorted(WLAN_CREATE_STRATEGIES, key=lambda s: (-scores.get(self._strategy_id(s), 0), order[s]))
+
+    @staticmethod
+    def _strategy_id(strategy: tuple) -> str:
+        kind, path, proxy = strategy
+        return f"{kind}:{path}:{'proxy' if proxy else 'direct'}"
+
+    def _rank_wlan_strategy(self, strategy: tuple, won: bool):
+        """Persist a success or failure (-1, floor 0) for a strategy on this controller version.
+        A success ranks the strategy above every other, so a controller that changed behaviour
+        after an upgrade only costs one fallback walk."""
+        sid = self._strategy_id(strategy)
+        version = self.get_system_version()
+        with self._learn_lock:
+            ranks = self.store.get_value("wlan_strategies") or {}
+            mine = ranks.setdefault(self.base, {}).setdefault(version, {})
+            old = mine.get(sid, 0)
+            new = max([old] + [v for k, v in mine.items() if k != sid]) + 1 if won else max(0, old - 1)
+            if new == old:
+                return
+            mine[sid] = new
+            self.store.set_value("wlan_strategies", ranks)
+        if won and old == 0:
+            self.log(f"Learned WLAN create strategy for controller {version}: {sid}")
+
     def create_wlan(self, site_key: str, ssid: str, password: str) -> bool:
-        """Create WLAN using the corrected API Browser method"""
+        """Create a WLAN, trying the strategy that last worked on this controller version first.
+        The other strategies are only tried when that one fails."""
         # Handle None or missing site_key
         if not site_key:
             self.log("No site key provided, using default site")
             site_key = "default"
-        
-        # Use the corrected API Browser method that we know works
-        self.log("Using corrected API Browser method for WLAN creation...")
-        try:
-            success = self.create_wlan_api_browser_method(site_key, ssid, password)
-            if success:
-                self.log("✓ WLAN created successfully using corrected API Browser method")
-                return True
-            else:
-                self.log("✗ API Browser method failed, trying fallback...")
-        except Exception as e:
-            self.log(f"✗ API Browser method failed with exception: {e}")
-        
-        # Fallback to the old method if API Browser method fails
-        self.log("Trying fallback WLAN creation method...")
-        try:
-            success = self._create_wlan_with_wlangroup_endpoint(site_key, ssid, password)
-            if success:
-                self.log("✓ WLAN created successfully using fallback method")
-                return True
-        except Exception as e:
-            self.log(f"✗ Fallback method failed: {e}")
-        
-        # If all methods fail, raise exception
+        if not self.validate_site_key(site_key):
+            self.log(f"✗ Invalid site key: {site_key}")
+            return False
+
+        builders = {"api_browser": self._api_browser_wlan_body, "wlangroup": self._wlangroup_wlan_body}
+        bodies: Dict[str, tuple] = {}
+        scores = self._wlan_strategy_scores()
+        for strategy in self._wlan_strategies():
+            kind, path, proxy = strategy
+            if kind not in bodies:
+                try:
+                    bodies[kind] = builders[kind](site_key, ssid, password)
+                except Exception as e:
+                    self.log(f"✗ Could not build {kind} WLAN body: {e}")
+                    bodies[kind] = None
+            if bodies[kind] is None:
+                continue
+            site, body = bodies[kind]
+            endpoint = f"/api/s/{site}/{path}"
+            self.log(f"Creating WLAN via {self._strategy_id(strategy)}: {endpoint}")
+            self.log(f"Payload: {body}")
+            try:
+                r = self.sess.post(self._u(endpoint, proxy_first=proxy), json=body, timeout=30)
+                self.log(f"Response: {r.status_code} - {r.text[:200]}")
+                if self._wlan_created(r):
+                    self.log(f"✓ WLAN created via {self._strategy_id(strategy)}")
+                    self._rank_wlan_strategy(strategy, True)
+                    self.cache.invalidate(tag=f"wlans:{site}")
+                    return True
+            except Exception as e:
+                self.log(f"✗ Exception with {endpoint}: {e}")
+            if scores.get(self._strategy_id(strategy)):
+                self._rank_wlan_strategy(strategy, False)
+
         raise Exception("All WLAN creation methods failed")
 
     def _add_ap_group_to_body(self, body: dict, site_key: str) -> dict:
@@ -1076,95 +1090,6 @@ class ControllerClient:
                 "wpa_mode": "wpa2",
             }
 
-    def _create_wlan_with_wlangroup_endpoint(self, site_key: str, ssid: str, password: str) -> bool:
-        """Create WLAN using the correct API pattern from the methodology"""
-        try:
-            # Step 1: Get the wlangroup_id using the working approach
-            self.log(f"Step 1: Getting wlangroup_id for site {site_key}")
-            wlangroup_id = self.get_all_aps_group_id(site_key)
-            self.log(f"Using wlangroup_id: {wlangroup_id}")
-            
-            # Step 2: Get the AP group ID using the new POST approach
-            self.log(f"Step 2: Getting AP group ID for site {site_key}")
-            ap_group_id = self.get_site_all_ap_group_id(site_key)
-            self.log(f"Using ap_group_id: {ap_group_id}")
-            
-            # Step 3: Build payload using the working approach from user's code
-            payload = {
-                "name": ssid,
-                "enabled": True,
-                "wlangroup_id": wlangroup_id,
-                "security": "wpapsk",
-                "wpa_mode": "wpa2",
-                "x_passphrase": password,
-                # WiFi Performance Settings
-                "fast_roaming_enabled": True,        # Fast Roaming On
-                "bss_transition": True,              # BSS Transition On  
-                "minrate_ng_enabled": True,          # Minimum Data Rate Control Auto
-                "minrate_na_enabled": True,          # Minimum Data Rate Control Auto for 5GHz
-                "minrate_setting_preference": "auto" # Auto minimum rate setting
-            }
-            
-            # Add AP group fields if we found an AP group ID
-            if ap_group_id:
-                payload["ap_group_mode"] = "selected"
-                payload["ap_group_ids"] = [ap_group_id]
-                # Some builds accept (or prefer) singular too; harmless to include both:
-                payload["ap_group_id"] = ap_group_id
-                self.log(f"Added AP group fields: ap_group_mode=selected, ap_group_ids=[{ap_group_id}], ap_group_id={ap_group_id}")
-            else:
-                self.log("No AP group ID found, omitting AP group fields")
-            
-            # Try multiple endpoints for different controller types
-            endpoints = [
-                (f"/api/s/{site_key}/rest/wlanconf", False),  # Legacy (no proxy)
-                (f"/api/s/{site_key}/rest/wlanconf", True),   # UniFi OS
-                (f"/api/s/{site_key}/wlanconf", False),       # Alternative Legacy
-                (f"/api/s/{site_key}/wlanconf", True),        # Alternative UniFi OS
-                (f"/api/s/{site_key}/cmd/wlanconf", False),   # CMD endpoint Legacy
-                (f"/api/s/{site_key}/cmd/wlanconf", True),    # CMD endpoint UniFi OS
-            ]
-            
-            # Try each endpoint with the payload
-            for endpoint, proxy_first in endpoints:
-                self.log(f"Step 3: Trying WLAN creation with endpoint: {endpoint} (proxy_first={proxy_first})")
-                self.log(f"Payload: {payload}")
-                
-                try:
-                    r = self.sess.post(self._u(endpoint, proxy_first=proxy_first), json=payload, timeout=30)
-                    self.log(f"Response status: {r.status_code}")
-                    self.log(f"Response: {r.text}")
-                    
-                    # Check for successful response
-                    if r.ok:
-                        try:
-                            response_data = r.json()
-                            if (response_data.get("meta", {}).get("rc") == "ok" and 
-                                "data" in response_data and 
-                                len(response_data["data"]) > 0):
-                                self.log(f"✓ WLAN created successfully using {endpoint}")
-                                self.log(f"Created WLAN ID: {response_data['data'][0].get('_id', 'Unknown')}")
-                                return True
-                            else:
-                                self.log(f"✗ Unexpected response format from {endpoint}: {response_data}")
-                                continue
-                        except Exception as parse_error:
-                            self.log(f"✗ Failed to parse response from {endpoint}: {parse_error}")
-                            continue
-                    else:
-                        self.log(f"✗ WLAN creation failed with {endpoint}: {r.status_code} - {r.text[:200]}...")
-                        continue
-                except Exception as e:
-                    self.log(f"✗ Exception with {endpoint}: {e}")
-                    continue
-            
-            self.log(f"✗ All WLAN creation methods failed")
-            return False
-                
-        except Exception as e:
-            self.log(f"Exception in wlangroup endpoint method: {e}")
-            return False
-
     def _create_official_unifi_api_wlan_body(self, ssid: str, password: str) -> dict:
         """Create WLAN body using official UniFi Network Application API format"""
         return {
@@ -1344,11 +1269,14 @@ class ControllerClient:
             return []
 
     def _detect_wlan_endpoint(self, site_key: str) -> str:
-        """Detect which WLAN endpoint is available on this controller"""
+        """Detect which WLAN endpoint is available on this controller (probed once per site)"""
         # Handle None or missing site_key
         if not site_key:
             self.log("No site key provided, trying default site")
             site_key = "default"
+        cached = self._wlan_endpoint_cache.get(site_key)
+        if cached:
+            return cached
         
         endpoints = [
             f"/api/s/{site_key}/rest/wlanconf",
@@ -1360,6 +1288,7 @@ class ControllerClient:
         ]
         
         self.log(f"Testing WLAN endpoints for site {site_key}...")
+        found = None
         for endpoint in endpoints:
             try:
                 # Try a GET request to see if the endpoint exists
@@ -1368,68 +1297,103 @@ class ControllerClient:
                 self.log(f"Response: {r.status_code} - {r.text[:200]}")
                 if r.ok:
                     self.log(f"Found working WLAN endpoint: {endpoint}")
-                    return endpoint
+                    found = endpoint
+                    break
             except Exception as e:
                 self.log(f"Endpoint {endpoint} failed: {e}")
                 continue
         
-        # Fallback to REST endpoint
-        self.log("No working endpoints found, using fallback REST endpoint")
-        return f"/api/s/{site_key}/rest/wlanconf"
+        if not found:
+            # Fallback to REST endpoint
+            self.log("No working endpoints found, using fallback REST endpoint")
+            found = f"/api/s/{site_key}/rest/wlanconf"
+        self._wlan_endpoint_cache[site_key] = found
+        return found
 
     def _try_create_wlan(self, site_key: str, body: dict) -> bool:
         """Try to create a WLAN with the given configuration"""
         
-        # Detect the correct endpoint first
+        # Detected endpoint first (memoized), then the remaining ones
         working_endpoint = self._detect_wlan_endpoint(site_key)
+        all_endpoints = [
+            ("REST", f"/api/s/{site_key}/rest/wlanconf"),
+            ("CMD",  f"/api/s/{site_key}/cmd/wlanconf"),
+            ("ADD",  f"/api/s/{site_key}/add/wlanconf")
+        ]
+        endpoints = sorted(all_endpoints, key=lambda e: e[1] != working_endpoint)
 
-        def _try(rest_first=True):
-            last = ""
-            # Create endpoint list with detected working endpoint first
-            all_endpoints = [
-                ("REST", f"/api/s/{site_key}/rest/wlanconf"),
-                ("CMD",  f"/api/s/{site_key}/cmd/wlanconf"),
-                ("ADD",  f"/api/s/{site_key}/add/wlanconf")
-            ]
-            
-            # Move working endpoint to front
-            working_name = None
-            for name, endpoint in all_endpoints:
-                if endpoint == working_endpoint:
-                    working_name = name
-                    break
-            
-            if working_name:
-                # Put working endpoint first
-                endpoints = [(working_name, working_endpoint)]
-                for name, endpoint in all_endpoints:
-                    if endpoint != working_endpoint:
-                        endpoints.append((name, endpoint))
-            else:
-                endpoints = all_endpoints
-            for kind, path in endpoints:
-                for proxy in (False, True):
-                    try:
-                        self.log(f"Trying {kind} endpoint: {path} (proxy={proxy})")
-                        self.log(f"Payload: {body}")
-                        r = self.sess.post(self._u(path, proxy_first=proxy), json=body, timeout=25)
-                        self.log(f"Response: {r.status_code} - {r.text[:500]}")
-                        if r.ok:
-                            self.log(f"SUCCESS: WLAN created via {kind} endpoint")
-                            return True, ""
-                        last = f"{kind} {r.status_code}: {r.text[:400]}"
-                    except Exception as ex:
-                        self.log(f"Exception with {kind} endpoint: {ex}")
-                        last = f"{kind} exception: {ex}"
-            return False, last
-
-        ok, err = _try(rest_first=True)
-        if ok:
-            return True
-        ok2, err2 = _try(rest_first=False)
-        if ok2:
-            return True
-        raise Exception(f"Controller rejected WLAN create: {err or err2 or 'unknown error'}")
+        last = ""
+        for kind, path in endpoints:
+            for proxy in (False, True):
+                try:
+                    self.log(f"Trying {kind} endpoint: {path} (proxy={proxy})")
+                    self.log(f"Payload: {body}")
+                    r = self.sess.post(self._u(path, proxy_first=proxy), json=body, timeout=25)
+                    self.log(f"Response: {r.status_code} - {r.text[:500]}")
+                    if r.ok:
+                        self.log(f"SUCCESS: WLAN created via {kind} endpoint")
+                        return True
+                    last = f"{kind} {r.status_code}: {r.text[:400]}"
+                except Exception as ex:
+                    self.log(f"Exception with {kind} endpoint: {ex}")
+                    last = f"{kind} exception: {ex}"
+        raise Exception(f"Controller rejected WLAN create: {last or 'unknown error'}")
+
+    # ----- networks / site settings -----
+    def _get_list(self, site_key: str, names: List[str]) -> List[Dict]:
+        """First answering variant of /api/s/<site>/<name>, UniFi OS then legacy; [] if none."""
+        for name in names:
+            for proxy in (True, False):
+                try:
+                    r = self.sess.get(self._u(f"/api/s/{site_key}/{name}", proxy_first=proxy), timeout=15)
+                    if not r.ok:
+                        continue
+                    obj = self._j(r)
+                    data = obj.get("data") if isinstance(obj, dict) else obj
+                    if isinstance(data, list):
+                        return data
+                except Exception:
+                    continue
+        return []
+
+    def _write(self, method: str, site_key: str, path: str, body: Dict):
+        """PUT/POST body to /api/s/<site>/<path>, UniFi OS then legacy. Returns the 200 response or None."""
+        for proxy in (True, False):
+            try:
+                send = self.sess.put if method == "PUT" else self.sess.post
+                r = send(self._u(f"/api/s/{site_key}/{path}", proxy_first=proxy), json=body, timeout=20)
+                if r.status_code == 200:
+                    return r
+                self.log(f"{method} {path} on {site_key}: {r.status_code} - {r.text[:200]}")
+            except Exception as e:
+                self.log(f"{method} {path} on {site_key} failed: {e}")
+        return None
+
+    def get_networks(self, site_key: str) -> List[Dict]:
+        return self._get_list(site_key, ["rest/networkconf", "list/networkconf"])
+
+    def get_site_settings(self, site_key: str) -> List[Dict]:
+        """Site setting sections (mgmt, connectivity, country, ...), one dict per 'key'."""
+        return self._get_list(site_key, ["get/setting", "rest/setting"])
+
+    def get_group_lists(self, site_key: str) -> Dict[str, Optional[list]]:
+        """Raw WLAN group and AP group lists for a site (uncached, see get_group_ids for the IDs)."""
+        return self._fetch_group_lists(site_key)
+
+    def create_network(self, site_key: str, body: Dict) -> Optional[Dict]:
+        r = self._write("POST", site_key, "rest/networkconf", body)
+        try:
+            return r.json()["data"][0] if r is not None else None
+        except Exception:
+            return None
+
+    def update_network(self, site_key: str, network_id: str, changes: Dict) -> bool:
+        return self._write("PUT", site_key, f"rest/networkconf/{network_id}", changes) is not None
+
+    def update_site_setting(self, site_key: str, setting: Dict, changes: Dict) -> bool:
+        """Change fields of one setting section (as returned by get_site_settings)."""
+        body = dict(changes, key=setting.get("key"))
+        return self._write("PUT", site_key, f"rest/setting/{setting.get('key')}/{setting.get('_id')}", body) is not None
 
     # ----- SSH inform -----
     def ssh_set_inform(self, ip: str, inform_url: Optional[str]=None, username: Optional[str]=None, password: Optional[str]=None, site_key: Optional[str]=None) -> bool:
@@ -1728,164 +1692,187 @@ class ControllerClient:
             return None
 
 
-    def create_site_and_get_key(self, desc: str) -> str:
-        """
-        Create a site with 'desc' (title shown in UI) and return its site key (the internal 'name').
-        Falls back to scanning the site list by matching desc.
-        """
-        try:
-            payload = {"cmd": "add-site", "desc": desc}
-            url = f"{self.base}/api/s/default/cmd/sitemgr"
-            r = self.sess.post(url, json=payload, timeout=20)
-            r.raise_for_status()
-        except Exception as e:
-            # Some controllers need a different path; try UniFi OS proxy variant as a fallback
+    def _add_site(self, desc: str) -> str:
+        """POST add-site (legacy path, then UniFi OS). Returns the new key when the controller
+        echoes the site back, else "". Raises RuntimeError if no variant accepted it."""
+        payload = {"cmd": "add-site", "desc": desc}
+        last = None
+        for proxy in (False, True):
             try:
-                url2 = f"{self.base}/proxy/network/api/s/default/cmd/sitemgr"
-                r2 = self.sess.post(url2, json=payload, timeout=20)
-                r2.raise_for_status()
-            except Exception as e2:
-                raise RuntimeError(f"Site create failed: {e2}") from e
+                r = self.sess.post(self._u("/api/s/default/cmd/sitemgr", proxy_first=proxy), json=payload, timeout=20)
+            except Exception as e:
+                last = e
+                continue
+            if not r.ok:
+                last = f"{r.status_code} - {r.text[:200]}"
+                continue
+            try:
+                created = (r.json().get("data") or [{}])[0]
+                return created.get("name") or ""
+            except Exception:
+                return ""
+        raise RuntimeError(f"Site create failed: {last}")
+
+    def create_sites_bulk(self, descs: List[str], max_workers: int = 8,
+                          errors: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Create a site per description concurrently and return {desc: site key}.
+
+        Keys the controller does not echo back are resolved together with one forced site-list
+        refresh, taking the one site with that description that was not in the site list read
+        (uncached) just before posting. A desc maps to "" when its create failed, or when no site (or more
+        than one) qualifies; failures are added to errors."""
+        descs = [d.strip() for d in descs if d and d.strip()]
+        before = set(s.get("name") for s in self.get_sites(force_refresh=True) or [])
+        keys: Dict[str, str] = {}
+        for desc, key, exc in run_bounded(self._add_site, descs, max_workers):
+            if exc is not None:
+                self.log(f"Site create '{desc}' failed: {exc}")
+                if errors is not None:
+                    errors[desc] = str(exc)
+            keys[desc] = key or ""
+        self.invalidate_sites()
 
-        # Now fetch sites and locate the newly created one by description match (desc)
-        sites = self.get_sites() or []
-        for s in sites:
-            if (s.get("desc") or "").strip() == desc.strip():
-                # 'name' is the site key used in API paths
+        unresolved = [d for d in descs if d not in (errors or {}) and not keys.get(d)]
+        if unresolved:
+            by_desc: Dict[str, List[str]] = {}
+            for s in self.get_sites(force_refresh=True) or []:
                 key = s.get("name") or s.get("site_name") or ""
                 if key:
-                    return key
-        # If we can't find by desc, return empty string so caller can react
-        return ""
+                    by_desc.setdefault((s.get("desc") or "").strip(), []).append(key)
+            for desc in unresolved:
+                new = [k for k in by_desc.get(desc, []) if k not in before]
+                keys[desc] = new[0] if len(new) == 1 else ""
+                if len(new) > 1:
+                    self.log(f"Site '{desc}': {len(new)} new sites share this description, key left unresolved")
+        self.log(f"Created {sum(1 for k in keys.values() if k)}/{len(descs)} site(s)")
+        return {d: keys.get(d, "") for d in descs}
 
-    def set_wlan_enabled(self, site: str, wlan_id: str, enabled: bool) -> bool:
+    def create_site_and_get_key(self, desc: str) -> str:
         """
-        Enable/disable a WLAN using the correct UniFi API endpoints.
-        Tries multiple approaches based on what works with this controller version.
+        Create a site with 'desc' (title shown in UI) and return its site key (the internal 'name'),
+        or "" if it was created but could not be found. Raises RuntimeError if the create failed.
         """
-        # First, get the current WLAN object to understand its structure
-        wlans = self.get_wlans(site)
-        current_wlan = None
-        for w in wlans:
-            if w.get("_id") == wlan_id:
-                current_wlan = w
-                break
-        
-        if not current_wlan:
-            return False
-        
-        # Create a copy of the WLAN object with only the enabled field changed
-        updated_wlan = dict(current_wlan)
-        updated_wlan["enabled"] = bool(enabled)
-        
+        errors: Dict[str, str] = {}
+        key = self.create_sites_bulk([desc], errors=errors).get(desc.strip(), "")
+        if errors:
+            raise RuntimeError(next(iter(errors.values())))
+        return key
+
+    def _wlan_update_candidates(self, allow_add: bool = False) -> List[tuple]:
+        """WLAN_UPDATE_VARIANTS with the one this controller accepted last time first; "add"
+        variants only when allow_add."""
+        combos = [c for c in WLAN_UPDATE_VARIANTS if allow_add or c[0] != "add"]
+        learned = (self.store.get_value("wlan_update_variant") or {}).get(self.base)
+        if learned and learned.get("kind") != "add":
+            hit = (learned.get("kind"), learned.get("proxy"))
+            if hit in combos:
+                combos.remove(hit)
+                combos.insert(0, hit)
+        return combos
+
+    def _learn_wlan_update(self, kind: str, proxy: bool):
+        if kind == "add":
+            return
+        with self._learn_lock:
+            learned = self.store.get_value("wlan_update_variant") or {}
+            if learned.get(self.base) == {"kind": kind, "proxy": proxy}:
+                return
+            learned[self.base] = {"kind": kind, "proxy": proxy}
+            self.store.set_value("wlan_update_variant", learned)
+        self.log(f"Learned WLAN update endpoint: {kind} (proxy={proxy})")
+
+    def update_wlan(self, site: str, wlan: Dict, changes: Dict, logs: Optional[List[str]] = None,
+                    allow_add: bool = False) -> bool:
+        """Apply field changes to a WLAN object already fetched from wlanconf, trying the learned
+        update endpoint first. Responses are appended to logs when given. allow_add also tries
+        add/wlanconf as a last resort (the enable/disable toggle only)."""
+        wlan_id = wlan.get("_id")
+        # Copy of the WLAN object with only the changed fields replaced
+        updated_wlan = dict(wlan)
+        updated_wlan.update(changes)
         # Remove fields that might cause issues
-        for k in ("attr_hidden_id", "x_password", "x_passphrase_hash", "not_supported", "attr_no_delete"):
+        for k in WLAN_VOLATILE_FIELDS:
             updated_wlan.pop(k, None)
-        
-        # Try different API endpoints in order of preference
-        endpoints = [
-            # Try the /upd/wlanconf endpoint (most common for updates)
-            f"/api/s/{site}/upd/wlanconf",
-            # Try the /rest/wlanconf endpoint with PUT
-            f"/api/s/{site}/rest/wlanconf/{wlan_id}",
-            # Try the /add/wlanconf endpoint (sometimes works for updates)
-            f"/api/s/{site}/add/wlanconf",
-        ]
-        
-        for endpoint in endpoints:
-            for proxy in (True, False):
-                try:
-                    url = self._u(endpoint, proxy_first=proxy)
-                    
-                    if "/upd/wlanconf" in endpoint:
-                        # For upd endpoint, send minimal data
-                        payload = {"_id": wlan_id, "enabled": bool(enabled)}
-                        r = self.sess.post(url, json=payload, timeout=20)
-                    elif "/rest/wlanconf" in endpoint:
-                        # For REST endpoint, try PUT with full object
-                        r = self.sess.put(url, json=updated_wlan, timeout=20)
-                    else:
-                        # For add endpoint, send full object
-                        r = self.sess.post(url, json=updated_wlan, timeout=20)
-                    
-                    if r.status_code == 200:
-                        return True
-                        
-                except Exception:
-                    continue
-        
+
+        for i, (kind, proxy) in enumerate(self._wlan_update_candidates(allow_add)):
+            try:
+                if kind == "upd":
+                    # For upd endpoint, send minimal data
+                    url = self._u(f"/api/s/{site}/upd/wlanconf", proxy_first=proxy)
+                    r = self.sess.post(url, json=dict(changes, _id=wlan_id), timeout=20)
+                elif kind == "rest":
+                    # For REST endpoint, PUT the full object
+                    r = self.sess.put(self._u(f"/api/s/{site}/rest/wlanconf/{wlan_id}", proxy_first=proxy), json=updated_wlan, timeout=20)
+                else:
+                    # add endpoint sometimes works for updates; full object
+                    r = self.sess.post(self._u(f"/api/s/{site}/add/wlanconf", proxy_first=proxy), json=updated_wlan, timeout=20)
+                if logs is not None:
+                    try:
+                        body = r.json() if r.content else {}
+                    except Exception:
+                        body = {"text": str(getattr(r, "text", ""))[:600]}
+                    logs.append(f"{'PUT' if kind == 'rest' else 'POST'} {kind} (proxy={proxy}) -> {r.status_code} {body}")
+                if r.status_code == 200:
+                    if i > 0:
+                        self._learn_wlan_update(kind, proxy)
+                    self.cache.invalidate(tag=f"wlans:{site}")
+                    return True
+            except Exception as e:
+                if logs is not None:
+                    logs.append(f"{kind} (proxy={proxy}) EXC: {e}")
         return False
 
-    def set_wlan_enabled_verbose(self, site: str, wlan_id: str, enabled: bool):
-        logs = []
+    def _update_wlan_enabled(self, site: str, wlan: Dict, enabled: bool, logs: Optional[List[str]] = None) -> bool:
+        return self.update_wlan(site, wlan, {"enabled": bool(enabled)}, logs, allow_add=True)
+
+    def post_wlanconf(self, site: str, body: Dict) -> Optional[Dict]:
+        """Create a WLAN from a complete body (group IDs included) via rest/wlanconf, proxy or
+        direct in the order learned for create_wlan. Returns the created WLAN, or None."""
+        strategies = [st for st in self._wlan_strategies() if st[0] == "api_browser"]
+        for strategy in strategies:
+            _kind, path, proxy = strategy
+            try:
+                r = self.sess.post(self._u(f"/api/s/{site}/{path}", proxy_first=proxy), json=body, timeout=30)
+                if self._wlan_created(r):
+                    self._rank_wlan_strategy(strategy, True)
+                    self.cache.invalidate(tag=f"wlans:{site}")
+                    return r.json()["data"][0]
+                self.log(f"WLAN create on {site} via {self._strategy_id(strategy)}: {r.status_code} - {r.text[:200]}")
+            except Exception as e:
+                self.log(f"WLAN create on {site} via {self._strategy_id(strategy)} failed: {e}")
+        return None
 
-        def rec(resp):
+    def delete_wlan(self, site: str, wlan_id: str) -> bool:
+        """Delete a WLAN through rest/wlanconf/<id> (UniFi OS first, then legacy)."""
+        for proxy in (True, False):
             try:
-                return resp.status_code, (resp.json() if resp.content else {})
+                r = self.sess.delete(self._u(f"/api/s/{site}/rest/wlanconf/{wlan_id}", proxy_first=proxy), timeout=20)
+                if r.status_code == 200:
+                    self.cache.invalidate(tag=f"wlans:{site}")
+                    return True
             except Exception:
-                txt = resp.text if hasattr(resp, "text") else ""
-                return getattr(resp, "status_code", "?"), {"text": str(txt)[:600]}
-
-        # First, get the current WLAN object to understand its structure
-        wlans = self.get_wlans(site)
-        current_wlan = None
-        for w in wlans:
-            if w.get("_id") == wlan_id:
-                current_wlan = w
-                break
-        
+                continue
+        return False
+
+    def set_wlan_enabled(self, site: str, wlan_id: str, enabled: bool) -> bool:
+        """Enable/disable one WLAN (see set_wlans_enabled for several at once)."""
+        return self.set_wlans_enabled(site, {wlan_id: enabled}).get(wlan_id, False)
+
+    def set_wlans_enabled(self, site: str, changes: Dict[str, bool], max_workers: int = 8) -> Dict[str, bool]:
+        """Apply {wlan_id: enabled} changes with one wlanconf fetch and concurrent updates.
+        Returns {wlan_id: success}; ids missing from the site's WLAN list come back False."""
+        by_id = {w.get("_id"): w for w in self.get_wlans(site)}
+        results = {wid: False for wid in changes}
+        todo = [wid for wid in changes if wid in by_id]
+        for wid, ok, exc in run_bounded(lambda w: self._update_wlan_enabled(site, by_id[w], changes[w]), todo, max_workers):
+            results[wid] = bool(ok) and exc is None
+        return results
+
+    def set_wlan_enabled_verbose(self, site: str, wlan_id: str, enabled: bool):
+        logs: List[str] = []
+        current_wlan = next((w for w in self.get_wlans(site) if w.get("_id") == wlan_id), None)
         if not current_wlan:
             logs.append(f"WLAN {wlan_id} not found in current WLAN list")
             return False, "\n".join(logs)
-        
-        # Create a copy of the WLAN object with only the enabled field changed
-        updated_wlan = dict(current_wlan)
-        updated_wlan["enabled"] = bool(enabled)
-        
-        # Remove fields that might cause issues
-        for k in ("attr_hidden_id", "x_password", "x_passphrase_hash", "not_supported", "attr_no_delete"):
-            updated_wlan.pop(k, None)
-        
-        # Try different API endpoints in order of preference
-        endpoints = [
-            # Try the /upd/wlanconf endpoint (most common for updates)
-            f"/api/s/{site}/upd/wlanconf",
-            # Try the /rest/wlanconf endpoint with PUT
-            f"/api/s/{site}/rest/wlanconf/{wlan_id}",
-            # Try the /add/wlanconf endpoint (sometimes works for updates)
-            f"/api/s/{site}/add/wlanconf",
-        ]
-        
-        for endpoint in endpoints:
-            for proxy in (True, False):
-                try:
-                    url = self._u(endpoint, proxy_first=proxy)
-                    
-                    if "/upd/wlanconf" in endpoint:
-                        # For upd endpoint, send minimal data
-                        payload = {"_id": wlan_id, "enabled": bool(enabled)}
-                        r = self.sess.post(url, json=payload, timeout=20)
-                        s, b = rec(r)
-                        logs.append(f"POST upd -> {s} {b}")
-                        if s == 200:
-                            return True, "\n".join(logs)
-                    elif "/rest/wlanconf" in endpoint:
-                        # For REST endpoint, try PUT with full object
-                        r = self.sess.put(url, json=updated_wlan, timeout=20)
-                        s, b = rec(r)
-                        logs.append(f"PUT rest -> {s} {b}")
-                        if s == 200:
-                            return True, "\n".join(logs)
-                    else:
-                        # For add endpoint, send full object
-                        r = self.sess.post(url, json=updated_wlan, timeout=20)
-                        s, b = rec(r)
-                        logs.append(f"POST add -> {s} {b}")
-                        if s == 200:
-                            return True, "\n".join(logs)
-                            
-                except Exception as e:
-                    logs.append(f"{endpoint} EXC: {e}")
-
-        return False, "\n".join(logs)
-
+        ok = self._update_wlan_enabled(site, current_wlan, enabled, logs)
+        return ok, "\n".join(logs)
@@ -0,0 +1,122 @@
+import threading, time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+class DeviceDetailCache:
+    """Full stat/device entries fetched one device at a time, kept for a short TTL.
+
+    The device list only carries DeviceRecords; the detail panel asks for the selected device
+    here and the view prefetches its neighbours, so a selection walk costs one small request
+    per device rather than a whole-site refetch. Safe to call from worker threads.
+    """
+    def __init__(self, ctrl, ttl: float = 30.0, max_entries: int = 200):
+        self.ctrl = ctrl
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()  # (site, mac) -> (fetched_at, detail)
+        self._lock = threading.Lock()
+        # Device writes made through the controller (rename, adopt, locate...) drop the site's entries
+        ctrl.cache.add_listener(self._on_invalidated)
+
+    def _on_invalidated(self, tag: str):
+        if tag.startswith("devices:"):
+            self.invalidate(tag.split(":", 1)[1])
+
+    @staticmethod
+    def _key(site_key: str, mac: str) -> tuple:
+        return (site_key, (mac or "").lower())
+
+    def cached(self, site_key: str, mac: str) -> Optional[Dict]:
+        """The cached detail if it is still fresh, else None (never fetches)."""
+        key = self._key(site_key, mac)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is None or time.monotonic() - hit[0] > self.ttl:
+                return None
+            self._entries.move_to_end(key)
+            return hit[1]
+
+    def is_fresh(self, site_key: str, mac: str) -> bool:
+        return self.cached(site_key, mac) is not None
+
+    def get(self, site_key: str, mac: str, force: bool = False) -> Optional[Dict]:
+        """Cached detail, or fetch it through the single-device endpoint (blocking)."""
+        if not force:
+            hit = self.cached(site_key, mac)
+            if hit is not None:
+                return hit
+        detail = self.ctrl.get_device_detail(site_key, mac)
+        if detail is not None:
+            self.put(site_key, mac, detail)
+        return detail
+
+    def put(self, site_key: str, mac: str, detail: Dict):
+        key = self._key(site_key, mac)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), detail)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, site_key: Optional[str] = None, mac: Optional[str] = None):
+        """Drop one device, one site, or everything."""
+        with self._lock:
+            if site_key is None:
+                self._entries.clear()
+            elif mac is not None:
+                self._entries.pop(self._key(site_key, mac), None)
+            else:
+                for key in [k for k in self._entries if k[0] == site_key]:
+                    del self._entries[key]
+
+def format_detail(d: Dict) -> List[str]:
+    """Plain-text lines for the detail panel: identity, uplink chain, ports and radios."""
+    name = d.get("name") or d.get("hostname") or d.get("mac") or "Unknown"
+    lines = [f"{name}  ({d.get('model') or '?'})",
+             f"  MAC: {d.get('mac') or ''}    IP: {d.get('ip') or ''}",
+             f"  Firmware: {d.get('version') or ''}" + (f"  -> {d['upgrade_to_firmware']}" if d.get("upgrade_to_firmware") else ""),
+             f"  State: {'online' if d.get('state') == 1 else 'offline'}    Uptime: {_uptime(d.get('uptime'))}"]
+
+    upl = d.get("uplink") or {}
+    if upl:
+        lines.append("")
+        lines.append("Uplink")
+        peer = upl.get("uplink_device_name") or upl.get("uplink_mac") or ""
+        speed = upl.get("speed") or upl.get("link_speed") or upl.get("uplink_speed") or ""
+        duplex = "full" if upl.get("full_duplex") else ("half" if "full_duplex" in upl else "")
+        lines.append(f"  {upl.get('type') or 'wire'}  {speed} Mbps {duplex}".rstrip())
+        if peer:
+            port = upl.get("uplink_remote_port") or upl.get("port_idx") or ""
+            lines.append(f"  via {peer}" + (f" port {port}" if port else ""))
+
+    ports = [p for key in ("ethernet_table", "port_table") for p in (d.get(key) or []) if isinstance(p, dict)]
+    if ports:
+        lines.append("")
+        lines.append("Ports")
+        for i, p in enumerate(ports):
+            caps = p.get("speed_caps")
+            up = "up" if p.get("up") else ("down" if "up" in p else "")
+            parts = [p.get("name") or "", up, f"{p['speed']} Mbps" if p.get("speed") else "",
+                     f"caps={caps}" if caps is not None else ""]
+            lines.append(f"  {p.get('port_idx', i)}: " + " ".join(x for x in parts if x))
+
+    radios = d.get("radio_table_stats") or d.get("radio_table") or []
+    if radios:
+        lines.append("")
+        lines.append("Radios")
+        for r in radios:
+            if not isinstance(r, dict):
+                continue
+            lines.append(f"  {r.get('name') or r.get('radio') or '?'}: ch {r.get('channel', '')}"
+                         f"  tx {r.get('tx_power', '')} dBm  clients {r.get('num_sta', '')}"
+                         f"  util {r.get('cu_total', '')}%")
+    return lines
+
+def _uptime(seconds) -> str:
+    try:
+        s = int(seconds)
+    except (TypeError, ValueError):
+        return ""
+    d, s = divmod(s, 86400)
+    h, s = divmod(s, 3600)
+    return f"{d}d {h}h {s // 60}m" if d else f"{h}h {s // 60}m"
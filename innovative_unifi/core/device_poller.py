@@ -0,0 +1,112 @@
+import threading, time, weakref
+from typing import List, Dict, Callable, Optional, Iterable
+from .workers import run_bounded
+
+class DevicePoller:
+    """One poll loop shared by every device a bulk job is waiting on.
+    Each round fetches each watched site once (sites in parallel) and checks all
+    pending MACs against that snapshot, instead of every device polling on its own.
+    """
+    def __init__(self, ctrl, interval: float = 5.0, max_workers: int = 4):
+        self.ctrl = ctrl
+        self.log = ctrl.log
+        self.interval = interval
+        self.max_workers = max_workers
+
+    def snapshot(self, site_keys: Iterable[str]) -> Dict[str, Dict]:
+        """Return {mac: device} across the given sites; each device gets a '_site' key."""
+        by_mac: Dict[str, Dict] = {}
+        for site, devices, exc in run_bounded(self.ctrl.get_device_records, list(site_keys), self.max_workers):
+            if exc is not None:
+                self.log(f"Poller: failed to fetch devices for site {site}: {exc}")
+                continue
+            for d in devices or []:
+                mac = (d.get("mac") or "").lower()
+                if mac:
+                    d["_site"] = site
+                    by_mac[mac] = d
+        return by_mac
+
+    def wait_for(self, site_keys: List[str], predicates: Dict[str, Callable[[Dict], bool]], timeout: float,
+                 on_match: Optional[Callable[[str, Dict], None]] = None,
+                 on_poll: Optional[Callable[[Dict[str, Dict], int], None]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None) -> Dict[str, Dict]:
+        """Poll until every MAC in predicates has a device satisfying its predicate or timeout expires.
+        Returns {mac: device} for the MACs that matched; the rest timed out.
+        """
+        pending = {m.lower(): p for m, p in predicates.items()}
+        matched: Dict[str, Dict] = {}
+        deadline = time.monotonic() + timeout
+        while pending:
+            snap = self.snapshot(site_keys)
+            for mac in list(pending):
+                d = snap.get(mac)
+                try:
+                    hit = d is not None and pending[mac](d)
+                except Exception:
+                    hit = False
+                if hit:
+                    matched[mac] = d
+                    del pending[mac]
+                    if on_match:
+                        on_match(mac, d)
+            if on_poll:
+                on_poll(snap, len(pending))
+            if not pending or time.monotonic() >= deadline:
+                break
+            if should_stop and should_stop():
+                break
+            time.sleep(min(self.interval, max(0.0, deadline - time.monotonic())))
+        return matched
+
+# device-basic fields that decide whether the full list is worth re-reading
+_BASIC_FIELDS = ("state", "adopted", "disabled", "name", "model", "type")
+
+class DeviceListFeed:
+    """Device list for the periodic poll, reading stat/device-basic first.
+
+    device-basic has no IP, uplink, firmware or upgrade fields, which the devices table shows,
+    so the full list (get_device_records) is still needed, but only when the basic list changed
+    (a device added, removed, renamed or changing state), after a device write through the
+    controller or mark_stale(), or once full_interval has passed. Otherwise the previous full
+    list is returned as is. Controllers without device-basic get the full list every time.
+    """
+    def __init__(self, full_interval: float = 120.0):
+        self.full_interval = full_interval
+        self._lock = threading.Lock()
+        self._state: Dict[str, tuple] = {}  # site -> (ctrl, basic_signature, fetched_at, records)
+        self._caches = weakref.WeakSet()
+
+    @staticmethod
+    def _signature(basics: List[Dict]) -> frozenset:
+        return frozenset(((d.get("mac") or "").lower(),) + tuple(d.get(k) for k in _BASIC_FIELDS) for d in basics)
+
+    def mark_stale(self, site_key: Optional[str] = None):
+        """Make the next records() call read the full list (one site, or all)."""
+        with self._lock:
+            if site_key is None:
+                self._state.clear()
+            else:
+                self._state.pop(site_key, None)
+
+    def _on_invalidated(self, tag: str):
+        if tag.startswith("devices:"):
+            self.mark_stale(tag.split(":", 1)[1])
+
+    def records(self, ctrl, site_key: str) -> List:
+        with self._lock:
+            if ctrl.cache not in self._caches:
+                self._caches.add(ctrl.cache)
+                ctrl.cache.add_listener(self._on_invalidated)
+            prev = self._state.get(site_key)
+        basics = ctrl.get_device_basics(site_key)
+        if basics is None:
+            return ctrl.get_device_records(site_key)
+        sig = self._signature(basics)
+        if (prev is not None and prev[0] is ctrl and prev[1] == sig
+                and time.monotonic() - prev[2] < self.full_interval):
+            return prev[3]
+        records = ctrl.get_device_records(site_key)
+        with self._lock:
+            self._state[site_key] = (ctrl, sig, time.monotonic(), records)
+        return records
@@ -0,0 +1,142 @@
+import sys
+from typing import Dict, Iterable, List, Optional
+
+# Scalar controller fields the tool reads, kept as-is
+FIELDS = (
+    "mac", "_id", "device_id", "name", "hostname", "alias", "model", "type", "device_type", "serial",
+    "state", "connected", "ip", "adopted", "version", "upgradable", "need_upgrade", "upgrade_to_firmware",
+    "locating", "cfgversion", "last_seen",
+)
+# Repeated across a fleet, so one shared string object per distinct value
+_INTERNED = ("model", "type", "device_type", "version", "upgrade_to_firmware")
+# uplink sub-fields kept, stored flat as up_<name>
+UPLINK_FIELDS = ("speed", "link_speed", "uplink_speed", "port_idx", "uplink_mac", "uplink_device_name")
+_UP_SLOTS = tuple("up_" + f for f in UPLINK_FIELDS)
+_ATTRS = frozenset(FIELDS + ("_site",))
+
+def _port_caps(d: Dict) -> Optional[tuple]:
+    """(port_idx, max_speed_cap, ...) flattened from ethernet_table then port_table."""
+    out = []
+    for key in ("ethernet_table", "port_table"):
+        for p in d.get(key) or []:
+            if not isinstance(p, dict):
+                continue
+            caps = p.get("speed_caps")
+            if isinstance(caps, list):
+                cap = max(caps) if caps else 0
+            elif isinstance(caps, int):
+                cap = caps
+            else:
+                continue
+            out.extend((p.get("port_idx"), cap))
+    return tuple(out) if out else None
+
+class DeviceRecord:
+    """Compact stand-in for a controller device dict.
+
+    Keeps only the scalar FIELDS, the uplink keys and a flat (port, max speed_cap) summary of
+    the port tables, in slots rather than a per-device dict; stats, radio/vap tables and the
+    rest of stat/device are dropped. get()/[]/in behave like the dict they replace ('uplink'
+    and 'ethernet_table' are rebuilt on request), so existing d.get("name") code keeps working.
+    Other keys read from the full detail once attach_detail() has been called.
+    """
+    __slots__ = FIELDS + _UP_SLOTS + ("port_caps", "_site", "_detail", "_extra")
+
+    def __init__(self, data: Optional[Dict] = None, **fields):
+        for f in self.__slots__:
+            setattr(self, f, None)
+        if data:
+            self.update(data)
+        if fields:
+            self.update(fields)
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "DeviceRecord":
+        return cls(d)
+
+    def update(self, d: Dict):
+        for k in FIELDS:
+            if k in d:
+                v = d[k]
+                if k in _INTERNED and isinstance(v, str):
+                    v = sys.intern(v)
+                setattr(self, k, v)
+        upl = d.get("uplink")
+        if isinstance(upl, dict):
+            for f, slot in zip(UPLINK_FIELDS, _UP_SLOTS):
+                setattr(self, slot, upl.get(f))
+        if "ethernet_table" in d or "port_table" in d:
+            self.port_caps = _port_caps(d)
+        if "_site" in d:
+            self._site = d["_site"]
+
+    def _uplink(self) -> Optional[Dict]:
+        upl = {f: getattr(self, slot) for f, slot in zip(UPLINK_FIELDS, _UP_SLOTS) if getattr(self, slot) is not None}
+        return upl or None
+
+    # ----- dict compatibility -----
+    def get(self, key: str, default=None):
+        if key in _ATTRS:
+            v = getattr(self, key)
+            return default if v is None else v
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        if self._detail is not None:
+            return self._detail.get(key, default)
+        if key == "uplink":
+            upl = self._uplink()
+            return default if upl is None else upl
+        if key == "ethernet_table" and self.port_caps:
+            pc = self.port_caps
+            return [{"port_idx": pc[i], "speed_caps": [pc[i + 1]]} for i in range(0, len(pc), 2)]
+        return default
+
+    def __getitem__(self, key: str):
+        v = self.get(key)
+        if v is None:
+            raise KeyError(key)
+        return v
+
+    def __setitem__(self, key: str, value):
+        if key in _ATTRS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def keys(self) -> List[str]:
+        ks = [f for f in FIELDS if getattr(self, f) is not None]
+        if self._uplink() is not None:
+            ks.append("uplink")
+        if self.port_caps:
+            ks.append("ethernet_table")
+        if self._site is not None:
+            ks.append("_site")
+        for extra in (self._extra, self._detail):
+            if extra:
+                ks.extend(k for k in extra if k not in ks)
+        return ks
+
+    def to_dict(self) -> Dict:
+        return {k: self.get(k) for k in self.keys()}
+
+    # ----- full detail -----
+    @property
+    def has_detail(self) -> bool:
+        return self._detail is not None
+
+    def attach_detail(self, detail: Optional[Dict]):
+        """Attach the full stat/device entry for this device (see ControllerClient.get_device_detail)."""
+        self._detail = dict(detail) if detail else None
+        if detail:
+            self.update(detail)
+
+    def __repr__(self):
+        return f"DeviceRecord(mac={self.mac!r}, name={self.name!r}, model={self.model!r})"
+
+def to_records(devices: Iterable[Dict]) -> List[DeviceRecord]:
+    return [d if isinstance(d, DeviceRecord) else DeviceRecord(d) for d in devices]
@@ -0,0 +1,22 @@
+from typing import Dict
+
+def same_value(current, wanted) -> bool:
+    if current == wanted:
+        return True
+    # Controllers return some numbers as strings ("vlan": "10")
+    scalars = (str, int, float)
+    return (isinstance(current, scalars) and isinstance(wanted, scalars) and not isinstance(current, bool)
+            and not isinstance(wanted, bool) and str(current) == str(wanted))
+
+def diff_fields(current: Dict, wanted: Dict, ignored=()) -> Dict[str, tuple]:
+    """{field: (current, wanted)} for every wanted field outside ignored that differs. Secret
+    x_* fields only count when the controller returns them (they are not readable on every build)."""
+    changes = {}
+    for k, v in wanted.items():
+        if k in ignored:
+            continue
+        if k.startswith("x_") and k not in current:
+            continue
+        if not same_value(current.get(k), v):
+            changes[k] = (current.get(k), v)
+    return changes
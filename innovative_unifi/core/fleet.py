@@ -0,0 +1,222 @@
+import csv, json, threading, time
+from typing import List, Dict, Optional, Callable, Iterator, Tuple
+import paramiko
+from .workers import run_bounded
+
+RESULT_FIELDS = ["host", "name", "mac", "model", "ok", "exit_status", "latency_ms", "error", "stdout", "stderr"]
+
+class SSHPool:
+    """Keeps idle SSH connections per (host, user) so repeated fleet runs reuse them."""
+    def __init__(self, connect_timeout: float = 10.0):
+        self.connect_timeout = connect_timeout
+        self._idle: Dict[Tuple[str, str], paramiko.SSHClient] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str, username: str, password: str) -> paramiko.SSHClient:
+        key = (host, username)
+        with self._lock:
+            cli = self._idle.pop(key, None)
+        if cli is not None:
+            t = cli.get_transport()
+            if t is not None and t.is_active():
+                return cli
+            try:
+                cli.close()
+            except Exception:
+                pass
+        cli = paramiko.SSHClient()
+        cli.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        cli.connect(host, username=username, password=password, timeout=self.connect_timeout,
+                    banner_timeout=self.connect_timeout, auth_timeout=self.connect_timeout,
+                    look_for_keys=False, allow_agent=False)
+        return cli
+
+    def release(self, host: str, username: str, cli: paramiko.SSHClient, broken: bool = False):
+        if broken:
+            try:
+                cli.close()
+            except Exception:
+                pass
+            return
+        with self._lock:
+            old = self._idle.pop((host, username), None)
+            self._idle[(host, username)] = cli
+        if old is not None and old is not cli:
+            try:
+                old.close()
+            except Exception:
+                pass
+
+    def close_all(self):
+        with self._lock:
+            clients = list(self._idle.values())
+            self._idle.clear()
+        for cli in clients:
+            try:
+                cli.close()
+            except Exception:
+                pass
+
+def exec_with_deadline(cli: paramiko.SSHClient, command: str, timeout: float, max_output: int = 256 * 1024) -> Tuple[int, str, str, bool]:
+    """Run command on an open client. Returns (exit_status, stdout, stderr, timed_out).
+    Output collected before the deadline is kept even when the command times out (e.g. a log tail).
+    """
+    chan = cli.get_transport().open_session(timeout=timeout)
+    chan.settimeout(timeout)
+    chan.exec_command(command)
+    out, err = bytearray(), bytearray()
+    deadline = time.monotonic() + timeout
+    timed_out = False
+    while True:
+        busy = False
+        if chan.recv_ready():
+            out += chan.recv(32768)
+            busy = True
+        if chan.recv_stderr_ready():
+            err += chan.recv_stderr(32768)
+            busy = True
+        if chan.exit_status_ready() and not chan.recv_ready() and not chan.recv_stderr_ready():
+            break
+        if time.monotonic() >= deadline:
+            timed_out = True
+            break
+        if not busy:
+            time.sleep(0.02)
+    status = chan.recv_exit_status() if not timed_out else -1
+    chan.close()
+    return (status,
+            bytes(out[:max_output]).decode("utf-8", errors="ignore"),
+            bytes(err[:max_output]).decode("utf-8", errors="ignore"),
+            timed_out)
+
+def targets_from_devices(devices: List[Dict], device_type: Optional[str] = "uap", online_only: bool = True) -> List[Dict]:
+    """Build fleet targets ({'host','name','mac','model','adopted'}) from a site's device list."""
+    out = []
+    seen = set()
+    for d in devices:
+        ip = (d.get("ip") or "").strip()
+        if not ip or ip in seen:
+            continue
+        dtype = (d.get("type") or d.get("device_type") or "").lower()
+        if device_type and device_type not in dtype:
+            continue
+        if online_only and not (d.get("state") == 1 or d.get("connected")):
+            continue
+        seen.add(ip)
+        out.append({
+            "host": ip,
+            "name": d.get("name") or d.get("hostname") or "",
+            "mac": (d.get("mac") or "").lower(),
+            "model": d.get("model") or "",
+            "adopted": bool(d.get("adopted")),
+        })
+    return out
+
+class FleetRunner:
+    """Runs one shell command across many devices over pooled SSH with bounded parallelism."""
+    def __init__(self, ctrl, max_workers: int = 16, timeout: float = 20.0, connect_timeout: float = 10.0, pool: Optional[SSHPool] = None):
+        self.ctrl = ctrl
+        self.log = ctrl.log
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.pool = pool or SSHPool(connect_timeout=connect_timeout)
+
+    def site_targets(self, site_key: str, device_type: Optional[str] = "uap", online_only: bool = True) -> List[Dict]:
+        return targets_from_devices(self.ctrl.get_device_records(site_key), device_type, online_only)
+
+    def _credentials(self, site_key: Optional[str], username: Optional[str], password: Optional[str]):
+        """Resolve (adopted_creds, default_creds) once per run instead of once per host."""
+        default = (self.ctrl.ssh_user, self.ctrl.ssh_pass)
+        if username or password:
+            explicit = (username or self.ctrl.ssh_user, password or self.ctrl.ssh_pass)
+            return explicit, explicit
+        adopted = default
+        if site_key:
+            creds = self.ctrl.get_site_ssh_credentials(site_key)
+            if creds:
+                adopted = (creds.get("username", self.ctrl.ssh_user), creds.get("password", self.ctrl.ssh_pass))
+        return adopted, default
+
+    def _run_one(self, target: Dict, command: str, creds: Tuple[str, str]) -> Dict:
+        host = target["host"]
+        user, pw = creds
+        res = {k: target.get(k, "") for k in ("host", "name", "mac", "model")}
+        res.update({"ok": False, "exit_status": None, "stdout": "", "stderr": "", "error": ""})
+        t0 = time.monotonic()
+        cli = None
+        broken = False
+        try:
+            cli = self.pool.acquire(host, user, pw)
+            status, out, err, timed_out = exec_with_deadline(cli, command, self.timeout)
+            res.update({"exit_status": status, "stdout": out, "stderr": err})
+            if timed_out:
+                res["error"] = f"timeout after {self.timeout:g}s"
+                broken = True
+            else:
+                res["ok"] = status == 0
+        except Exception as e:
+            res["error"] = str(e) or e.__class__.__name__
+            broken = True
+        finally:
+            if cli is not None:
+                self.pool.release(host, user, cli, broken=broken)
+        res["latency_ms"] = int((time.monotonic() - t0) * 1000)
+        return res
+
+    def iter_run(self, targets: List[Dict], command: str, site_key: Optional[str] = None,
+                 username: Optional[str] = None, password: Optional[str] = None) -> Iterator[Dict]:
+        """Yield one result dict per host as soon as that host finishes."""
+        adopted_creds, default_creds = self._credentials(site_key, username, password)
+        self.log(f"Fleet: running '{command}' on {len(targets)} host(s), {self.max_workers} at a time")
+
+        def work(t):
+            return self._run_one(t, command, adopted_creds if t.get("adopted", True) else default_creds)
+
+        for t, res, exc in run_bounded(work, targets, self.max_workers):
+            if exc is not None:
+                res = {k: t.get(k, "") for k in ("host", "name", "mac", "model")}
+                res.update({"ok": False, "exit_status": None, "stdout": "", "stderr": "", "error": str(exc), "latency_ms": 0})
+            yield res
+
+    def run(self, targets: List[Dict], command: str, site_key: Optional[str] = None,
+            username: Optional[str] = None, password: Optional[str] = None,
+            on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        results = []
+        t0 = time.monotonic()
+        for res in self.iter_run(targets, command, site_key, username, password):
+            results.append(res)
+            self.log(f"Fleet: {res['host']} {'OK' if res['ok'] else 'FAIL'} in {res['latency_ms']} ms"
+                     + (f" ({res['error']})" if res["error"] else ""))
+            if on_result:
+                on_result(res)
+        ok = sum(1 for r in results if r["ok"])
+        self.log(f"Fleet: {ok}/{len(results)} succeeded in {time.monotonic() - t0:.1f}s")
+        return results
+
+    def close(self):
+        self.pool.close_all()
+
+def format_table(results: List[Dict], width: int = 60) -> str:
+    """Plain-text summary table: host, name, status, latency and first output line."""
+    rows = [("HOST", "NAME", "STATUS", "MS", "OUTPUT")]
+    for r in sorted(results, key=lambda x: x.get("host", "")):
+        first = (r.get("stdout") or r.get("error") or r.get("stderr") or "").strip().splitlines()
+        status = "ok" if r.get("ok") else ("error" if r.get("error") else f"exit {r.get('exit_status')}")
+        rows.append((r.get("host", ""), r.get("name", ""), status, str(r.get("latency_ms", "")), (first[0] if first else "")[:width]))
+    widths = [max(len(row[i]) for row in rows) for i in range(4)]
+    lines = []
+    for row in rows:
+        lines.append("  ".join(row[i].ljust(widths[i]) for i in range(4)) + "  " + row[4])
+    return "\n".join(lines)
+
+def export_jsonl(results: List[Dict], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        for r in results:
+            f.write(json.dumps({k: r.get(k) for k in RESULT_FIELDS}) + "\n")
+
+def export_csv(results: List[Dict], path: str):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=RESULT_FIELDS, extrasaction="ignore")
+        w.writeheader()
+        for r in results:
+            w.writerow(r)
@@ -0,0 +1,74 @@
+import json, os, threading, time
+from typing import Dict, Optional, List
+
+class Journal:
+    """Small JSON-file journal of per-item job state, keyed by id (usually a MAC or site key).
+    Every update is written through (tmp file + rename) so an interrupted job can resume.
+    """
+    def __init__(self, path: str, job: str = ""):
+        self.path = path
+        self.job = job
+        self._lock = threading.Lock()
+        self._data: Dict = {"job": job, "created": time.time(), "items": {}}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict) and isinstance(data.get("items"), dict):
+                self._data = data
+        except Exception:
+            pass
+
+    def _save(self):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, indent=2)
+            os.replace(tmp, self.path)
+        except Exception:
+            pass
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            item = self._data["items"].get(key)
+            return dict(item) if item else None
+
+    def update(self, key: str, **fields) -> Dict:
+        with self._lock:
+            item = self._data["items"].setdefault(key, {})
+            item.update(fields)
+            item["updated"] = time.time()
+            self._save()
+            return dict(item)
+
+    def status(self, key: str) -> str:
+        item = self.get(key)
+        return (item or {}).get("status", "")
+
+    def items(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {k: dict(v) for k, v in self._data["items"].items()}
+
+    def keys_with_status(self, *statuses: str) -> List[str]:
+        with self._lock:
+            return [k for k, v in self._data["items"].items() if v.get("status") in statuses]
+
+    def meta(self, key: str, default=None):
+        with self._lock:
+            return self._data.get("meta", {}).get(key, default)
+
+    def set_meta(self, key: str, value):
+        with self._lock:
+            self._data.setdefault("meta", {})[key] = value
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self._data = {"job": self.job, "created": time.time(), "items": {}}
+            self._save()
+
+def default_journal_path(job: str) -> str:
+    home = os.path.expanduser("~")
+    return os.path.join(home, f".innovative_unifi_{job}_journal.json")
@@ -0,0 +1,117 @@
+import codecs, json
+from typing import Iterable, Iterator, Optional, Sequence
+
+_WS = " \t\r\n"
+_END = ",]}" + _WS
+_decoder = json.JSONDecoder()
+
+class _Buffer:
+    """Decoded text from an iterable of byte chunks, with a read position and compaction."""
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self) -> bool:
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            if chunk:
+                if self.pos > 65536:
+                    self.text = self.text[self.pos:]
+                    self.pos = 0
+                self.text += self._utf8.decode(chunk)
+                return True
+        self.text += self._utf8.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input); the position moves onto it."""
+        while True:
+            n = len(self.text)
+            while self.pos < n and self.text[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < n:
+                return self.text[self.pos]
+            if not self.more():
+                return ""
+
+    def value(self):
+        """Decode the JSON value at the current position, reading more input until it is complete."""
+        self.peek()  # raw_decode does not skip leading whitespace
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.text, self.pos)
+                # A number cut by a chunk boundary ('12' of '125', '3.' of '3.5e2') decodes
+                # early; only accept it once the character after it ends a value
+                cut = isinstance(obj, (int, float)) and (end == len(self.text) or self.text[end] not in _END)
+                if self.eof or not cut:
+                    self.pos = end
+                    return obj
+            except ValueError:
+                if self.eof:
+                    raise
+            if not self.more():
+                obj, end = _decoder.raw_decode(self.text, self.pos)
+                self.pos = end
+                return obj
+
+    def expect(self, ch: str):
+        if self.peek() != ch:
+            raise ValueError(f"expected {ch!r} at offset {self.pos}")
+        self.pos += 1
+
+def _iter_array(buf: _Buffer) -> Iterator:
+    buf.expect("[")
+    if buf.peek() == "]":
+        buf.pos += 1
+        return
+    while True:
+        yield buf.value()
+        c = buf.peek()
+        buf.pos += 1
+        if c == "]":
+            return
+        if c != ",":
+            raise ValueError(f"expected ',' or ']' at offset {buf.pos - 1}")
+
+def iter_json_array(chunks: Iterable[bytes], keys: Sequence[str] = ("data",)) -> Iterator:
+    """Yield the elements of a JSON array one at a time while the body is still arriving.
+
+    The body may be a top-level array, or an object whose first top-level array under one of
+    keys is streamed (e.g. UniFi's {"meta": {...}, "data": [...]}). Other top-level values are
+    decoded and skipped. If no key matches, the first top-level array is used instead. Each
+    element is decoded by the stdlib json C scanner, so only one element is materialized at once.
+    """
+    buf = _Buffer(chunks)
+    c = buf.peek()
+    if c == "[":
+        yield from _iter_array(buf)
+        return
+    if c != "{":
+        return
+    buf.pos += 1
+    fallback: Optional[list] = None
+    while True:
+        c = buf.peek()
+        if c == "}" or not c:
+            break
+        key = buf.value()
+        buf.expect(":")
+        if key in keys and buf.peek() == "[":
+            yield from _iter_array(buf)
+            return
+        v = buf.value()
+        if fallback is None and isinstance(v, list):
+            fallback = v
+        if buf.peek() == ",":
+            buf.pos += 1
+    if fallback:
+        yield from fallback
+
+def iter_response_items(resp, keys: Sequence[str] = ("data",), chunk_size: int = 65536) -> Iterator:
+    """iter_json_array over a requests response opened with stream=True."""
+    return iter_json_array(resp.iter_content(chunk_size=chunk_size), keys)
@@ -1,7 +1,107 @@
+import re, threading, time
+from collections import deque
+from typing import Dict, List, Tuple
 from PyQt5 import QtCore
 
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+# (seq, timestamp, level, source, text)
+Record = Tuple[int, float, int, str, str]
+
+_DIGITS = re.compile(r"\d+")
+
+def _template(text: str) -> str:
+    """Rate-limit key for a message: its start with numbers blanked, so 'Polled 12 devices' and
+    'Polled 13 devices' share a window but a different message from the same source does not."""
+    return _DIGITS.sub("#", text[:60])
+
+def format_record(rec: Record) -> str:
+    _seq, ts, level, source, text = rec
+    stamp = time.strftime("%H:%M:%S", time.localtime(ts))
+    tag = f"{LEVEL_NAMES.get(level, level)} " if level != INFO else ""
+    return f"[{stamp}] {tag}{text}" if source in ("", "app") else f"[{stamp}] {tag}{source}: {text}"
+
 class LogBus(QtCore.QObject):
+    """Thread-safe log sink shared by the controller client and the views.
+
+    log(text) keeps its old signature; level and source are optional. Records go into a
+    fixed-size ring buffer that the log view reads in batches (records_since), and each kind of
+    message (source plus the start of the text, numbers ignored) is limited to rate_limit records
+    per rate_window seconds; the number dropped is reported once the window reopens. message is still emitted for records at or above
+    emit_level, for listeners that want every line.
+    """
     message = QtCore.pyqtSignal(str)
 
-    def log(self, text: str):
-        self.message.emit(text)
+    def __init__(self, capacity: int = 5000, rate_limit: int = 50, rate_window: float = 5.0,
+                 emit_level: int = INFO, parent=None):
+        super().__init__(parent)
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.emit_level = emit_level
+        self._buf: deque = deque(maxlen=capacity)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._windows: Dict[tuple, List] = {}   # (source, template) -> [window_start, count, suppressed]
+
+    def log(self, text: str, level: int = INFO, source: str = "app"):
+        now = time.time()
+        text = str(text)
+        out: List[Record] = []
+        with self._lock:
+            if len(self._windows) > 1000:
+                self._prune(now, out)
+            key = (source, _template(text))
+            win = self._windows.get(key)
+            if win is None or now - win[0] >= self.rate_window:
+                if win is not None and win[2]:
+                    self._seq += 1
+                    out.append((self._seq, now, WARNING, source, f"{win[2]} message(s) like '{key[1]}' suppressed (rate limit)"))
+                win = self._windows[key] = [now, 0, 0]
+            win[1] += 1
+            if win[1] > self.rate_limit and level < ERROR:
+                win[2] += 1
+                return
+            self._seq += 1
+            out.append((self._seq, now, level, source, text))
+            self._buf.extend(out)
+        for rec in out:
+            if rec[2] >= self.emit_level:
+                self.message.emit(format_record(rec))
+
+    def _prune(self, now: float, out: List[Record]):
+        """Forget closed windows (lock held), reporting any that still owe a suppressed count."""
+        for key, win in list(self._windows.items()):
+            if now - win[0] >= self.rate_window:
+                if win[2]:
+                    self._seq += 1
+                    out.append((self._seq, now, WARNING, key[0], f"{win[2]} message(s) like '{key[1]}' suppressed (rate limit)"))
+                del self._windows[key]
+
+    def debug(self, text: str, source: str = "app"):
+        self.log(text, DEBUG, source)
+
+    def info(self, text: str, source: str = "app"):
+        self.log(text, INFO, source)
+
+    def warning(self, text: str, source: str = "app"):
+        self.log(text, WARNING, source)
+
+    def error(self, text: str, source: str = "app"):
+        self.log(text, ERROR, source)
+
+    def records_since(self, seq: int, min_level: int = DEBUG) -> List[Record]:
+        """Buffered records newer than seq (oldest first). Records already evicted are skipped."""
+        out: List[Record] = []
+        with self._lock:
+            for r in reversed(self._buf):
+                if r[0] <= seq:
+                    break
+                if r[2] >= min_level:
+                    out.append(r)
+        out.reverse()
+        return out
+
+    def last_seq(self) -> int:
+        with self._lock:
+            return self._seq
@@ -0,0 +1,161 @@
+import time
+from typing import List, Dict, Optional, Callable
+from .fleet import SSHPool, exec_with_deadline
+from .device_poller import DevicePoller
+from .journal import Journal, default_journal_path
+from .workers import run_bounded
+
+# Journal statuses, in the order a device moves through them
+PENDING = "pending"
+INFORM_SET = "inform_set"
+ARRIVED = "arrived"
+FAILED = "failed"
+TIMEOUT = "timeout"
+
+class InformMigration:
+    """Moves devices to a new controller: set-inform over SSH on every device of one or more
+    sites (bounded parallelism), then confirms arrival on the target controller with one shared poller.
+    Progress lives in a journal so a re-run after an interruption skips finished devices
+    and retries the ones that failed or never arrived.
+
+    target_ctrl is a ControllerClient logged in to the new controller; when omitted, arrival
+    is not confirmed and devices stop at 'inform_set'.
+    """
+    def __init__(self, ctrl, inform_url: str, target_ctrl=None, target_sites: Optional[List[str]] = None,
+                 journal_path: Optional[str] = None, max_workers: int = 16, ssh_timeout: float = 20.0,
+                 pool: Optional[SSHPool] = None):
+        self.ctrl = ctrl
+        self.log = ctrl.log
+        self.inform_url = inform_url.rstrip("/")
+        self.target_ctrl = target_ctrl
+        self.target_sites = target_sites or ["default"]
+        self.journal = Journal(journal_path or default_journal_path("migration"), job="inform-migration")
+        self.max_workers = max_workers
+        self.ssh_timeout = ssh_timeout
+        self.pool = pool or SSHPool()
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def _collect(self, site_keys: List[str]) -> List[Dict]:
+        """Read every source site's device list (sites in parallel) into migration targets."""
+        out = []
+        for site, devices, exc in run_bounded(self.ctrl.get_device_records, site_keys, self.max_workers):
+            if exc is not None:
+                self.log(f"Migration: could not list devices for {site}: {exc}")
+                continue
+            for d in devices or []:
+                mac = (d.get("mac") or "").lower()
+                ip = (d.get("ip") or "").strip()
+                if mac and ip:
+                    out.append({"mac": mac, "ip": ip, "site": site,
+                                "name": d.get("name") or d.get("hostname") or "",
+                                "adopted": bool(d.get("adopted"))})
+        return out
+
+    def _site_creds(self, site_keys: List[str]) -> Dict[str, tuple]:
+        creds = {}
+        for site in site_keys:
+            c = self.ctrl.get_site_ssh_credentials(site)
+            if c:
+                creds[site] = (c.get("username", self.ctrl.ssh_user), c.get("password", self.ctrl.ssh_pass))
+            else:
+                creds[site] = (self.ctrl.ssh_user, self.ctrl.ssh_pass)
+        return creds
+
+    def _set_inform(self, dev: Dict, creds: tuple) -> Dict:
+        user, pw = creds if dev["adopted"] else (self.ctrl.ssh_user, self.ctrl.ssh_pass)
+        t0 = time.monotonic()
+        cli = None
+        broken = False
+        try:
+            cli = self.pool.acquire(dev["ip"], user, pw)
+            status, out, err, timed_out = exec_with_deadline(cli, f"mca-cli-op set-inform {self.inform_url}", self.ssh_timeout)
+            broken = timed_out
+            if timed_out:
+                return {"ok": False, "error": f"timeout after {self.ssh_timeout:g}s", "inform_ms": int((time.monotonic() - t0) * 1000)}
+            text = (out + err).lower()
+            ok = status == 0 and "error" not in text and "failed" not in text
+            return {"ok": ok, "error": "" if ok else (err or out).strip()[:300],
+                    "inform_ms": int((time.monotonic() - t0) * 1000)}
+        except Exception as e:
+            broken = True
+            return {"ok": False, "error": str(e), "inform_ms": int((time.monotonic() - t0) * 1000)}
+        finally:
+            if cli is not None:
+                self.pool.release(dev["ip"], user, cli, broken=broken)
+
+    def run(self, site_keys: List[str], arrival_timeout: float = 600.0,
+            on_progress: Optional[Callable[[str, Dict], None]] = None) -> List[Dict]:
+        """Migrate every device in site_keys. Returns the journal record of each device."""
+        self._stop = False
+        t_start = time.monotonic()
+        if self.journal.meta("inform_url") not in (None, self.inform_url):
+            self.log("Migration: journal belongs to a different inform URL, starting fresh")
+            self.journal.clear()
+        self.journal.set_meta("inform_url", self.inform_url)
+
+        devices = self._collect(site_keys)
+        todo = []
+        for d in devices:
+            st = self.journal.status(d["mac"])
+            if st in (INFORM_SET, ARRIVED):
+                continue
+            self.journal.update(d["mac"], status=PENDING, ip=d["ip"], site=d["site"], name=d["name"], error="")
+            todo.append(d)
+        skipped = len(devices) - len(todo)
+        self.log(f"Migration: {len(todo)} device(s) to set-inform, {skipped} already done from a previous run")
+
+        creds = self._site_creds(sorted(set(d["site"] for d in todo)))
+        run_t0 = time.time()
+
+        def work(d):
+            if self._stop:
+                return {"ok": False, "error": "stopped", "inform_ms": 0}
+            return self._set_inform(d, creds.get(d["site"], (self.ctrl.ssh_user, self.ctrl.ssh_pass)))
+
+        for d, res, exc in run_bounded(work, todo, self.max_workers):
+            res = res or {"ok": False, "error": str(exc), "inform_ms": 0}
+            if res["ok"]:
+                rec = self.journal.update(d["mac"], status=INFORM_SET, inform_ms=res["inform_ms"], inform_at=time.time())
+            else:
+                rec = self.journal.update(d["mac"], status=FAILED, inform_ms=res["inform_ms"], error=res["error"])
+            self.log(f"Migration: {d['ip']} ({d['mac']}) {'inform set' if res['ok'] else 'FAILED: ' + res['error']} in {res['inform_ms']} ms")
+            if on_progress:
+                on_progress(d["mac"], rec)
+
+        waiting = self.journal.keys_with_status(INFORM_SET)
+        if self.target_ctrl is not None and waiting and not self._stop:
+            self.log(f"Migration: waiting for {len(waiting)} device(s) to reach the target controller")
+            poller = DevicePoller(self.target_ctrl)
+
+            def arrived(mac, dev):
+                item = self.journal.get(mac) or {}
+                started = item.get("inform_at") or run_t0
+                rec = self.journal.update(mac, status=ARRIVED, target_site=dev.get("_site", ""),
+                                          arrival_s=round(time.time() - started, 1))
+                if on_progress:
+                    on_progress(mac, rec)
+
+            poller.wait_for(self.target_sites, {m: (lambda dev: True) for m in waiting}, arrival_timeout,
+                            on_match=arrived, should_stop=lambda: self._stop)
+            if not self._stop:
+                for mac in self.journal.keys_with_status(INFORM_SET):
+                    self.journal.update(mac, status=TIMEOUT, error="not seen on target controller")
+
+        # Devices that already left the source controller are still reported from the journal
+        report = [dict(v, mac=k) for k, v in self.journal.items().items() if v.get("site") in site_keys]
+        done = sum(1 for r in report if r.get("status") in (ARRIVED, INFORM_SET))
+        self.log(f"Migration: {done}/{len(report)} device(s) migrated in {time.monotonic() - t_start:.1f}s")
+        return report
+
+    def close(self):
+        self.pool.close_all()
+
+def format_report(report: List[Dict]) -> str:
+    lines = ["MAC                IP               SITE         STATUS      INFORM_MS  ARRIVAL_S  ERROR"]
+    for r in sorted(report, key=lambda x: (x.get("site", ""), x.get("ip", ""))):
+        lines.append(f"{r.get('mac',''):<18} {r.get('ip',''):<16} {r.get('site',''):<12} {r.get('status',''):<11} "
+                     f"{str(r.get('inform_ms','')):>9}  {str(r.get('arrival_s','')):>9}  {r.get('error','')}")
+    return "\n".join(lines)
@@ -0,0 +1,117 @@
+import csv, json, re, time
+from typing import List, Dict, Optional, Callable
+from .workers import run_bounded
+
+KEY_COLUMNS = ("mac", "serial", "mac address", "serial number", "sn")
+NAME_COLUMNS = ("name", "alias", "device name", "hostname")
+
+def normalize_mac(value: str) -> str:
+    """'AA-BB-CC-DD-EE-FF', 'aabb.ccdd.eeff' and 'AABBCCDDEEFF' all become 'aa:bb:cc:dd:ee:ff'."""
+    hexdigits = re.sub(r"[^0-9a-fA-F]", "", value or "").lower()
+    if len(hexdigits) != 12:
+        return ""
+    return ":".join(hexdigits[i:i + 2] for i in range(0, 12, 2))
+
+def _pick(row: Dict, names) -> str:
+    lowered = {(k or "").strip().lower(): v for k, v in row.items()}
+    for n in names:
+        v = lowered.get(n)
+        if v not in (None, ""):
+            return str(v).strip()
+    return ""
+
+def load_name_rows(path: str) -> List[Dict]:
+    """Read a MAC/serial → name mapping from CSV or JSON.
+    CSV needs a header with a mac or serial column and a name/alias column.
+    JSON may be a list of such objects or a plain {"mac-or-serial": "name"} object.
+    Returns [{'line', 'key', 'name'}].
+    """
+    rows: List[Dict] = []
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = [{"mac": k, "name": v} for k, v in data.items()]
+        for i, item in enumerate(data or [], 1):
+            if isinstance(item, dict):
+                rows.append({"line": i, "key": _pick(item, KEY_COLUMNS), "name": _pick(item, NAME_COLUMNS)})
+        return rows
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for i, item in enumerate(csv.DictReader(f), 2):
+            rows.append({"line": i, "key": _pick(item, KEY_COLUMNS), "name": _pick(item, NAME_COLUMNS)})
+    return rows
+
+class BulkNamer:
+    """Applies a name list to a site: one device-list fetch to resolve every row, then the
+    rest/device renames run concurrently on a bounded pool. Every row gets a result entry.
+    """
+    def __init__(self, ctrl, max_workers: int = 16):
+        self.ctrl = ctrl
+        self.log = ctrl.log
+        self.max_workers = max_workers
+
+    def resolve(self, rows: List[Dict], devices: List[Dict]) -> List[Dict]:
+        by_mac: Dict[str, Dict] = {}
+        by_serial: Dict[str, Dict] = {}
+        for d in devices:
+            mac = normalize_mac(d.get("mac") or "")
+            if mac:
+                by_mac[mac] = d
+            serial = (d.get("serial") or "").strip().lower()
+            if serial:
+                by_serial[serial] = d
+        out = []
+        for row in rows:
+            res = dict(row, mac="", device_id="", old_name="", status="", error="", ms=0)
+            if not row.get("key") or not row.get("name"):
+                res.update(status="invalid", error="missing MAC/serial or name")
+                out.append(res)
+                continue
+            d = by_mac.get(normalize_mac(row["key"])) or by_serial.get(row["key"].strip().lower())
+            if not d:
+                res.update(status="not_found", error="no device with this MAC/serial in site")
+            else:
+                res.update(mac=(d.get("mac") or "").lower(), device_id=d.get("_id") or d.get("device_id") or "",
+                           old_name=d.get("name") or "")
+                if not res["device_id"]:
+                    res.update(status="failed", error="device has no controller id")
+                elif res["old_name"] == row["name"]:
+                    res["status"] = "unchanged"
+            out.append(res)
+        return out
+
+    def apply(self, site_key: str, rows: List[Dict], devices: Optional[List[Dict]] = None,
+              on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        t0 = time.monotonic()
+        if devices is None:
+            devices = self.ctrl.get_device_records(site_key)
+        report = self.resolve(rows, devices)
+        todo = [r for r in report if not r["status"]]
+
+        def rename(r):
+            t = time.monotonic()
+            ok = self.ctrl.set_device_name(site_key, r["device_id"], r["name"])
+            return ok, int((time.monotonic() - t) * 1000)
+
+        for r, res, exc in run_bounded(rename, todo, self.max_workers):
+            if exc is not None:
+                r.update(status="failed", error=str(exc))
+            else:
+                ok, ms = res
+                r.update(status="ok" if ok else "failed", ms=ms, error="" if ok else "controller rejected rename")
+            if on_result:
+                on_result(r)
+        counts: Dict[str, int] = {}
+        for r in report:
+            counts[r["status"]] = counts.get(r["status"], 0) + 1
+        summary = ", ".join(f"{v} {k}" for k, v in sorted(counts.items()))
+        self.log(f"Bulk naming on {site_key}: {summary} in {time.monotonic() - t0:.1f}s")
+        return report
+
+def format_report(report: List[Dict]) -> str:
+    lines = ["LINE  KEY                NAME                      STATUS      MS     DETAIL"]
+    for r in report:
+        detail = r.get("error") or (f"was '{r['old_name']}'" if r.get("old_name") else "")
+        lines.append(f"{r.get('line',''):<5} {r.get('key',''):<18} {r.get('name',''):<25} {r.get('status',''):<11} "
+                     f"{r.get('ms',0):<6} {detail}")
+    return "\n".join(lines)
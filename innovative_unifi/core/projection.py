@@ -0,0 +1,129 @@
+from typing import Callable, Dict, List, Optional
+from .capabilities import max_uplink_mbps
+from .logger_bus import DEBUG
+
+def fmt_speed(mbps) -> str:
+    try:
+        m = float(mbps)
+        if m >= 1000:
+            g = m/1000.0
+            if abs(round(g) - g) < 1e-6:
+                return f"{int(round(g))} Gbps"
+            return f"{g:.1f} Gbps"
+        return f"{int(m)} Mbps"
+    except Exception:
+        return str(mbps)
+
+def update_status(dev: Dict) -> str:
+    """'Yes' when the controller reports a firmware update for the device, else 'No'."""
+    try:
+        if dev.get("upgradable") or dev.get("need_upgrade") or dev.get("upgrade_to_firmware"):
+            return "Yes"
+        return "No"
+    except Exception:
+        return "Unknown"
+
+def _uplink_speed(dev: Dict):
+    upl = dev.get("uplink") or {}
+    return upl.get("speed") or upl.get("link_speed") or upl.get("uplink_speed") or ""
+
+def version_key(dev: Dict) -> tuple:
+    """Everything the derived record depends on. cfgversion changes with the device's
+    configuration (and so its port tables); the rest are the live fields shown in the views.
+    """
+    return (dev.get("cfgversion"), dev.get("model"), dev.get("type") or dev.get("device_type"),
+            dev.get("name") or dev.get("hostname"), dev.get("state"), dev.get("connected"), dev.get("ip"),
+            dev.get("adopted"), dev.get("upgradable"), dev.get("need_upgrade"), dev.get("upgrade_to_firmware"),
+            dev.get("locating"), str(_uplink_speed(dev)))
+
+class DeviceProjector:
+    """Computes the derived display fields for a device once per device version.
+
+    project(dev) returns the same record object for as long as the device's version_key is
+    unchanged, so callers can also cache anything they build from it by identity.
+    project_all()/retain() drop records for devices that are gone. log is called as
+    log(text, level); the caller's wrapper decides the source.
+    """
+    def __init__(self, log: Optional[Callable] = None):
+        self.log = log or (lambda *a, **k: None)
+        self._cache: Dict[str, tuple] = {}  # mac -> (version_key, record)
+        self.hits = 0
+        self.misses = 0
+
+    def project(self, dev: Dict) -> Dict:
+        mac = (dev.get("mac") or "").lower()
+        key = version_key(dev)
+        cached = self._cache.get(mac)
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        rec = self._derive(dev)
+        if mac:
+            self._cache[mac] = (key, rec)
+        return rec
+
+    def project_all(self, devices: List[Dict]) -> List[Dict]:
+        out = [self.project(d) for d in devices]
+        self.retain((d.get("mac") or "").lower() for d in devices)
+        return out
+
+    def retain(self, macs):
+        """Forget every device whose (lower-case) MAC is not in macs."""
+        keep = set(macs)
+        for mac in [m for m in self._cache if m not in keep]:
+            del self._cache[mac]
+
+    def clear(self):
+        self._cache.clear()
+
+    def _derive(self, d: Dict) -> Dict:
+        name = d.get("name") or d.get("hostname") or ""
+        model = d.get("model") or ""
+        dtype = d.get("type") or d.get("device_type") or ""
+        mac = d.get("mac") or ""
+        online = bool(d.get("state") == 1 or d.get("connected"))
+        link = _uplink_speed(d)
+        maxcap = max_uplink_mbps(d)
+        ip = d.get("ip") or ""
+        update = update_status(d)
+        locating = "ON" if d.get("locating") else "OFF"
+
+        # Flag uplinks negotiated below what the device can do
+        low_speed = False
+        threshold = None
+        try:
+            if link and maxcap:
+                link_speed = float(link)
+                device_type = dtype.lower()
+                if "switch" in device_type or "usw" in device_type:
+                    threshold = 1000  # switches: only warn below 1 Gbps
+                else:
+                    threshold = float(maxcap) * 0.8  # APs and others: 80% of max capability
+                low_speed = link_speed < threshold
+                if low_speed:
+                    self.log(f"LOW SPEED WARNING: {name} ({model}) - {link_speed}Mbps < {threshold}Mbps", DEBUG)
+            elif link and not maxcap:
+                self.log(f"Device {name} ({model}): Link={link}Mbps but no max capability detected", DEBUG)
+        except Exception as e:
+            self.log(f"Error checking speed threshold: {e}", DEBUG)
+
+        uplink_display = fmt_speed(link) if link else ""
+        if low_speed:
+            uplink_display = f"! {uplink_display}"
+        try:
+            link_sort = float(link) if link else -1.0
+        except (TypeError, ValueError):
+            link_sort = -1.0
+        try:
+            ip_sort = tuple(int(p) for p in ip.split(".")) if ip else ()
+        except ValueError:
+            ip_sort = ()
+        state = "online" if online else "offline"
+        return {
+            "mac": mac, "name": name, "model": model, "type": dtype, "online": online, "state": state,
+            "link": link, "max_mbps": maxcap, "uplink_display": uplink_display, "low_speed": low_speed,
+            "threshold": threshold, "ip": ip, "adopted": bool(d.get("adopted")), "update": update,
+            "locating": locating, "link_sort": link_sort, "ip_sort": ip_sort,
+            "search": " ".join([name, model, dtype, mac, state, str(link), str(maxcap or ""), ip, update, locating]).lower(),
+        }
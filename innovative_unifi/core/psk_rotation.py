@@ -0,0 +1,160 @@
+import fnmatch, hashlib, re, string, time
+from typing import Callable, Dict, List, Optional
+from .journal import Journal, default_journal_path
+from .workers import run_bounded, shared_limit
+
+# Journal statuses, in the order a WLAN moves through them
+PENDING = "pending"
+UPDATED = "updated"
+VERIFIED = "verified"
+UNVERIFIED = "unverified"  # update accepted, but this controller does not return x_passphrase
+FAILED = "failed"
+
+def valid_psk(psk: str) -> bool:
+    """WPA2 passphrase: 8-63 printable ASCII characters, or exactly 64 hex digits."""
+    if len(psk) == 64:
+        return all(c in string.hexdigits for c in psk)
+    return 8 <= len(psk) <= 63 and all(32 <= ord(c) < 127 for c in psk)
+
+def _fingerprint(psk: str) -> str:
+    # Identifies the rotation in the journal without writing the passphrase to disk
+    return hashlib.sha256(psk.encode("utf-8")).hexdigest()[:16]
+
+class PSKRotation:
+    """Sets a new passphrase on every WLAN whose name matches pattern, across sites.
+
+    plan() reads wlanconf for all sites concurrently and lists the matching WLANs without
+    writing, so the operator can confirm the list; apply() then updates them concurrently
+    (under the controller's shared WLAN write cap), and the changed sites are re-read in one
+    pass to verify. Each WLAN's state is journalled per site, so re-running the same rotation
+    after an interruption only touches WLANs that are not verified yet.
+
+    pattern is a shell-style glob on the SSID ('Guest*'), or a regular expression with regex=True.
+    """
+    def __init__(self, ctrl, pattern: str, new_psk: str, regex: bool = False, journal_path: Optional[str] = None,
+                 max_workers: int = 16, max_writes: int = 8):
+        if not valid_psk(new_psk):
+            raise ValueError("passphrase must be 8-63 printable characters or 64 hex digits")
+        self.ctrl = ctrl
+        self.log = ctrl.log
+        self.pattern = pattern
+        self.new_psk = new_psk
+        self._match = re.compile(pattern).search if regex else (lambda name: fnmatch.fnmatchcase(name, pattern))
+        self.journal = Journal(journal_path or default_journal_path("psk_rotation"), job="psk-rotation")
+        self.max_workers = max_workers
+        self.write_slots = shared_limit(f"wlan-writes:{ctrl.base}", max_writes)
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def _read_sites(self, site_keys: List[str]) -> Dict[str, List[Dict]]:
+        out = {}
+        for site, wlans, exc in run_bounded(self.ctrl.get_wlans, site_keys, self.max_workers):
+            if exc is not None:
+                self.log(f"PSK rotation: could not read WLANs for {site}: {exc}")
+                continue
+            out[site] = wlans or []
+        return out
+
+    def _update(self, item: Dict) -> bool:
+        if self._stop:
+            return False
+        with self.write_slots:
+            return self.ctrl.update_wlan(item["site"], item["wlan"], {"x_passphrase": self.new_psk})
+
+    def _same_rotation(self) -> bool:
+        return self.journal.meta("rotation") == [self.pattern, _fingerprint(self.new_psk)]
+
+    def plan(self, site_keys: Optional[List[str]] = None) -> List[Dict]:
+        """Read wlanconf on site_keys (default: every site) and list the matching WLANs, without
+        writing anything: [{key, site, ssid, wlan, status}], status being this rotation's journal
+        state ('' when not started, 'verified'/'unverified' when a previous run already did it)."""
+        if site_keys is None:
+            site_keys = [s.get("name") or s.get("key") for s in self.ctrl.get_sites()]
+            site_keys = [s for s in site_keys if s]
+        same = self._same_rotation()
+        plan = []
+        for site, wlans in self._read_sites(site_keys).items():
+            for w in wlans:
+                name = w.get("name") or ""
+                if not w.get("_id") or not self._match(name):
+                    continue
+                key = f"{site}/{w['_id']}"
+                plan.append({"key": key, "site": site, "ssid": name, "wlan": w,
+                             "status": self.journal.status(key) if same else ""})
+        self.log(f"PSK rotation: {len(plan)} WLAN(s) match '{self.pattern}' on {len(site_keys)} site(s)")
+        return sorted(plan, key=lambda x: (x["site"], x["ssid"]))
+
+    def apply(self, plan: List[Dict], on_progress: Optional[Callable[[str, Dict], None]] = None) -> List[Dict]:
+        """Update and verify the planned WLANs (those not already rotated). Returns the journal
+        record of each planned WLAN."""
+        self._stop = False
+        t_start = time.monotonic()
+        if not self._same_rotation():
+            if self.journal.meta("rotation") is not None:
+                self.log("PSK rotation: journal belongs to a different rotation, starting fresh")
+                self.journal.clear()
+            self.journal.set_meta("rotation", [self.pattern, _fingerprint(self.new_psk)])
+
+        todo = []
+        for item in plan:
+            if self.journal.status(item["key"]) in (VERIFIED, UNVERIFIED):
+                continue
+            self.journal.update(item["key"], status=PENDING, site=item["site"], ssid=item["ssid"], error="")
+            todo.append(item)
+        self.log(f"PSK rotation: updating {len(todo)} WLAN(s) matching '{self.pattern}'")
+
+        for item, ok, exc in run_bounded(self._update, todo, self.max_workers):
+            if ok:
+                rec = self.journal.update(item["key"], status=UPDATED)
+            else:
+                rec = self.journal.update(item["key"], status=FAILED,
+                                          error=str(exc) if exc else ("stopped" if self._stop else "controller rejected update"))
+            if on_progress:
+                on_progress(item["key"], rec)
+
+        # Verify with one re-read per changed site
+        planned = set(item["key"] for item in plan)
+        updated = [k for k in self.journal.keys_with_status(UPDATED) if k in planned]
+        if updated and not self._stop:
+            sites = sorted(set(k.split("/", 1)[0] for k in updated))
+            after = self._read_sites(sites)
+            for key in updated:
+                site, wlan_id = key.split("/", 1)
+                if site not in after:
+                    continue  # stays 'updated'; verified on the next run
+                w = next((x for x in after[site] if x.get("_id") == wlan_id), None)
+                if w is None:
+                    rec = self.journal.update(key, status=FAILED, error="WLAN missing after update")
+                elif "x_passphrase" not in w:
+                    rec = self.journal.update(key, status=UNVERIFIED)
+                elif w["x_passphrase"] == self.new_psk:
+                    rec = self.journal.update(key, status=VERIFIED)
+                else:
+                    rec = self.journal.update(key, status=FAILED, error="passphrase differs after update")
+                if on_progress:
+                    on_progress(key, rec)
+
+        report = [dict(v, key=k) for k, v in self.journal.items().items() if k in planned]
+        done = sum(1 for r in report if r.get("status") in (VERIFIED, UNVERIFIED))
+        self.log(f"PSK rotation: {done}/{len(report)} WLAN(s) rotated in {time.monotonic() - t_start:.1f}s")
+        return report
+
+    def run(self, site_keys: Optional[List[str]] = None,
+            on_progress: Optional[Callable[[str, Dict], None]] = None) -> List[Dict]:
+        """plan() then apply() without a confirmation step (scripts, tests)."""
+        return self.apply(self.plan(site_keys), on_progress)
+
+def format_plan(plan: List[Dict]) -> str:
+    lines = ["SITE                 SSID                     NOTE"]
+    for p in plan:
+        note = "already rotated" if p.get("status") in (VERIFIED, UNVERIFIED) else ""
+        lines.append(f"{p['site']:<20} {p['ssid']:<24} {note}".rstrip())
+    return "\n".join(lines)
+
+def format_report(report: List[Dict]) -> str:
+    lines = ["SITE                 SSID                     STATUS      ERROR"]
+    for r in sorted(report, key=lambda x: (x.get("site", ""), x.get("ssid", ""))):
+        lines.append(f"{r.get('site',''):<20} {r.get('ssid',''):<24} {r.get('status',''):<11} {r.get('error','')}")
+    return "\n".join(lines)
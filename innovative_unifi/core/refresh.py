@@ -0,0 +1,164 @@
+import time
+from typing import Callable, Dict, Optional
+from PyQt5 import QtCore
+from .tasks import TaskExecutor
+
+class _Subscriber:
+    def __init__(self, name, widget, kind, site, fetch, apply, fingerprint):
+        self.name = name
+        self.widget = widget
+        self.kind = kind
+        self.site = site
+        self.fetch = fetch
+        self.apply = apply
+        self.fingerprint = fingerprint
+        self.applied_key = ""
+        self.applied_at = 0.0
+        self.boost_until = 0.0
+
+class _Entry:
+    """Last snapshot for one kind+site, shared by every subscriber that shows it."""
+    def __init__(self):
+        self.snapshot = None
+        self.fingerprint = None
+        self.fetched_at = 0.0
+        self.unchanged = 0
+        self.pending = False
+        self.dirty = False  # refresh_now() arrived mid-fetch; fetch again once it lands
+
+class RefreshScheduler(QtCore.QObject):
+    """Central poller for views that mirror controller state.
+
+    Views register a fetch function (run on the task executor) and an apply callback (run on the
+    GUI thread). A view is only polled while it is visible and its window is not minimized.
+    Each kind+site is fetched at most once per interval no matter how many views show it; the
+    interval doubles (up to max_interval) for every consecutive snapshot whose fingerprint did
+    not change, and drops to fast_interval while a view is boosted for an active operation.
+    Subscribers registered without a fingerprint get every snapshot but leave the back-off alone.
+    """
+    def __init__(self, tasks: TaskExecutor, base_interval: float = 10.0, fast_interval: float = 3.0,
+                 max_interval: float = 300.0, parent=None):
+        super().__init__(parent)
+        self.tasks = tasks
+        self.base_interval = base_interval
+        self.fast_interval = fast_interval
+        self.max_interval = max_interval
+        self._subs: Dict[str, _Subscriber] = {}
+        self._entries: Dict[str, _Entry] = {}
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(1000)
+        self._timer.timeout.connect(self._tick)
+        self._timer.start()
+
+    def register(self, name: str, widget, kind: str, site: Callable[[], str], fetch: Callable[[str], object],
+                 apply: Callable[[str, object], None], fingerprint: Optional[Callable[[object], object]] = None):
+        """fetch(site) runs on a worker; apply(site, snapshot) and visibility checks use widget."""
+        self._subs[name] = _Subscriber(name, widget, kind, site, fetch, apply, fingerprint)
+
+    def unregister(self, name: str):
+        self._subs.pop(name, None)
+
+    def boost(self, name: str, seconds: float = 60.0):
+        """Poll name at fast_interval for the next seconds (e.g. while upgrades or adoption run)."""
+        sub = self._subs.get(name)
+        if sub is None:
+            return
+        sub.boost_until = time.monotonic() + seconds
+        entry = self._entries.get(self._key(sub))
+        if entry is not None:
+            entry.unchanged = 0
+
+    def refresh_now(self, name: str):
+        """Fetch name's current site immediately, ignoring the interval and resetting back-off.
+        If a fetch for it is already in flight (it may predate a write), another follows it."""
+        sub = self._subs.get(name)
+        if sub is None:
+            return
+        key = self._key(sub)
+        entry = self._entries.setdefault(key, _Entry())
+        entry.unchanged = 0
+        if entry.pending:
+            entry.dirty = True
+            return
+        self._fetch(sub, key, entry)
+
+    def interval(self, name: str) -> float:
+        sub = self._subs.get(name)
+        if sub is None:
+            return self.base_interval
+        return self._interval(sub, self._entries.get(self._key(sub)))
+
+    # ----- internals -----
+    def _key(self, sub: _Subscriber) -> str:
+        return f"{sub.kind}:{sub.site() or 'default'}"
+
+    def _interval(self, sub: _Subscriber, entry: Optional[_Entry]) -> float:
+        if sub.boost_until > time.monotonic():
+            return self.fast_interval
+        unchanged = entry.unchanged if entry else 0
+        return min(self.base_interval * (2 ** min(unchanged, 16)), self.max_interval)
+
+    def _visible(self, sub: _Subscriber) -> bool:
+        w = sub.widget
+        try:
+            return w.isVisible() and not w.window().isMinimized()
+        except RuntimeError:  # widget already deleted
+            return False
+
+    def _tick(self):
+        now = time.monotonic()
+        for sub in list(self._subs.values()):
+            if not self._visible(sub):
+                continue  # paused until shown again
+            key = self._key(sub)
+            entry = self._entries.setdefault(key, _Entry())
+            fresh = entry.fetched_at and now - entry.fetched_at < self._interval(sub, entry)
+            if fresh:
+                # Another view (or an earlier visit) already fetched this site within the interval
+                if entry.snapshot is not None and (sub.applied_key != key or sub.applied_at < entry.fetched_at):
+                    self._apply(sub, key, entry)
+                continue
+            self._fetch(sub, key, entry)
+
+    def _fetch(self, sub: _Subscriber, key: str, entry: _Entry):
+        if entry.pending:
+            return
+        entry.pending = True
+        site = key.split(":", 1)[1]
+        fetch, fingerprint = sub.fetch, sub.fingerprint
+
+        def rerun():
+            if entry.dirty:
+                entry.dirty = False
+                self._fetch(sub, key, entry)
+
+        def work():
+            snap = fetch(site)
+            return snap, (fingerprint(snap) if fingerprint else None)
+
+        def done(result):
+            snap, fp = result
+            entry.pending = False
+            entry.fetched_at = time.monotonic()
+            if fingerprint is not None:
+                if entry.snapshot is not None and fp == entry.fingerprint and not entry.dirty:
+                    entry.unchanged += 1
+                else:
+                    entry.unchanged = 0
+                entry.fingerprint = fp
+            entry.snapshot = snap
+            for other in list(self._subs.values()):
+                if self._key(other) == key and (other is sub or self._visible(other)):
+                    self._apply(other, key, entry)
+            rerun()
+
+        def failed(_e):
+            entry.pending = False
+            entry.fetched_at = time.monotonic()  # wait a full interval before retrying
+            rerun()
+
+        self.tasks.submit(f"refresh:{key}", work, on_result=done, on_error=failed, join=True)
+
+    def _apply(self, sub: _Subscriber, key: str, entry: _Entry):
+        sub.applied_key, sub.applied_at = key, entry.fetched_at
+        sub.apply(key.split(":", 1)[1], entry.snapshot)
@@ -0,0 +1,167 @@
+import threading, traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from PyQt5 import QtCore
+
+class Task:
+    """One in-flight unit of background work. Callbacks always run on the GUI thread."""
+    def __init__(self, key: str, fn: Callable = None, args: tuple = (), kwargs: Optional[Dict] = None):
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.future = None
+        self.cancelled = threading.Event()
+        self.on_result = []
+        self.on_error = []
+        self.on_progress = []
+
+    def is_cancelled(self) -> bool:
+        return self.cancelled.is_set()
+
+    def same_call(self, fn: Callable, args: tuple, kwargs: Dict) -> bool:
+        try:
+            return self.fn == fn and self.args == args and self.kwargs == kwargs
+        except Exception:
+            return False
+
+class TaskExecutor(QtCore.QObject):
+    """Thread-pool executor for controller/SSH I/O with Qt-signal delivery.
+
+    submit(key, fn, ...) runs fn on a worker thread and calls on_result/on_error on the GUI
+    thread. While a task with the same key is running, a second submit of the identical call
+    (same fn and arguments), or any submit with join=True (reads whose key fully describes
+    what they fetch), attaches its callbacks to the running task instead of starting new work.
+    Every other submit is queued and runs, in order, once the running task finishes, so two
+    writes under one key are never merged. cancel(key) drops the callbacks and the queue (and
+    the work itself if it has not started); long jobs can poll is_cancelled(key) and send
+    updates with report(key, value).
+    """
+    _done = QtCore.pyqtSignal(object, object, object)
+    _progress = QtCore.pyqtSignal(object, object)
+    busy_changed = QtCore.pyqtSignal(bool)
+
+    def __init__(self, max_workers: int = 6, parent=None):
+        super().__init__(parent)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="io")
+        self._tasks: Dict[str, Task] = {}
+        self._queued: Dict[str, List[Task]] = {}
+        self._lock = threading.Lock()
+        self._done.connect(self._deliver)
+        self._progress.connect(self._deliver_progress)
+
+    def submit(self, key: str, fn: Callable, *args, on_result: Optional[Callable] = None,
+               on_error: Optional[Callable] = None, on_progress: Optional[Callable] = None,
+               join: bool = False, **kwargs) -> Task:
+        with self._lock:
+            running = self._tasks.get(key)
+            busy = running is not None and not running.is_cancelled()
+            if busy and (join or running.same_call(fn, args, kwargs)):
+                task = running
+            else:
+                task = Task(key, fn, args, kwargs)
+            if on_result:
+                task.on_result.append(on_result)
+            if on_error:
+                task.on_error.append(on_error)
+            if on_progress:
+                task.on_progress.append(on_progress)
+            if task is running:
+                return task
+            if busy:
+                self._queued.setdefault(key, []).append(task)
+                return task
+            self._tasks[key] = task
+            was_idle = len(self._tasks) == 1
+        self._start(task)
+        if was_idle:
+            self.busy_changed.emit(True)
+        return task
+
+    def _start(self, task: Task):
+        def run():
+            if task.is_cancelled():
+                return
+            try:
+                res = task.fn(*task.args, **task.kwargs)
+            except Exception as e:
+                self._done.emit(task, None, e)
+                return
+            self._done.emit(task, res, None)
+
+        task.future = self._pool.submit(run)
+
+    def cancel(self, key: str):
+        with self._lock:
+            task = self._tasks.pop(key, None)
+            queued = self._queued.pop(key, [])
+            idle = not self._tasks
+        for t in queued:
+            t.cancelled.set()
+        if task is None:
+            return
+        task.cancelled.set()
+        if task.future is not None:
+            task.future.cancel()
+        if idle:
+            self.busy_changed.emit(False)
+
+    def is_running(self, key: str) -> bool:
+        with self._lock:
+            return key in self._tasks
+
+    def is_cancelled(self, key: str) -> bool:
+        """For use inside a worker: True once the task for key was cancelled (or never existed)."""
+        with self._lock:
+            task = self._tasks.get(key)
+        return task is None or task.is_cancelled()
+
+    def report(self, key: str, value):
+        """Send a progress value from a worker thread to the task's on_progress callbacks."""
+        with self._lock:
+            task = self._tasks.get(key)
+        if task is not None and not task.is_cancelled():
+            self._progress.emit(task, value)
+
+    def shutdown(self):
+        with self._lock:
+            tasks = list(self._tasks.values()) + [t for q in self._queued.values() for t in q]
+            self._tasks.clear()
+            self._queued.clear()
+        for t in tasks:
+            t.cancelled.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ----- GUI-thread delivery -----
+    def _deliver(self, task: Task, result, error):
+        nxt = None
+        with self._lock:
+            if self._tasks.get(task.key) is task:
+                queue = self._queued.get(task.key)
+                if queue:
+                    nxt = self._tasks[task.key] = queue.pop(0)
+                    if not queue:
+                        del self._queued[task.key]
+                else:
+                    del self._tasks[task.key]
+            idle = not self._tasks
+        if nxt is not None:
+            self._start(nxt)
+        if idle:
+            self.busy_changed.emit(False)
+        if task.is_cancelled():
+            return
+        for cb in (task.on_error if error is not None else task.on_result):
+            try:
+                cb(error if error is not None else result)
+            except Exception:
+                traceback.print_exc()
+
+    def _deliver_progress(self, task: Task, value):
+        if task.is_cancelled():
+            return
+        for cb in task.on_progress:
+            try:
+                cb(value)
+            except Exception:
+                pass
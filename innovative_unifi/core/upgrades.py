@@ -0,0 +1,197 @@
+import time
+from typing import List, Dict, Optional, Callable
+from .device_poller import DevicePoller
+from .workers import run_bounded
+
+def _uplink_key(dev: Dict) -> str:
+    upl = dev.get("uplink") or {}
+    if isinstance(upl, dict):
+        key = upl.get("uplink_mac") or upl.get("uplink_device_name") or ""
+        if key:
+            return key.lower()
+    return dev.get("_site") or "site"
+
+def _uplink_heights(devices: List[Dict], topology: List[Dict]) -> Dict[str, int]:
+    """{mac: height} for each device in devices: 0 when no other target uplinks through it,
+    otherwise one more than the highest target behind it. The uplink chain is followed through
+    topology, so a core switch still waits for APs behind a switch that is not being upgraded."""
+    by_name = {(d.get("name") or "").lower(): (d.get("mac") or "").lower() for d in topology if d.get("name")}
+    parent: Dict[str, str] = {}
+    for d in list(topology) + list(devices):
+        mac = (d.get("mac") or "").lower()
+        key = _uplink_key(d)
+        key = by_name.get(key, key)
+        if mac and key != mac:
+            parent[mac] = key
+    targets = set((d.get("mac") or "").lower() for d in devices)
+    heights = {mac: 0 for mac in targets}
+    for mac in targets:
+        height, seen, up = 1, {mac}, parent.get(mac)
+        while up and up not in seen:
+            seen.add(up)
+            if up in heights:
+                heights[up] = max(heights[up], height)
+                height += 1
+            up = parent.get(up)
+    return heights
+
+def plan_waves(devices: List[Dict], max_per_uplink: int = 1, max_wave_size: int = 10,
+               topology: Optional[List[Dict]] = None) -> List[List[Dict]]:
+    """Split upgrade targets into waves.
+    A wave never takes more than max_per_uplink devices behind the same uplink (switch port
+    owner), and waves run from the edge inwards by uplink depth: a device other targets
+    uplink through (switch, mesh parent) only starts once everything behind it, at any depth,
+    has had its wave. topology is the site's full device list when devices is only the targets.
+    """
+    heights = _uplink_heights(devices, topology or devices)
+    tiers: Dict[int, List[Dict]] = {}
+    for d in devices:
+        tiers.setdefault(heights.get((d.get("mac") or "").lower(), 0), []).append(d)
+
+    waves: List[List[Dict]] = []
+    for _, tier in sorted(tiers.items()):
+        groups: Dict[str, List[Dict]] = {}
+        for d in sorted(tier, key=lambda x: (x.get("name") or "", x.get("mac") or "")):
+            groups.setdefault(_uplink_key(d), []).append(d)
+        queues = sorted(groups.values(), key=len, reverse=True)
+        while any(queues):
+            wave: List[Dict] = []
+            for q in queues:
+                take = min(max_per_uplink, len(q), max_wave_size - len(wave))
+                wave.extend(q[:take])
+                del q[:take]
+                if len(wave) >= max_wave_size:
+                    break
+            queues = [q for q in queues if q]
+            waves.append(wave)
+    return waves
+
+class UpgradeOrchestrator:
+    """Rolling firmware upgrade: issues upgrade commands for a wave concurrently, watches the
+    wave through one shared DevicePoller until each device is back online on new firmware (or
+    the wave times out), then moves on. progress holds throughput and ETA for the UI.
+    """
+    def __init__(self, ctrl, site_key: str, max_per_uplink: int = 1, max_wave_size: int = 10,
+                 max_workers: int = 8, wave_timeout: float = 900.0, poll_interval: float = 10.0,
+                 max_failures: Optional[int] = None):
+        self.ctrl = ctrl
+        self.log = ctrl.log
+        self.site_key = site_key
+        self.max_per_uplink = max_per_uplink
+        self.max_wave_size = max_wave_size
+        self.max_workers = max_workers
+        self.wave_timeout = wave_timeout
+        self.max_failures = max_failures
+        self.poller = DevicePoller(ctrl, interval=poll_interval)
+        self.results: Dict[str, Dict] = {}
+        self.progress: Dict = {"total": 0, "done": 0, "failed": 0, "skipped": 0, "wave": 0, "waves": 0,
+                               "per_min": 0.0, "eta_s": None, "running": False, "message": ""}
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def targets(self, devices: Optional[List[Dict]] = None) -> List[Dict]:
+        if devices is None:
+            devices = self.ctrl.get_device_records(self.site_key)
+        return [d for d in devices if d.get("upgradable") and (d.get("state") == 1 or d.get("connected")) and d.get("mac")]
+
+    def _update_progress(self, t0: float, message: str = ""):
+        p = self.progress
+        finished = p["done"] + p["failed"]
+        elapsed = max(time.monotonic() - t0, 1e-6)
+        p["per_min"] = round(p["done"] * 60.0 / elapsed, 2)
+        remaining = p["total"] - finished
+        p["eta_s"] = int(remaining * elapsed / finished) if finished else None
+        if message:
+            p["message"] = message
+
+    def _finished_predicate(self, dev: Dict) -> Callable[[Dict], bool]:
+        old_version = dev.get("version") or ""
+        seen = {"down": False}
+
+        def done(d: Dict) -> bool:
+            if d.get("state") != 1:
+                seen["down"] = True
+                return False
+            if old_version and (d.get("version") or "") not in ("", old_version):
+                return True
+            return seen["down"] and not d.get("upgradable")
+        return done
+
+    def run(self, devices: Optional[List[Dict]] = None, on_progress: Optional[Callable[[Dict], None]] = None) -> Dict[str, Dict]:
+        """Upgrade every upgradable device. Returns {mac: result} with status and timing per device;
+        devices whose wave never started (stopped or aborted) are 'skipped'."""
+        self._stop = False
+        t0 = time.monotonic()
+        if devices is None:
+            devices = self.ctrl.get_device_records(self.site_key)
+        targets = self.targets(devices)
+        waves = plan_waves(targets, self.max_per_uplink, self.max_wave_size, topology=devices)
+        self.progress.update(total=len(targets), done=0, failed=0, skipped=0, wave=0, waves=len(waves), running=True)
+        self.log(f"Upgrade: {len(targets)} device(s) in {len(waves)} wave(s)")
+
+        def notify(msg=""):
+            self._update_progress(t0, msg)
+            if on_progress:
+                on_progress(dict(self.progress))
+
+        def skip(rest, reason):
+            for d in (d for w in rest for d in w):
+                mac = d.get("mac").lower()
+                self.results[mac] = {"mac": mac, "name": d.get("name") or "", "from_version": d.get("version") or "",
+                                     "wave": None, "status": "skipped", "error": reason}
+                self.progress["skipped"] += 1
+
+        for i, wave in enumerate(waves, 1):
+            if self._stop:
+                skip(waves[i - 1:], "upgrade stopped before this wave")
+                notify("Stopped")
+                break
+            self.progress["wave"] = i
+            notify(f"Wave {i}/{len(waves)}: upgrading {len(wave)} device(s)")
+            issued_at = time.time()
+
+            def issue(d):
+                return self.ctrl.upgrade_device(self.site_key, d.get("mac"))
+
+            watch = {}
+            for d, ok, exc in run_bounded(issue, wave, self.max_workers):
+                mac = d.get("mac").lower()
+                rec = {"mac": mac, "name": d.get("name") or "", "from_version": d.get("version") or "",
+                       "wave": i, "started": issued_at}
+                if ok and exc is None:
+                    rec["status"] = "upgrading"
+                    watch[mac] = self._finished_predicate(d)
+                else:
+                    rec.update(status="failed", error=str(exc) if exc else "controller rejected upgrade command")
+                    self.progress["failed"] += 1
+                self.results[mac] = rec
+
+            def on_match(mac, d):
+                rec = self.results[mac]
+                rec.update(status="done", to_version=d.get("version") or "",
+                           duration_s=round(time.time() - rec["started"], 1))
+                self.progress["done"] += 1
+                notify(f"{rec['name'] or mac} upgraded to {rec['to_version']}")
+
+            if watch:
+                self.poller.wait_for([self.site_key], watch, self.wave_timeout, on_match=on_match,
+                                     on_poll=lambda snap, left: notify(), should_stop=lambda: self._stop)
+            for mac in watch:
+                if self.results[mac]["status"] == "upgrading":
+                    self.results[mac].update(status="timeout", error="stopped before the new firmware was confirmed"
+                                             if self._stop else "did not come back on new firmware in time")
+                    self.progress["failed"] += 1
+            notify()
+            if self.max_failures is not None and self.progress["failed"] > self.max_failures:
+                skip(waves[i:], "upgrade aborted after too many failures")
+                notify(f"Aborted after {self.progress['failed']} failure(s)")
+                self.log(f"Upgrade: aborting, {self.progress['failed']} failures exceed limit {self.max_failures}")
+                break
+
+        self.progress["running"] = False
+        skipped = f", {self.progress['skipped']} skipped" if self.progress["skipped"] else ""
+        notify(f"Finished: {self.progress['done']} upgraded, {self.progress['failed']} failed{skipped}")
+        self.log(f"Upgrade: {self.progress['message']} in {time.monotonic() - t0:.0f}s")
+        return self.results
@@ -0,0 +1,141 @@
+import time
+from typing import Callable, Dict, List, Optional
+from .diffing import diff_fields
+from .workers import run_bounded, shared_limit
+
+# Per-site outcomes
+CREATED = "created"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+SKIPPED = "skipped"  # exists with differences, but updates were turned off
+FAILED = "failed"
+
+def make_template(ssid: str, password: str, security: str = "wpapsk", wpa_mode: str = "wpa2",
+                  band: str = "both", fast_roaming: bool = True, bss_transition: bool = True,
+                  minrate_auto: bool = True, is_guest: bool = False, enabled: bool = True,
+                  vlan: Optional[int] = None, vlan_enabled: Optional[bool] = None) -> Dict:
+    """wlanconf fields for a WLAN deployed to many sites (the same settings create_wlan sends).
+    band is 'both', '2g' or '5g'. Group IDs are added per site at deploy time. VLAN fields are
+    only part of the template when given (vlan tags it, vlan_enabled=False untags it), so
+    updating an existing SSID leaves its VLAN alone otherwise."""
+    tpl = {
+        "name": ssid,
+        "x_passphrase": password,
+        "security": security,
+        "wpa_mode": wpa_mode,
+        "wlan_band": band,
+        "enabled": enabled,
+        "is_guest": is_guest,
+        "fast_roaming_enabled": fast_roaming,
+        "bss_transition": bss_transition,
+        "minrate_ng_enabled": minrate_auto,
+        "minrate_na_enabled": minrate_auto,
+    }
+    if minrate_auto:
+        tpl["minrate_setting_preference"] = "auto"
+    if vlan is not None:
+        tpl["vlan_enabled"] = True
+        tpl["vlan"] = vlan
+    elif vlan_enabled is not None:
+        tpl["vlan_enabled"] = vlan_enabled
+    return tpl
+
+def site_body(template: Dict, ids: Dict) -> Dict:
+    """template plus the site's WLAN group and 'All APs' AP group (from ControllerClient.get_group_ids)."""
+    body = dict(template)
+    if ids.get("wlangroup_id"):
+        body["wlangroup_id"] = ids["wlangroup_id"]
+    if ids.get("ap_group_id_v2"):
+        body["ap_group_mode"] = "all"
+        body["ap_group_ids"] = [ids["ap_group_id_v2"]]
+    return body
+
+class WlanDeployer:
+    """Creates (or brings up to date) one WLAN template on many sites.
+
+    Each site's group IDs and current WLAN list are read first, all sites in parallel; then
+    the creates/updates run concurrently. Writes go through a semaphore shared by every job
+    against the same controller, so two deployments at once still respect max_writes.
+    """
+    def __init__(self, ctrl, max_workers: int = 16, max_writes: int = 8):
+        self.ctrl = ctrl
+        self.log = ctrl.log
+        self.max_workers = max_workers
+        self.write_slots = shared_limit(f"wlan-writes:{ctrl.base}", max_writes)
+        self.progress: Dict = {"total": 0, "done": 0, "failed": 0, "per_min": 0.0, "elapsed_s": 0.0}
+        self._stop = False
+
+    def stop(self):
+        self._stop = True
+
+    def _prepare(self, site: str) -> Dict:
+        ids = self.ctrl.get_group_ids(site)
+        return {"ids": ids, "wlans": self.ctrl.get_wlans(site)}
+
+    def _deploy_site(self, site: str, template: Dict, prep: Dict, update_existing: bool) -> Dict:
+        t0 = time.monotonic()
+        existing = next((w for w in prep["wlans"] if w.get("name") == template["name"]), None)
+        if existing is not None:
+            # Only template fields are compared (same rules as WLAN sync); group membership on
+            # existing WLANs is left alone
+            changes = {k: v[1] for k, v in diff_fields(existing, template).items()}
+            if not changes:
+                return {"action": UNCHANGED, "ok": True, "wlan_id": existing.get("_id")}
+            if not update_existing:
+                return {"action": SKIPPED, "ok": True, "wlan_id": existing.get("_id"),
+                        "changed": sorted(changes), "error": f"differs in {', '.join(sorted(changes))} (updates disabled)"}
+            with self.write_slots:
+                ok = self.ctrl.update_wlan(site, existing, changes)
+            return {"action": UPDATED if ok else FAILED, "ok": ok, "wlan_id": existing.get("_id"),
+                    "changed": sorted(changes), "error": "" if ok else "controller rejected update",
+                    "ms": int((time.monotonic() - t0) * 1000)}
+        with self.write_slots:
+            created = self.ctrl.post_wlanconf(site, site_body(template, prep["ids"]))
+        return {"action": CREATED if created else FAILED, "ok": bool(created),
+                "wlan_id": (created or {}).get("_id"), "error": "" if created else "controller rejected create",
+                "ms": int((time.monotonic() - t0) * 1000)}
+
+    def run(self, template: Dict, site_keys: List[str], update_existing: bool = True,
+            on_progress: Optional[Callable[[str, Dict], None]] = None) -> List[Dict]:
+        """Deploy template to every site. Returns one result per site:
+        {site, action (created/updated/unchanged/skipped/failed), ok, wlan_id, error, ms}."""
+        self._stop = False
+        t_start = time.monotonic()
+        p = self.progress
+        p.update(total=len(site_keys), done=0, failed=0, per_min=0.0, elapsed_s=0.0)
+        results: Dict[str, Dict] = {}
+
+        preps: Dict[str, Dict] = {}
+        for site, prep, exc in run_bounded(self._prepare, site_keys, self.max_workers):
+            if exc is not None:
+                results[site] = {"site": site, "action": FAILED, "ok": False, "error": f"lookup failed: {exc}"}
+                p["failed"] += 1
+            else:
+                preps[site] = prep
+        self.log(f"WLAN deploy: resolved {len(preps)}/{len(site_keys)} site(s) in {time.monotonic() - t_start:.1f}s")
+
+        def work(site):
+            if self._stop:
+                return {"action": FAILED, "ok": False, "error": "stopped"}
+            return self._deploy_site(site, template, preps[site], update_existing)
+
+        for site, res, exc in run_bounded(work, list(preps), self.max_workers):
+            res = dict(res or {"action": FAILED, "ok": False, "error": str(exc)}, site=site)
+            results[site] = res
+            p["done" if res["ok"] else "failed"] += 1
+            elapsed = max(time.monotonic() - t_start, 1e-6)
+            p["elapsed_s"] = round(elapsed, 1)
+            p["per_min"] = round((p["done"] + p["failed"]) * 60.0 / elapsed, 1)
+            self.log(f"WLAN deploy: {site} {res['action']}" + (f" ({res['error']})" if res.get("error") else ""))
+            if on_progress:
+                on_progress(site, res)
+
+        p["elapsed_s"] = round(time.monotonic() - t_start, 1)
+        self.log(f"WLAN deploy: {p['done']}/{len(site_keys)} site(s) ok in {p['elapsed_s']}s ({p['per_min']} sites/min)")
+        return [results[s] for s in site_keys if s in results]
+
+def format_report(results: List[Dict]) -> str:
+    lines = ["SITE                 ACTION     MS      ERROR"]
+    for r in results:
+        lines.append(f"{r.get('site',''):<20} {r.get('action',''):<10} {str(r.get('ms','')):>6}  {r.get('error','')}")
+    return "\n".join(lines)
@@ -0,0 +1,149 @@
+import threading, time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .workers import run_bounded
+
+def wlan_vlan(w: Dict) -> str:
+    """VLAN id as a string ('' when the WLAN is untagged)."""
+    if w.get("vlan_enabled") is False:
+        return ""
+    v = w.get("vlan")
+    return str(v) if v not in (None, "") else ""
+
+def wlan_bands(w: Dict) -> str:
+    return w.get("wlan_band", "") or ("5g" if w.get("na_only") else "2g" if w.get("ng_only") else "both")
+
+class WlanInventory:
+    """wlanconf for every site, cached per site with a TTL and indexed for search.
+
+    refresh() only refetches sites that are missing or older than ttl (all of them
+    concurrently); put() and invalidate() keep it in step with reads and writes made
+    elsewhere. search() answers from the indexes without touching the controller.
+    """
+    def __init__(self, ctrl, ttl: float = 300.0, max_workers: int = 16):
+        self.ctrl = ctrl
+        self.log = ctrl.log
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._sites: Dict[str, Tuple[float, List[Dict]]] = {}  # site -> (fetched_at, wlans)
+        self._site_names: Dict[str, str] = {}  # site key -> description
+        # Indexes: value -> {(site, wlan_id)}
+        self._by_ssid: Dict[str, Set[tuple]] = {}
+        self._by_security: Dict[str, Set[tuple]] = {}
+        self._by_vlan: Dict[str, Set[tuple]] = {}
+        self._by_enabled: Dict[bool, Set[tuple]] = {}
+        self._rows: Dict[tuple, Dict] = {}
+        self._site_keys: Dict[str, Set[tuple]] = {}
+        # WLAN writes made through the controller mark the written site stale
+        ctrl.cache.add_listener(self._on_invalidated)
+
+    def _on_invalidated(self, tag: str):
+        if tag.startswith("wlans:"):
+            self.invalidate([tag.split(":", 1)[1]])
+
+    # ----- cache maintenance -----
+    def _index(self, site: str, wlans: List[Dict]):
+        """Replace one site's entries in the indexes (lock held)."""
+        for key in self._site_keys.pop(site, ()):
+            row = self._rows.pop(key)
+            for idx, val in ((self._by_ssid, row["name"].lower()), (self._by_security, row["security"]),
+                             (self._by_vlan, row["vlan"]), (self._by_enabled, row["enabled"])):
+                bucket = idx.get(val)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del idx[val]
+        for w in wlans:
+            wid = w.get("_id")
+            if not wid:
+                continue
+            key = (site, wid)
+            row = {"site": site, "site_desc": self._site_names.get(site, site), "_id": wid,
+                   "name": w.get("name") or "", "enabled": bool(w.get("enabled", True)),
+                   "security": w.get("security") or "", "vlan": wlan_vlan(w), "bands": wlan_bands(w),
+                   "ap_group_mode": w.get("ap_group_mode") or "", "wlan": w}
+            self._rows[key] = row
+            self._site_keys.setdefault(site, set()).add(key)
+            self._by_ssid.setdefault(row["name"].lower(), set()).add(key)
+            self._by_security.setdefault(row["security"], set()).add(key)
+            self._by_vlan.setdefault(row["vlan"], set()).add(key)
+            self._by_enabled.setdefault(row["enabled"], set()).add(key)
+
+    def put(self, site: str, wlans: List[Dict]):
+        """Store a site's WLAN list fetched elsewhere (e.g. the single-site view)."""
+        with self._lock:
+            self._sites[site] = (time.monotonic(), list(wlans))
+            self._index(site, wlans)
+
+    def invalidate(self, sites: Optional[Iterable[str]] = None):
+        """Mark sites (default: all) stale so the next refresh refetches them; entries stay searchable."""
+        with self._lock:
+            for site in (list(self._sites) if sites is None else sites):
+                if site in self._sites:
+                    self._sites[site] = (0.0, self._sites[site][1])
+
+    def stale_sites(self, site_keys: Iterable[str]) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            return [s for s in site_keys if s not in self._sites or now - self._sites[s][0] > self.ttl]
+
+    def refresh(self, site_keys: Optional[List[str]] = None, force: bool = False) -> List[str]:
+        """Fetch wlanconf for every stale site (all sites when site_keys is None) concurrently.
+        Sites that disappeared from the controller are dropped. Returns the sites fetched."""
+        if site_keys is None:
+            sites = self.ctrl.get_sites() or []
+            with self._lock:
+                self._site_names = {(s.get("name") or s.get("key")): (s.get("desc") or s.get("name") or "")
+                                    for s in sites if s.get("name") or s.get("key")}
+                site_keys = list(self._site_names)
+                for gone in [s for s in self._sites if s not in self._site_names]:
+                    del self._sites[gone]
+                    self._index(gone, [])
+        todo = list(site_keys) if force else self.stale_sites(site_keys)
+        t0 = time.monotonic()
+        fetched = []
+        for site, wlans, exc in run_bounded(self.ctrl.get_wlans, todo, self.max_workers):
+            if exc is not None:
+                self.log(f"WLAN inventory: could not read {site}: {exc}")
+                continue
+            self.put(site, wlans or [])
+            fetched.append(site)
+        if todo:
+            self.log(f"WLAN inventory: refreshed {len(fetched)}/{len(todo)} site(s) in {time.monotonic() - t0:.1f}s")
+        return fetched
+
+    # ----- queries -----
+    def sites(self) -> List[str]:
+        with self._lock:
+            return sorted(self._sites)
+
+    def search(self, ssid: str = "", security: Optional[str] = None, vlan: Optional[str] = None,
+               enabled: Optional[bool] = None) -> List[Dict]:
+        """Rows matching every given filter: ssid is a case-insensitive substring of the SSID (matched
+        against the distinct names only), the others are exact values. Sorted by SSID then site."""
+        with self._lock:
+            keys: Optional[Set[tuple]] = None
+
+            def narrow(found: Set[tuple]):
+                nonlocal keys
+                keys = set(found) if keys is None else keys & found
+
+            if security is not None:
+                narrow(self._by_security.get(security, set()))
+            if vlan is not None:
+                narrow(self._by_vlan.get(str(vlan), set()))
+            if enabled is not None:
+                narrow(self._by_enabled.get(bool(enabled), set()))
+            needle = (ssid or "").strip().lower()
+            if needle:
+                found: Set[tuple] = set()
+                for name, bucket in self._by_ssid.items():
+                    if needle in name:
+                        found |= bucket
+                narrow(found)
+            rows = [self._rows[k] for k in (self._rows if keys is None else keys)]
+        return sorted(rows, key=lambda r: (r["name"].lower(), r["site"]))
+
+    def securities(self) -> List[str]:
+        with self._lock:
+            return sorted(k for k in self._by_security if k)
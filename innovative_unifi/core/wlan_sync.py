@@ -0,0 +1,155 @@
+import json, time
+from typing import Callable, Dict, List, Optional
+from .controller import WLAN_VOLATILE_FIELDS
+from .diffing import diff_fields
+from .wlan_deploy import site_body
+from .workers import run_bounded, shared_limit
+
+# Plan operations
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+OK = "ok"
+
+# Keys in a desired WLAN entry that steer the sync rather than being wlanconf fields
+_CONTROL_KEYS = ("state",)
+# Never compared: server-managed fields plus ids/site bookkeeping
+IGNORED_FIELDS = frozenset(WLAN_VOLATILE_FIELDS + ("_id", "site_id", "wlangroup_id", "ap_group_ids", "ap_group_mode"))
+
+def load_desired(path: str) -> Dict[str, List[Dict]]:
+    """Read a desired-state file (JSON, or YAML when PyYAML is installed).
+
+    Layout: {"defaults": {...}, "sites": {"<site key>": [wlan, ...], "*": [wlan, ...]}}.
+    Each wlan is a set of wlanconf fields keyed by "name"; "state": "absent" removes it.
+    "defaults" is merged under every entry and "*" applies to every targeted site (entries for
+    a site override "*" entries with the same name). Returns {site: [wlan, ...]}.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("PyYAML is not installed; use a .json desired-state file")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    if not isinstance(data, dict) or not isinstance(data.get("sites"), dict):
+        raise ValueError("desired-state file needs a top-level 'sites' mapping")
+    defaults = data.get("defaults") or {}
+    out: Dict[str, List[Dict]] = {}
+    for site, wlans in data["sites"].items():
+        entries = []
+        for w in wlans or []:
+            if not isinstance(w, dict) or not w.get("name"):
+                raise ValueError(f"site {site}: every WLAN needs a name")
+            entries.append(dict(defaults, **w))
+        out[str(site)] = entries
+    return out
+
+def desired_for(desired: Dict[str, List[Dict]], site: str) -> List[Dict]:
+    by_name = {w["name"]: w for w in desired.get("*", [])}
+    by_name.update({w["name"]: w for w in desired.get(site, [])})
+    return list(by_name.values())
+
+def diff_wlan(current: Dict, wanted: Dict) -> Dict[str, tuple]:
+    return diff_fields(current, wanted, IGNORED_FIELDS.union(_CONTROL_KEYS))
+
+def plan_site(site: str, current: List[Dict], wanted: List[Dict]) -> List[Dict]:
+    """Actions that bring one site's WLANs to the desired list; WLANs not mentioned are left alone."""
+    by_name = {w.get("name"): w for w in current}
+    plan = []
+    for w in wanted:
+        cur = by_name.get(w["name"])
+        if w.get("state") == "absent":
+            if cur is not None:
+                plan.append({"site": site, "wlan": w["name"], "op": DELETE, "wlan_id": cur.get("_id"), "changes": {}})
+            continue
+        if cur is None:
+            body = {k: v for k, v in w.items() if k not in _CONTROL_KEYS}
+            plan.append({"site": site, "wlan": w["name"], "op": CREATE, "wlan_id": None, "body": body,
+                         "changes": {k: (None, v) for k, v in body.items()}})
+            continue
+        changes = diff_wlan(cur, w)
+        plan.append({"site": site, "wlan": w["name"], "op": UPDATE if changes else OK,
+                     "wlan_id": cur.get("_id"), "current": cur, "changes": changes})
+    return plan
+
+class WlanSync:
+    """Brings WLANs on many sites to a desired state with the fewest writes.
+
+    wlanconf is read for every targeted site concurrently; each site's plan holds only the
+    creates, field-level updates and deletes needed. dry_run stops after planning; otherwise
+    the writes run concurrently under the controller's shared WLAN write cap.
+    """
+    def __init__(self, ctrl, max_workers: int = 16, max_writes: int = 8):
+        self.ctrl = ctrl
+        self.log = ctrl.log
+        self.max_workers = max_workers
+        self.write_slots = shared_limit(f"wlan-writes:{ctrl.base}", max_writes)
+
+    def plan(self, desired: Dict[str, List[Dict]], site_keys: Optional[List[str]] = None) -> List[Dict]:
+        """Plan every targeted site (default: the sites named in desired, '*' excluded).
+        Sites whose wlanconf could not be read get one {'op': 'error'} entry."""
+        if site_keys is None:
+            site_keys = [s for s in desired if s != "*"]
+        t0 = time.monotonic()
+        plan: List[Dict] = []
+        for site, wlans, exc in run_bounded(self.ctrl.get_wlans, site_keys, self.max_workers):
+            if exc is not None:
+                plan.append({"site": site, "wlan": "", "op": "error", "error": str(exc), "changes": {}})
+                continue
+            plan.extend(plan_site(site, wlans or [], desired_for(desired, site)))
+        writes = sum(1 for a in plan if a["op"] in (CREATE, UPDATE, DELETE))
+        self.log(f"WLAN sync: planned {len(site_keys)} site(s) in {time.monotonic() - t0:.1f}s, {writes} change(s)")
+        return plan
+
+    def _apply_one(self, action: Dict) -> bool:
+        site, op = action["site"], action["op"]
+        with self.write_slots:
+            if op == DELETE:
+                return self.ctrl.delete_wlan(site, action["wlan_id"])
+            if op == UPDATE:
+                return self.ctrl.update_wlan(site, action["current"], {k: v[1] for k, v in action["changes"].items()})
+        body = site_body(action["body"], self.ctrl.get_group_ids(site))
+        with self.write_slots:
+            return self.ctrl.post_wlanconf(site, body) is not None
+
+    def apply(self, plan: List[Dict], on_progress: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Run the writes in plan; each write action gets 'ok' and 'error' set."""
+        todo = [a for a in plan if a["op"] in (CREATE, UPDATE, DELETE)]
+        t0 = time.monotonic()
+        for action, ok, exc in run_bounded(self._apply_one, todo, self.max_workers):
+            action["ok"] = bool(ok) and exc is None
+            action["error"] = "" if action["ok"] else (str(exc) if exc else "controller rejected change")
+            self.log(f"WLAN sync: {action['site']} {action['op']} {action['wlan']} {'OK' if action['ok'] else 'FAILED: ' + action['error']}")
+            if on_progress:
+                on_progress(action)
+        ok = sum(1 for a in todo if a.get("ok"))
+        self.log(f"WLAN sync: applied {ok}/{len(todo)} change(s) in {time.monotonic() - t0:.1f}s")
+        return plan
+
+    def run(self, desired: Dict[str, List[Dict]], site_keys: Optional[List[str]] = None, dry_run: bool = True,
+            on_progress: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        plan = self.plan(desired, site_keys)
+        return plan if dry_run else self.apply(plan, on_progress)
+
+def format_plan(plan: List[Dict], show_ok: bool = False) -> str:
+    lines = []
+    for a in sorted(plan, key=lambda x: (x["site"], x["wlan"])):
+        if a["op"] == OK and not show_ok:
+            continue
+        status = "" if "ok" not in a else ("  [OK]" if a["ok"] else f"  [FAILED: {a['error']}]")
+        if a["op"] == "error":
+            lines.append(f"{a['site']}: could not read WLANs: {a['error']}")
+            continue
+        lines.append(f"{a['site']}: {a['op']} {a['wlan']}{status}")
+        for k, (old, new) in sorted(a["changes"].items()):
+            if k == "x_passphrase":
+                lines.append(f"    {k}: (changed)")
+            else:
+                lines.append(f"    {k}: {old!r} -> {new!r}")
+    counts = {}
+    for a in plan:
+        counts[a["op"]] = counts.get(a["op"], 0) + 1
+    summary = ", ".join(f"{n} {op}" for op, n in sorted(counts.items()))
+    return "\n".join(lines + ["", f"Total: {summary or 'nothing to do'}"])
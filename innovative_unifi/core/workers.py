@@ -0,0 +1,40 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, Tuple, Any, Optional
+
+DEFAULT_MAX_WORKERS = 8
+
+_limits: Dict[str, threading.BoundedSemaphore] = {}
+_limits_lock = threading.Lock()
+
+def shared_limit(key: str, limit: int = DEFAULT_MAX_WORKERS) -> threading.BoundedSemaphore:
+    """Process-wide semaphore for key (e.g. a controller URL), so concurrent jobs against the
+    same controller share one cap. limit only applies when the semaphore is first created."""
+    with _limits_lock:
+        sem = _limits.get(key)
+        if sem is None:
+            sem = _limits[key] = threading.BoundedSemaphore(max(1, int(limit)))
+        return sem
+
+def run_bounded(fn: Callable, items: Iterable, max_workers: int = DEFAULT_MAX_WORKERS) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+    """Run fn(item) for every item on a bounded thread pool.
+    Yields (item, result, error) in completion order so callers can stream results
+    as they arrive. error is None when fn returned normally.
+    """
+    items = list(items)
+    if not items:
+        return
+    workers = max(1, min(int(max_workers or 1), len(items)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futs = {pool.submit(fn, it): it for it in items}
+        try:
+            for fut in as_completed(futs):
+                it = futs[fut]
+                try:
+                    yield it, fut.result(), None
+                except Exception as e:
+                    yield it, None, e
+        finally:
+            # Generator closed early: drop anything that has not started yet
+            for fut in futs:
+                fut.cancel()
@@ -0,0 +1,49 @@
+from PyQt5 import QtWidgets, QtCore, QtGui
+from ..core.device_detail import format_detail
+
+class DeviceDetailPanel(QtWidgets.QWidget):
+    """Side panel showing one device's full detail (ports, radios, uplink chain)."""
+    refresh_requested = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.mac = ""
+        self.lbl = QtWidgets.QLabel("No device selected")
+        self.lbl.setWordWrap(True)
+        self.btn_refresh = QtWidgets.QPushButton("Reload")
+        self.btn_refresh.setEnabled(False)
+        self.btn_refresh.clicked.connect(self.refresh_requested)
+        self.text = QtWidgets.QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+        self.text.setFont(QtGui.QFont("Courier New", 9))
+
+        head = QtWidgets.QHBoxLayout()
+        head.addWidget(self.lbl, 1)
+        head.addWidget(self.btn_refresh)
+        lay = QtWidgets.QVBoxLayout(self)
+        lay.setContentsMargins(0, 0, 0, 0)
+        lay.addLayout(head)
+        lay.addWidget(self.text)
+
+    def clear(self):
+        self.mac = ""
+        self.lbl.setText("No device selected")
+        self.btn_refresh.setEnabled(False)
+        self.text.clear()
+
+    def show_loading(self, mac: str, name: str = ""):
+        self.mac = mac
+        self.lbl.setText(f"Loading {name or mac}…")
+        self.btn_refresh.setEnabled(False)
+        self.text.clear()
+
+    def show_detail(self, mac: str, detail):
+        self.mac = mac
+        self.btn_refresh.setEnabled(True)
+        if not detail:
+            self.lbl.setText(f"No detail returned for {mac}")
+            self.text.clear()
+            return
+        self.lbl.setText(detail.get("name") or detail.get("hostname") or mac)
+        self.text.setPlainText("\n".join(format_detail(detail)))
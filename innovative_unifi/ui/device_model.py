@@ -0,0 +1,179 @@
+from typing import List, Dict, Optional
+from PyQt5 import QtCore, QtGui
+
+COLUMNS = ["Name", "Model", "Type", "MAC", "State", "Uplink", "IP", "Adopted", "Update", "Locate"]
+COL_NAME, COL_MODEL, COL_TYPE, COL_MAC, COL_STATE, COL_UPLINK, COL_IP, COL_ADOPTED, COL_UPDATE, COL_LOCATE = range(10)
+
+def row_key(row: Dict) -> str:
+    return (row.get("mac") or "").lower()
+
+class DeviceTableModel(QtCore.QAbstractTableModel):
+    """Device rows keyed by MAC. set_rows() applies only the difference from the previous
+    snapshot (removed rows, changed cells, appended rows), so selection and scroll position
+    survive a refresh and unchanged devices cost nothing to repaint.
+
+    A row is a dict with 'mac', 'values' (one display string per column), 'search' (lower-cased
+    filter text), 'device' and optionally 'sort' (one sort key per column, defaults to values).
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._keys: List[str] = []
+        self._rows: Dict[str, Dict] = {}
+        self._index: Dict[str, int] = {}
+        self._bold = QtGui.QFont("Arial", 9, QtGui.QFont.Bold)
+        self._low_speed_bg = QtGui.QBrush(QtGui.QColor(255, 248, 220))  # Light yellow
+        self._update_bg = QtGui.QBrush(QtGui.QColor(240, 248, 255))     # Light blue
+
+    # ----- Qt model API -----
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._keys)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal and 0 <= section < len(COLUMNS):
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[self._keys[index.row()]]
+        c = index.column()
+        v = row["values"][c]
+        if role == QtCore.Qt.DisplayRole:
+            return v
+        if role == QtCore.Qt.ForegroundRole:
+            if c == COL_STATE and v != "online":
+                return QtGui.QColor(QtCore.Qt.red)
+            if c == COL_UPLINK:
+                if v.startswith("!"):
+                    return QtGui.QColor(QtCore.Qt.darkRed)  # Dark red text for better contrast
+                if not v:
+                    return QtGui.QColor(QtCore.Qt.gray)
+            if c == COL_UPDATE:
+                if v == "Yes":
+                    return QtGui.QColor(QtCore.Qt.blue)
+                return QtGui.QColor(QtCore.Qt.gray if v == "Unknown" else QtCore.Qt.darkGreen)
+            if c == COL_LOCATE:
+                return QtGui.QColor(QtCore.Qt.green if v == "ON" else QtCore.Qt.gray)
+            return None
+        if role == QtCore.Qt.BackgroundRole:
+            if c == COL_UPLINK and v.startswith("!"):
+                return self._low_speed_bg
+            if c == COL_UPDATE and v == "Yes":
+                return self._update_bg
+            return None
+        if role == QtCore.Qt.FontRole:
+            if (c == COL_UPLINK and v.startswith("!")) or (c == COL_UPDATE and v == "Yes") or (c == COL_LOCATE and v == "ON"):
+                return self._bold
+            return None
+        return None
+
+    # ----- snapshot diffing -----
+    def set_rows(self, rows: List[Dict]):
+        new: Dict[str, Dict] = {}
+        for r in rows:
+            k = row_key(r)
+            if k and k not in new:
+                new[k] = r
+
+        # 1) removed rows, in contiguous ranges from the bottom up so indexes stay valid
+        gone = [i for i, k in enumerate(self._keys) if k not in new]
+        while gone:
+            end = gone.pop()
+            start = end
+            while gone and gone[-1] == start - 1:
+                start = gone.pop()
+            self.beginRemoveRows(QtCore.QModelIndex(), start, end)
+            for k in self._keys[start:end + 1]:
+                del self._rows[k]
+            del self._keys[start:end + 1]
+            self.endRemoveRows()
+        if len(self._index) != len(self._keys):
+            self._index = {k: i for i, k in enumerate(self._keys)}
+
+        # 2) changed cells, one dataChanged per row covering just the changed columns
+        last = len(COLUMNS) - 1
+        for i, k in enumerate(self._keys):
+            old_vals = self._rows[k]["values"]
+            nr = new[k]
+            self._rows[k] = nr
+            new_vals = nr["values"]
+            if old_vals == new_vals:
+                continue
+            changed = [c for c in range(len(COLUMNS)) if old_vals[c] != new_vals[c]]
+            self.dataChanged.emit(self.index(i, changed[0] if changed else 0), self.index(i, changed[-1] if changed else last))
+
+        # 3) new devices appended at the end
+        added = [k for k in new if k not in self._index]
+        if added:
+            first = len(self._keys)
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + len(added) - 1)
+            for k in added:
+                self._index[k] = len(self._keys)
+                self._keys.append(k)
+                self._rows[k] = new[k]
+            self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._keys, self._rows, self._index = [], {}, {}
+        self.endResetModel()
+
+    # ----- lookups -----
+    def row_at(self, r: int) -> Optional[Dict]:
+        if 0 <= r < len(self._keys):
+            return self._rows[self._keys[r]]
+        return None
+
+    def row_for_mac(self, mac: str) -> Optional[Dict]:
+        return self._rows.get((mac or "").lower())
+
+    def sort_key(self, r: int, c: int):
+        row = self._rows[self._keys[r]]
+        sort = row.get("sort")
+        return sort[c] if sort else row["values"][c].lower()
+
+class DeviceFilterProxy(QtCore.QSortFilterProxyModel):
+    """Filters and sorts DeviceTableModel rows in memory. The filter text is matched against the
+    row's precomputed 'search' key, so typing never triggers a controller fetch.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._text = ""
+        self._updates_only = False
+        self.setDynamicSortFilter(True)
+
+    def set_text(self, text: str):
+        text = (text or "").strip().lower()
+        if text != self._text:
+            self._text = text
+            self.invalidateFilter()
+
+    def set_updates_only(self, enabled: bool):
+        if bool(enabled) != self._updates_only:
+            self._updates_only = bool(enabled)
+            self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._text and not self._updates_only:
+            return True
+        row = self.sourceModel().row_at(source_row)
+        if row is None:
+            return False
+        if self._updates_only and row["values"][COL_UPDATE] != "Yes":
+            return False
+        return not self._text or self._text in row["search"]
+
+    def lessThan(self, left, right):
+        # Compare the Python sort keys directly (numeric uplink speed, IP octets) instead of
+        # round-tripping display strings through QVariant
+        src = self.sourceModel()
+        return src.sort_key(left.row(), left.column()) < src.sort_key(right.row(), right.column())
+
+    def row_at(self, r: int) -> Optional[Dict]:
+        """Source row for a row index in proxy (view) coordinates."""
+        src = self.mapToSource(self.index(r, 0))
+        return self.sourceModel().row_at(src.row()) if src.isValid() else None
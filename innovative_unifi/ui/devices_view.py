@@ -1,196 +1,52 @@
 from PyQt5 import QtWidgets, QtCore, QtGui
 from ..core.controller import ControllerClient
+from ..core.tasks import TaskExecutor
+from ..core.logger_bus import INFO
+from ..core.projection import DeviceProjector, version_key
+from ..core.refresh import RefreshScheduler
+from ..core.capabilities import max_uplink_mbps
+from ..core.device_detail import DeviceDetailCache
+from ..core.workers import run_bounded
+from ..core.device_poller import DeviceListFeed
+from ..core.fleet import FleetRunner, SSHPool, format_table, export_jsonl, export_csv
+from ..core.upgrades import UpgradeOrchestrator, plan_waves
+from ..core.naming import BulkNamer, load_name_rows, format_report as format_naming_report
+from .device_detail import DeviceDetailPanel
+from .device_model import DeviceTableModel, DeviceFilterProxy, COL_NAME, COL_MAC, COL_UPLINK, COL_IP, COL_ADOPTED
 
-def _fmt_speed(mbps):
-    try:
-        m = float(mbps)
-        if m >= 1000:
-            g = m/1000.0
-            if abs(round(g) - g) < 1e-6:
-                return f"{int(round(g))} Gbps"
-            return f"{g:.1f} Gbps"
-        return f"{int(m)} Mbps"
-    except Exception:
-        return str(mbps)
-
-def _check_update_available(dev: dict) -> str:
-    """Check if a firmware update is available for the device"""
-    try:
-        # Check if device has update information
-        version = dev.get("version", "")
-        upgradable = dev.get("upgradable", False)
-        need_upgrade = dev.get("need_upgrade", False)
-        
-        # Check various update indicators
-        if upgradable or need_upgrade:
-            return "Yes"
-        
-        # Check if there's a newer version available (heuristic)
-        # This is a basic check - the controller should provide more accurate info
-        if dev.get("upgrade_to_firmware"):
-            return "Yes"
-            
-        return "No"
-    except Exception:
-        return "Unknown"
-
-def _max_cap_from_tables(dev: dict):
-    """Get maximum uplink capability from device data or known model specifications"""
-    
-    # First try to get from ethernet/port tables (prefer uplink port)
-    uplink_port = None
-    upl = dev.get("uplink") or {}
-    if isinstance(upl, dict):
-        uplink_port = upl.get("port_idx")
-    
-    best = 0
-    for key in ("ethernet_table", "port_table"):
-        for p in dev.get(key, []) or []:
-            caps = p.get("speed_caps") or []
-            if isinstance(caps, list):
-                best = max(best, max(caps) if caps else 0)
-                if uplink_port is not None and p.get("port_idx") == uplink_port and caps:
-                    return max(caps)
-            elif isinstance(caps, int):
-                best = max(best, caps)
-                if uplink_port is not None and p.get("port_idx") == uplink_port:
-                    return caps
-    
-    # If we found something from tables, use it
-    if best > 0:
-        return best
-    
-    # Fallback to known model specifications
-    model = (dev.get("model") or "").lower()
-    device_type = (dev.get("type") or dev.get("device_type") or "").lower()
-    
-    # UniFi Access Points
-    if "uap" in device_type or "ap" in device_type:
-        if "u6-pro" in model:
-            return 1000  # 1 Gbps
-        elif "u6-lr" in model:
-            return 1000  # 1 Gbps
-        elif "u6-lite" in model:
-            return 1000  # 1 Gbps
-        elif "u6-mesh" in model:
-            return 1000  # 1 Gbps
-        elif "u6-extender" in model:
-            return 1000  # 1 Gbps
-        elif "u6-enterprise" in model:
-            return 2500  # 2.5 Gbps
-        elif "u6-enterprise-in-wall" in model:
-            return 1000  # 1 Gbps
-        elif "u7-pro" in model:
-            return 2500  # 2.5 Gbps
-        elif "u7-enterprise" in model:
-            return 10000  # 10 Gbps
-        elif "uap-ac-pro" in model:
-            return 1000  # 1 Gbps
-        elif "uap-ac-lr" in model:
-            return 1000  # 1 Gbps
-        elif "uap-ac-lite" in model:
-            return 1000  # 1 Gbps
-        elif "uap-ac-mesh" in model:
-            return 1000  # 1 Gbps
-        elif "uap-ac-iw" in model:
-            return 1000  # 1 Gbps
-        elif "uap-ac-m" in model:
-            return 1000  # 1 Gbps
-        elif "uap-ac-hd" in model:
-            return 1000  # 1 Gbps
-        elif "uap-ac-shd" in model:
-            return 1000  # 1 Gbps
-        elif "uap-ac-xg" in model:
-            return 10000  # 10 Gbps
-        elif "uap-iw-hd" in model:
-            return 1000  # 1 Gbps
-        elif "uap-flexhd" in model:
-            return 1000  # 1 Gbps
-        elif "uap-beaconhd" in model:
-            return 1000  # 1 Gbps
-        elif "uap-nanohd" in model:
-            return 1000  # 1 Gbps
-        elif "uap-iw" in model:
-            return 1000  # 1 Gbps
-        elif "uap" in model and "ac" in model:
-            return 1000  # Default for AC series
-        elif "uap" in model and "6" in model:
-            return 1000  # Default for U6 series
-    
-    # UniFi Switches
-    elif "usw" in device_type or "switch" in device_type:
-        if "usw-enterprise-24-poe" in model:
-            return 10000  # 10 Gbps SFP+
-        elif "usw-enterprise-48-poe" in model:
-            return 10000  # 10 Gbps SFP+
-        elif "usw-enterprise-8-poe" in model:
-            return 10000  # 10 Gbps SFP+
-        elif "usw-enterprise-24" in model:
-            return 10000  # 10 Gbps SFP+
-        elif "usw-enterprise-48" in model:
-            return 10000  # 10 Gbps SFP+
-        elif "usw-enterprise-8" in model:
-            return 10000  # 10 Gbps SFP+
-        elif "usw-pro-24-poe" in model:
-            return 10000  # 10 Gbps SFP+
-        elif "usw-pro-48-poe" in model:
-            return 10000  # 10 Gbps SFP+
-        elif "usw-pro-24" in model:
-            return 10000  # 10 Gbps SFP+
-        elif "usw-pro-48" in model:
-            return 10000  # 10 Gbps SFP+
-        elif "usw-24-poe" in model:
-            return 1000  # 1 Gbps
-        elif "usw-48-poe" in model:
-            return 1000  # 1 Gbps
-        elif "usw-24" in model:
-            return 1000  # 1 Gbps
-        elif "usw-48" in model:
-            return 1000  # 1 Gbps
-        elif "usw-16-poe" in model:
-            return 1000  # 1 Gbps
-        elif "usw-8-poe" in model:
-            return 1000  # 1 Gbps
-        elif "usw-8" in model:
-            return 1000  # 1 Gbps
-        elif "usw-flex" in model:
-            return 1000  # 1 Gbps
-        elif "usw-lite-8-poe" in model:
-            return 1000  # 1 Gbps
-        elif "usw-lite-16-poe" in model:
-            return 1000  # 1 Gbps
-        elif "usw" in model:
-            return 1000  # Default for USW series
-    
-    # UniFi Gateways/Routers
-    elif "ugw" in device_type or "gateway" in device_type or "router" in device_type:
-        if "udm-pro" in model:
-            return 10000  # 10 Gbps SFP+
-        elif "udm-se" in model:
-            return 10000  # 10 Gbps SFP+
-        elif "udr" in model:
-            return 1000  # 1 Gbps
-        elif "udm" in model:
-            return 1000  # 1 Gbps
-        elif "usg" in model:
-            return 1000  # 1 Gbps
-        elif "uxg" in model:
-            return 10000  # 10 Gbps SFP+
-    
-    # Default fallback
-    return None
+def _devices_fingerprint(devices):
+    """The fields the table shows plus firmware version (so a finished upgrade ends the back-off);
+    counters and uptime are left out so an idle site compares equal."""
+    return frozenset(((d.get("mac") or "").lower(), version_key(d), d.get("version") or "") for d in devices)
+
+def view_logger(log_bus):
+    """log(text, level=INFO, source="ui") onto log_bus, or a no-op without one."""
+    if log_bus is None:
+        return lambda s, *a, **k: None
+    return lambda s, level=INFO, source="ui": log_bus.log(s, level, source)
 
 class DevicesView(QtWidgets.QWidget):
-    def __init__(self, ctrl: ControllerClient, log_bus=None, parent=None):
+    def __init__(self, ctrl: ControllerClient, log_bus=None, tasks: TaskExecutor = None,
+                 scheduler: RefreshScheduler = None, parent=None):
         super().__init__(parent)
         self.ctrl = ctrl
-        self.log = (log_bus.log if log_bus else (lambda s: None))
+        self.tasks = tasks or TaskExecutor(parent=self)
+        self.scheduler = scheduler or RefreshScheduler(self.tasks, parent=self)
+        self.log = view_logger(log_bus)
+        # Derived fields are computed once per device version; rows are reused while unchanged
+        self.projector = DeviceProjector(self.log)
+        self._row_cache = {}
+        # The poll reads stat/device-basic and only re-reads the full list when that changes
+        self.device_list = DeviceListFeed()
+        # Full per-device detail is fetched only for the selection (and its neighbours)
+        self.details = DeviceDetailCache(ctrl)
         self.site_key = "default"
 
         # Controls
         top = QtWidgets.QHBoxLayout()
         self.ed_filter = QtWidgets.QLineEdit()
         self.ed_filter.setPlaceholderText("Filter by name/model/MAC…")
+        self.ed_filter.setClearButtonEnabled(True)
         self.btn_refresh = QtWidgets.QPushButton("Refresh")
         self.btn_refresh.clicked.connect(self.refresh)
         self.btn_upgrade_sel = QtWidgets.QPushButton("Upgrade Firmware (Selected)")
@@ -204,6 +60,10 @@ class DevicesView(QtWidgets.QWidget):
         self.btn_filter_updates = QtWidgets.QPushButton("Show Updates Only")
         self.btn_filter_updates.setCheckable(True)
         self.btn_filter_updates.clicked.connect(self.toggle_update_filter)
+        self.btn_details = QtWidgets.QPushButton("Details")
+        self.btn_details.setCheckable(True)
+        self.btn_details.setToolTip("Show port, radio and uplink detail for the selected device")
+        self.btn_details.toggled.connect(self._toggle_details)
 
         top.addWidget(self.ed_filter, 1)
         top.addWidget(self.btn_refresh)
@@ -213,185 +73,222 @@ class DevicesView(QtWidgets.QWidget):
         top.addWidget(self.btn_debug)
         top.addWidget(self.btn_test_ssh)
         top.addWidget(self.btn_filter_updates)
+        top.addWidget(self.btn_details)
 
-        # Table
-        self.table = QtWidgets.QTableWidget(0, 10)
-        self.table.setHorizontalHeaderLabels(["Name","Model","Type","MAC","State","Uplink","IP","Adopted","Update","Locate"])
+        # Table (model/view: refreshes apply only the per-device differences)
+        self.model = DeviceTableModel(self)
+        # Filtering/sorting happen in the proxy against the cached rows, never via a refetch
+        self.proxy = DeviceFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        self.ed_filter.textChanged.connect(self.proxy.set_text)
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(COL_NAME, QtCore.Qt.AscendingOrder)
         self.table.horizontalHeader().setStretchLastSection(True)
-        self.table.setSelectionBehavior(QtWidgets.QTableWidget.SelectRows)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.setWordWrap(False)
+        self.table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(22)
         
         # Connect double-click event for SSH
-        self.table.itemDoubleClicked.connect(self._on_device_double_clicked)
+        self.table.doubleClicked.connect(self._on_device_double_clicked)
+
+        # Detail panel: loads after the selection settles, not on every arrow-key step
+        self.detail_panel = DeviceDetailPanel()
+        self.detail_panel.refresh_requested.connect(lambda: self._load_detail(force=True))
+        self.detail_panel.hide()
+        self._detail_timer = QtCore.QTimer(self)
+        self._detail_timer.setSingleShot(True)
+        self._detail_timer.setInterval(150)
+        self._detail_timer.timeout.connect(self._load_detail)
+        self.table.selectionModel().currentRowChanged.connect(lambda *_: self._detail_timer.start())
+        self.splitter = QtWidgets.QSplitter(QtCore.Qt.Horizontal)
+        self.splitter.addWidget(self.table)
+        self.splitter.addWidget(self.detail_panel)
+        self.splitter.setStretchFactor(0, 3)
+        self.splitter.setStretchFactor(1, 2)
 
         # Actions under table
         act = QtWidgets.QHBoxLayout()
         self.btn_loc_on = QtWidgets.QPushButton("Locate ON")
         self.btn_loc_off = QtWidgets.QPushButton("Locate OFF")
         self.btn_alias = QtWidgets.QPushButton("Set Alias…")
+        self.btn_import_names = QtWidgets.QPushButton("Import Names…")
+        self.btn_import_names.setToolTip("Rename devices from a CSV/JSON file mapping MAC or serial to name")
         self.btn_adopt = QtWidgets.QPushButton("Adopt (Selected)")
         self.btn_setinform = QtWidgets.QPushButton("SSH set‑inform (Selected)")
+        self.btn_fleet = QtWidgets.QPushButton("Run SSH Command…")
+        self.btn_fleet.setToolTip("Run a shell command on all online APs in this site (or the selected rows)")
 
         self.btn_loc_on.clicked.connect(lambda: self._locate(True))
         self.btn_loc_off.clicked.connect(lambda: self._locate(False))
         self.btn_alias.clicked.connect(self._alias)
+        self.btn_import_names.clicked.connect(self._import_names)
         self.btn_adopt.clicked.connect(self._adopt)
         self.btn_setinform.clicked.connect(self._ssh_inform)
+        self.btn_fleet.clicked.connect(self._fleet_command)
 
         act.addWidget(self.btn_loc_on)
         act.addWidget(self.btn_loc_off)
         act.addSpacing(16)
         act.addWidget(self.btn_alias)
+        act.addWidget(self.btn_import_names)
         act.addSpacing(16)
         act.addWidget(self.btn_adopt)
         act.addWidget(self.btn_setinform)
+        act.addSpacing(16)
+        act.addWidget(self.btn_fleet)
         act.addStretch(1)
 
         lay = QtWidgets.QVBoxLayout(self)
         lay.addLayout(top)
-        lay.addWidget(self.table)
+        lay.addWidget(self.splitter)
         lay.addLayout(act)
 
-        # Timer for auto refresh
-        self.timer = QtCore.QTimer(self)
-        self.timer.setInterval(10000)
-        self.timer.timeout.connect(self.refresh)
-        self.timer.start()
+        # SSH connections are kept between fleet runs
+        self._ssh_pool = SSHPool()
+
+        # Auto refresh: polled only while visible, backing off while nothing changes
+        self.scheduler.register("devices", self, "devices", site=lambda: self.site_key,
+                                fetch=lambda site: self.device_list.records(self.ctrl, site),
+                                apply=self._apply_devices, fingerprint=_devices_fingerprint)
+
+    def _details(self) -> DeviceDetailCache:
+        # MainWindow swaps self.ctrl when settings change; cached detail belongs to the old controller
+        if self.details.ctrl is not self.ctrl:
+            self.details = DeviceDetailCache(self.ctrl)
+        return self.details
 
     def set_site(self, site_key: str):
         self.site_key = site_key or "default"
+        self._details().invalidate()
+        self.detail_panel.clear()
         self.refresh()
 
-    def _rows(self):
-        for r in range(self.table.rowCount()):
-            yield r
+    def _selected_rows(self):
+        rows = []
+        for idx in self.table.selectionModel().selectedRows():
+            row = self.proxy.row_at(idx.row())
+            if row:
+                rows.append(row)
+        return rows
 
     def _selected_macs(self):
-        sel = set([idx.row() for idx in self.table.selectedIndexes()])
-        macs = []
-        for r in sel:
-            item = self.table.item(r, 3)  # MAC is still in column 3
-            if item:
-                macs.append(item.text())
-        return macs
+        return [r["values"][COL_MAC] for r in self._selected_rows() if r["values"][COL_MAC]]
 
-    def refresh(self):
-        self.table.setRowCount(0)
-        try:
-            devices = self.ctrl.get_devices(self.site_key)
-        except Exception as e:
-            QtWidgets.QMessageBox.warning(self, "Devices", f"Failed to load devices:\n{e}")
+    def _device_row(self, d: dict):
+        """Table row for a controller device, rebuilt only when its projection changed."""
+        p = self.projector.project(d)
+        cached = self._row_cache.get(p["mac"].lower())
+        if cached is not None and cached[0] is p:
+            cached[1]["device"] = d
+            return cached[1]
+        vals = (p["name"], p["model"], p["type"], p["mac"], p["state"], p["uplink_display"], p["ip"],
+                "yes" if p["adopted"] else "no", p["update"], p["locating"])
+        sort = tuple(v.lower() for v in vals)
+        sort = sort[:COL_UPLINK] + (p["link_sort"], p["ip_sort"]) + sort[COL_IP + 1:]
+        row = {"mac": p["mac"], "values": vals, "search": p["search"], "sort": sort, "device": d}
+        self._row_cache[p["mac"].lower()] = (p, row)
+        return row
+
+    # ----- detail panel -----
+    def _toggle_details(self, on: bool):
+        self.detail_panel.setVisible(on)
+        if on:
+            self._load_detail()
+
+    def _current_row(self, offset: int = 0):
+        cur = self.table.selectionModel().currentIndex()
+        if not cur.isValid():
+            return None
+        r = cur.row() + offset
+        if r < 0 or r >= self.proxy.rowCount():
+            return None
+        return self.proxy.row_at(r)
+
+    def _load_detail(self, force: bool = False):
+        if not self.detail_panel.isVisible():
+            return
+        row = self._current_row()
+        if not row or not row["mac"]:
+            self.detail_panel.clear()
             return
+        site, mac = self.site_key, row["mac"].lower()
+        hit = None if force else self._details().cached(site, mac)
+        if hit is not None:
+            self.detail_panel.show_detail(mac, hit)
+        else:
+            self.detail_panel.show_loading(mac, row["values"][COL_NAME])
 
-        filt = (self.ed_filter.text() or "").strip().lower()
-        for d in devices:
-            name = d.get("name") or d.get("hostname") or ""
-            model = d.get("model") or ""
-            dtype = d.get("type") or d.get("device_type") or ""
-            mac = d.get("mac") or ""
-            online = bool(d.get("state") == 1 or d.get("connected"))
-            state = "online" if online else "offline"
-            upl = d.get("uplink") or {}
-            link = upl.get("speed") or upl.get("link_speed") or upl.get("uplink_speed") or ""
-            maxcap = _max_cap_from_tables(d)
-            ip = d.get("ip") or ""
-            adopted = "yes" if d.get("adopted") else "no"
-            update_available = _check_update_available(d)
-            locating = "ON" if d.get("locating") else "OFF"
-
-            text = " ".join([name, model, dtype, mac, state, str(link), str(maxcap or ""), update_available, locating]).lower()
-            if filt and filt not in text:
+            def done(detail):
+                if site == self.site_key and self.detail_panel.mac == mac:
+                    self.detail_panel.show_detail(mac, detail)
+
+            # Same key as a prefetch, so a row whose prefetch is in flight just waits for it
+            self.tasks.submit(f"detail:{site}:{mac}", self._details().get, site, mac, force,
+                              on_result=done, on_error=self._failed("Device detail"))
+        self._prefetch_neighbours(site)
+
+    def _prefetch_neighbours(self, site: str):
+        for offset in (1, -1, 2):
+            row = self._current_row(offset)
+            if not row or not row["mac"]:
                 continue
+            mac = row["mac"].lower()
+            key = f"detail:{site}:{mac}"
+            if not self._details().is_fresh(site, mac) and not self.tasks.is_running(key):
+                self.tasks.submit(key, self._details().get, site, mac)
 
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            
-            # Format uplink speed with visual indicator if below threshold
-            uplink_display = _fmt_speed(link) if link else ""
-            is_low_speed = False
-            try:
-                if link and maxcap:
-                    link_speed = float(link)
-                    max_speed = float(maxcap)
-                    device_type = (d.get("type") or d.get("device_type") or "").lower()
-                    model = d.get("model", "unknown")
-                    name = d.get("name", "unknown")
-                    
-                    # Different thresholds for different device types
-                    if "switch" in device_type or "usw" in device_type:
-                        # For switches, only warn if less than 1 Gbps
-                        threshold = 1000  # 1 Gbps threshold for switches
-                        self.log(f"Switch {name} ({model}): Link={link_speed}Mbps, Switch threshold=1000Mbps")
-                    else:
-                        # For APs and other devices, use 80% of max capability
-                        threshold = max_speed * 0.8
-                        self.log(f"Device {name} ({model}): Link={link_speed}Mbps, Max={max_speed}Mbps, Threshold={threshold}Mbps")
-                    
-                    if link_speed < threshold:
-                        is_low_speed = True
-                        warning_symbol = "!"  # Simple exclamation mark
-                        uplink_display = f"{warning_symbol} {uplink_display}"
-                        self.log(f"LOW SPEED WARNING: {name} ({model}) - {link_speed}Mbps < {threshold}Mbps")
-                        self.log(f"Uplink display will be: '{uplink_display}'")
-                elif link and not maxcap:
-                    # Debug when we have link speed but no max capability
-                    model = d.get("model", "unknown")
-                    name = d.get("name", "unknown")
-                    self.log(f"Device {name} ({model}): Link={link}Mbps but no max capability detected")
-            except Exception as e:
-                self.log(f"Error checking speed threshold: {e}")
-                pass
-            
-            vals = [name, model, dtype, mac, state, uplink_display, ip, adopted, update_available, locating]
-            for c, v in enumerate(vals):
-                item = QtWidgets.QTableWidgetItem(str(v))
-                if c == 4 and not online:  # State column
-                    item.setForeground(QtCore.Qt.red)
-                elif c == 5:  # Uplink column
-                    if is_low_speed:
-                        item.setForeground(QtCore.Qt.darkRed)  # Dark red text for better contrast
-                        item.setBackground(QtGui.QColor(255, 248, 220))  # Light yellow background
-                        item.setFont(QtGui.QFont("Arial", 9, QtGui.QFont.Bold))  # Bold font for emphasis
-                        self.log(f"Applied low speed styling to {name}: text='{v}', is_low_speed={is_low_speed}")
-                    elif not link:
-                        item.setForeground(QtCore.Qt.gray)
-                elif c == 8:  # Update column
-                    if update_available == "Yes":
-                        item.setForeground(QtCore.Qt.blue)
-                        item.setFont(QtGui.QFont("Arial", 9, QtGui.QFont.Bold))
-                        item.setBackground(QtGui.QColor(240, 248, 255))  # Light blue background
-                    elif update_available == "Unknown":
-                        item.setForeground(QtCore.Qt.gray)
-                    else:
-                        item.setForeground(QtCore.Qt.darkGreen)
-                elif c == 9:  # Locate column (now column 9)
-                    if locating == "ON":
-                        item.setForeground(QtCore.Qt.green)
-                        item.setFont(QtGui.QFont("Arial", 9, QtGui.QFont.Bold))
-                    else:
-                        item.setForeground(QtCore.Qt.gray)
-                self.table.setItem(row, c, item)
+    def _failed(self, title: str):
+        return lambda e: QtWidgets.QMessageBox.warning(self, title, f"{title} failed:\n{e}")
+
+    def refresh(self):
+        self.device_list.mark_stale(self.site_key)
+        self.scheduler.refresh_now("devices")
+
+    def _apply_devices(self, site: str, devices):
+        if site != self.site_key:
+            return  # Site changed while the fetch was in flight
+        rows = [self._device_row(d) for d in devices]
+        live = set(r["mac"].lower() for r in rows)
+        for mac in [m for m in self._row_cache if m not in live]:
+            del self._row_cache[mac]
+        self.projector.retain(live)
+        self.model.set_rows(rows)
 
     def _locate(self, on: bool):
         macs = self._selected_macs()
         if not macs:
             QtWidgets.QMessageBox.information(self, "Locate", "Select at least one device row.")
             return
-        ok = 0
-        for m in macs:
-            if self.ctrl.set_locate(self.site_key, m, on):
-                ok += 1
-        QtWidgets.QMessageBox.information(self, "Locate", f"{'Enabled' if on else 'Disabled'} locate on {ok}/{len(macs)} devices.")
-        self.refresh()  # Refresh to show updated locate status
+
+        def done(results):
+            ok = sum(1 for v in results.values() if v)
+            QtWidgets.QMessageBox.information(self, "Locate", f"{'Enabled' if on else 'Disabled'} locate on {ok}/{len(macs)} devices.")
+            for mac in macs:
+                self._details().invalidate(self.site_key, mac)
+            self.refresh()  # Refresh to show updated locate status
+
+        self.tasks.submit(f"locate:{self.site_key}", self.ctrl.set_locate_many, self.site_key, macs, on,
+                          on_result=done, on_error=self._failed("Locate"))
 
     def debug_speed_info(self):
-        """Debug method to show speed information for all devices"""
-        try:
-            devices = self.ctrl.get_devices(self.site_key)
-        except Exception as e:
-            QtWidgets.QMessageBox.warning(self, "Debug", f"Failed to load devices:\n{e}")
+        """Debug method to show speed information for the selected devices (all if none selected)"""
+        macs = self._selected_macs()
+        if macs:
+            site, details = self.site_key, self._details()
+
+            def work():
+                return [d for _m, d, _e in run_bounded(lambda m: details.get(site, m), macs, 8) if d]
+
+            self.tasks.submit(f"debug:{site}", work, on_result=self._show_speed_info, on_error=self._failed("Debug"))
             return
-        
+        self.tasks.submit(f"devices:{self.site_key}", self.ctrl.get_devices, self.site_key,
+                          on_result=self._show_speed_info, on_error=self._failed("Debug"))
+
+    def _show_speed_info(self, devices):
         debug_info = []
         for d in devices:
             name = d.get("name") or d.get("hostname") or "Unknown"
@@ -403,7 +300,7 @@ class DevicesView(QtWidgets.QWidget):
             link = upl.get("speed") or upl.get("link_speed") or upl.get("uplink_speed") or ""
             
             # Get max capability
-            maxcap = _max_cap_from_tables(d)
+            maxcap = max_uplink_mbps(d)
             
             # Get port/ethernet table info
             ethernet_table = d.get("ethernet_table", [])
@@ -462,35 +359,26 @@ class DevicesView(QtWidgets.QWidget):
 
     def toggle_update_filter(self):
         """Toggle filter to show only devices with updates available"""
-        if self.btn_filter_updates.isChecked():
-            self.btn_filter_updates.setText("Show All")
-            self.ed_filter.setText("yes")
-            self.refresh()
-        else:
-            self.btn_filter_updates.setText("Show Updates Only")
-            self.ed_filter.clear()
-            self.refresh()
+        only = self.btn_filter_updates.isChecked()
+        self.btn_filter_updates.setText("Show All" if only else "Show Updates Only")
+        self.proxy.set_updates_only(only)
 
-    def _on_device_double_clicked(self, item):
+    def _on_device_double_clicked(self, index):
         """Handle double-click on device in devices table"""
-        if not item:
+        if not index.isValid():
             return
         
-        row = item.row()
-        ip_item = self.table.item(row, 6)  # IP column (index 6)
-        if not ip_item:
+        row = self.proxy.row_at(index.row())
+        if not row:
             return
         
-        ip = ip_item.text()
+        ip = row["values"][COL_IP]
         if not ip:
             return
         
         # Get device info
-        name_item = self.table.item(row, 0)  # Name column
-        adopted_item = self.table.item(row, 7)  # Adopted column
-        
-        device_name = name_item.text() if name_item else "Unknown"
-        is_adopted = adopted_item and "yes" in adopted_item.text().lower()
+        device_name = row["values"][COL_NAME] or "Unknown"
+        is_adopted = "yes" in row["values"][COL_ADOPTED].lower()
         
         self._launch_ssh_terminal(ip, device_name, is_adopted, self.site_key)
 
@@ -605,64 +493,226 @@ class DevicesView(QtWidgets.QWidget):
         name, ok = QtWidgets.QInputDialog.getText(self, "Set Alias", f"Alias for {mac}:")
         if not ok or not name.strip():
             return
-        if self.ctrl.set_alias(self.site_key, mac, name.strip()):
+
+        def done(accepted):
+            if accepted:
+                self._details().invalidate(self.site_key, mac)
+                self.refresh()
+            else:
+                QtWidgets.QMessageBox.warning(self, "Alias", "Controller did not accept alias update.")
+
+        self.tasks.submit(f"alias:{mac}", self.ctrl.set_alias, self.site_key, mac, name.strip(),
+                          on_result=done, on_error=self._failed("Alias"))
+
+    def _import_names(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Import Device Names", "",
+                                                        "Name lists (*.csv *.json);;All files (*)")
+        if not path:
+            return
+        try:
+            rows = load_name_rows(path)
+        except Exception as e:
+            QtWidgets.QMessageBox.warning(self, "Import Names", f"Could not read {path}:\n{e}")
+            return
+        if not rows:
+            QtWidgets.QMessageBox.information(self, "Import Names", "The file contains no rows.")
+            return
+
+        def done(report):
+            ok = sum(1 for r in report if r["status"] in ("ok", "unchanged"))
+            msg = QtWidgets.QMessageBox(self)
+            msg.setWindowTitle("Import Names")
+            msg.setText(f"Named {ok}/{len(report)} device(s).")
+            msg.setDetailedText(format_naming_report(report))
+            msg.setStandardButtons(QtWidgets.QMessageBox.Ok)
+            msg.exec_()
             self.refresh()
-        else:
-            QtWidgets.QMessageBox.warning(self, "Alias", "Controller did not accept alias update.")
+
+        self.log(f"Importing {len(rows)} name(s) from {path}…")
+        self.tasks.submit(f"names:{self.site_key}", BulkNamer(self.ctrl).apply, self.site_key, rows,
+                          on_result=done, on_error=self._failed("Import Names"))
 
     def _adopt(self):
         macs = self._selected_macs()
         if not macs:
             QtWidgets.QMessageBox.information(self, "Adopt", "Select an unadopted device first.")
             return
-        done = 0
-        for m in macs:
-            if self.ctrl.adopt_device(self.site_key, m):
-                done += 1
-        self.refresh()
-        QtWidgets.QMessageBox.information(self, "Adopt", f"Adopt requested for {done}/{len(macs)} devices.")
+        site = self.site_key
+
+        def work():
+            return sum(1 for m in macs if self.ctrl.adopt_device(site, m))
+
+        def done(count):
+            self.scheduler.boost("devices", 120)  # Watch the adoption come through
+            self.refresh()
+            QtWidgets.QMessageBox.information(self, "Adopt", f"Adopt requested for {count}/{len(macs)} devices.")
+
+        self.tasks.submit(f"adopt:{site}", work, on_result=done, on_error=self._failed("Adopt"))
 
     def upgrade_selected(self):
         macs = self._selected_macs()
         if not macs:
             QtWidgets.QMessageBox.information(self, "Upgrade", "Select at least one device row.")
             return
-        done = 0
-        for m in macs:
-            if self.ctrl.upgrade_device(self.site_key, m):
-                done += 1
-        QtWidgets.QMessageBox.information(self, "Upgrade", f"Upgrade requested for {done}/{len(macs)} devices.")
+        site = self.site_key
+
+        def work():
+            return sum(1 for m in macs if self.ctrl.upgrade_device(site, m))
+
+        self.tasks.submit(f"upgrade:{site}", work, on_error=self._failed("Upgrade"),
+                          on_result=lambda count: QtWidgets.QMessageBox.information(
+                              self, "Upgrade", f"Upgrade requested for {count}/{len(macs)} devices."))
 
     def upgrade_all(self):
-        # naive: attempt upgrade on all devices that report upgradable==True
-        try:
-            devices = self.ctrl.get_devices(self.site_key)
-        except Exception as e:
-            QtWidgets.QMessageBox.warning(self, "Upgrade", f"Failed to load devices: {e}")
+        """Rolling upgrade of every upgradable device, a few per uplink at a time."""
+        if self.tasks.is_running(f"rolling-upgrade:{self.site_key}"):
+            QtWidgets.QMessageBox.information(self, "Upgrade", "A rolling upgrade is already running.")
+            return
+        self.tasks.submit(f"devices:{self.site_key}", self.ctrl.get_devices, self.site_key,
+                          on_result=self._start_rolling_upgrade, on_error=self._failed("Upgrade"))
+
+    def _start_rolling_upgrade(self, devices):
+        site = self.site_key
+        key = f"rolling-upgrade:{site}"
+        job = UpgradeOrchestrator(self.ctrl, site)
+        targets = job.targets(devices)
+        if not targets:
+            QtWidgets.QMessageBox.information(self, "Upgrade", "No online devices report an available upgrade.")
+            return
+        waves = plan_waves(targets, job.max_per_uplink, job.max_wave_size, topology=devices)
+        ans = QtWidgets.QMessageBox.question(self, "Upgrade",
+            f"Upgrade {len(targets)} device(s) in {len(waves)} wave(s)?\n"
+            f"At most {job.max_per_uplink} device(s) behind the same uplink reboot at once.")
+        if ans != QtWidgets.QMessageBox.Yes:
             return
-        done = 0
-        targets = [d for d in devices if d.get("upgradable")]
-        for d in targets:
-            if self.ctrl.upgrade_device(self.site_key, d.get("mac")):
-                done += 1
-        QtWidgets.QMessageBox.information(self, "Upgrade", f"Upgrade requested for {done}/{len(targets)} devices.")
+
+        progress = QtWidgets.QProgressDialog("Starting rolling upgrade…", "Stop", 0, len(targets), self)
+        progress.setWindowTitle("Rolling Upgrade")
+        progress.setMinimumDuration(0)
+        progress.canceled.connect(job.stop)
+
+        def on_progress(p):
+            self.scheduler.boost("devices", 30)
+            eta = f"{p['eta_s'] // 60}m {p['eta_s'] % 60}s" if p.get("eta_s") is not None else "…"
+            progress.setLabelText(f"Wave {p['wave']}/{p['waves']} — {p['done']} done, {p['failed']} failed\n"
+                                  f"{p['per_min']} devices/min, ETA {eta}\n{p['message']}")
+            progress.setValue(min(p["done"] + p["failed"], p["total"]))
+
+        def done(_results):
+            progress.close()
+            QtWidgets.QMessageBox.information(self, "Upgrade", job.progress["message"] or "Rolling upgrade finished.")
+            self.refresh()
+
+        def failed(e):
+            progress.close()
+            QtWidgets.QMessageBox.warning(self, "Upgrade", f"Rolling upgrade failed:\n{e}")
+
+        self.tasks.submit(key, lambda: job.run(devices, on_progress=lambda p: self.tasks.report(key, p)),
+                          on_result=done, on_error=failed, on_progress=on_progress)
 
     def _ssh_inform(self):
         macs = self._selected_macs()
         if not macs:
             QtWidgets.QMessageBox.information(self, "set‑inform", "Select a device row (with an IP).")
             return
-        done = 0
+        ips = []
         for m in macs:
             # find IP from table
-            items = self.table.findItems(m, QtCore.Qt.MatchExactly)
-            ip = ""
-            for it in items:
-                if it.column() == 3:
-                    row = it.row()
-                    ip = self.table.item(row, 7).text() if self.table.item(row, 7) else ""
-            if not ip:
-                continue
-            if self.ctrl.ssh_set_inform(ip):
-                done += 1
-        QtWidgets.QMessageBox.information(self, "set‑inform", f"set‑inform attempted on {done}/{len(macs)} with an IP.")
+            row = self.model.row_for_mac(m)
+            ip = row["values"][COL_IP] if row else ""
+            if ip:
+                ips.append(ip)
+
+        def work():
+            return sum(1 for ip in ips if self.ctrl.ssh_set_inform(ip))
+
+        self.tasks.submit(f"set-inform:{self.site_key}", work, on_error=self._failed("set‑inform"),
+                          on_result=lambda done: QtWidgets.QMessageBox.information(
+                              self, "set‑inform", f"set‑inform attempted on {done}/{len(macs)} with an IP."))
+
+    def _fleet_command(self):
+        cmd, ok = QtWidgets.QInputDialog.getText(self, "Run SSH Command", "Command to run on each AP:", text="info")
+        if not ok or not cmd.strip():
+            return
+        cmd = cmd.strip()
+        site = self.site_key
+        key = f"fleet:{site}"
+        if self.tasks.is_running(key):
+            QtWidgets.QMessageBox.information(self, "Run SSH Command", "A command is already running on this site.")
+            return
+        runner = FleetRunner(self.ctrl, pool=self._ssh_pool)
+        macs = set(m.lower() for m in self._selected_macs())
+
+        def work():
+            targets = runner.site_targets(site)
+            if macs:
+                targets = [t for t in targets if t["mac"] in macs]
+            self.tasks.report(key, ("targets", len(targets)))
+            return runner.run(targets, cmd, site_key=site, on_result=lambda res: self.tasks.report(key, ("result", res)))
+
+        progress = QtWidgets.QProgressDialog(f"Running '{cmd}'…", "Hide", 0, 0, self)
+        progress.setWindowTitle("Run SSH Command")
+        progress.setMinimumDuration(0)
+        done_count = [0]
+
+        def on_progress(msg):
+            kind, value = msg
+            if kind == "targets":
+                progress.setMaximum(max(value, 1))
+            else:
+                done_count[0] += 1
+                progress.setValue(done_count[0])
+                progress.setLabelText(f"Running '{cmd}'… {done_count[0]}/{progress.maximum()}\nLast: {value['host']} "
+                                      f"{'OK' if value['ok'] else 'FAIL'} ({value['latency_ms']} ms)")
+
+        def done(results):
+            progress.close()
+            if not results:
+                QtWidgets.QMessageBox.information(self, "Run SSH Command", "No online APs with an IP to run on.")
+                return
+            self._show_fleet_results(cmd, results)
+
+        def failed(e):
+            progress.close()
+            QtWidgets.QMessageBox.warning(self, "Run SSH Command", f"Run SSH Command failed:\n{e}")
+
+        self.tasks.submit(key, work, on_result=done, on_error=failed, on_progress=on_progress)
+
+    def _show_fleet_results(self, cmd: str, results):
+        ok = sum(1 for r in results if r["ok"])
+        dialog = QtWidgets.QDialog(self)
+        dialog.setWindowTitle(f"SSH Command Results — {ok}/{len(results)} OK")
+        dialog.resize(900, 600)
+        layout = QtWidgets.QVBoxLayout(dialog)
+
+        text_edit = QtWidgets.QPlainTextEdit()
+        text_edit.setReadOnly(True)
+        text_edit.setFont(QtGui.QFont("Courier New", 9))
+        detail = [format_table(results), ""]
+        for r in sorted(results, key=lambda x: x["host"]):
+            detail.append(f"===== {r['host']} {r['name']} ({r['latency_ms']} ms) =====")
+            detail.append((r["stdout"] or r["stderr"] or r["error"]).rstrip())
+            detail.append("")
+        text_edit.setPlainText("\n".join(detail))
+        layout.addWidget(text_edit)
+
+        button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Save | QtWidgets.QDialogButtonBox.Close)
+        button_box.rejected.connect(dialog.reject)
+
+        def save():
+            path, flt = QtWidgets.QFileDialog.getSaveFileName(dialog, "Export Results", "fleet_results.jsonl",
+                                                              "JSON Lines (*.jsonl);;CSV (*.csv)")
+            if not path:
+                return
+            try:
+                if path.lower().endswith(".csv"):
+                    export_csv(results, path)
+                else:
+                    export_jsonl(results, path)
+                self.log(f"Fleet results for '{cmd}' exported to {path}")
+            except Exception as e:
+                QtWidgets.QMessageBox.warning(dialog, "Export", f"Failed to export results:\n{e}")
+
+        button_box.accepted.connect(save)
+        layout.addWidget(button_box)
+        dialog.exec_()
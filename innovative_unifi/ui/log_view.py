@@ -0,0 +1,50 @@
+from PyQt5 import QtWidgets, QtCore, QtGui
+from ..core.logger_bus import LogBus, DEBUG, INFO, format_record
+
+class LogView(QtWidgets.QPlainTextEdit):
+    """Read-only log pane fed from the LogBus ring buffer.
+    New records are pulled and appended in one batch per tick, only while the pane is visible;
+    the block limit keeps memory flat over long sessions.
+    """
+    def __init__(self, log_bus: LogBus, max_blocks: int = 2000, interval_ms: int = 250, parent=None):
+        super().__init__(parent)
+        self.log_bus = log_bus
+        self.min_level = INFO
+        self._seq = 0
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(max_blocks)
+        self.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+        self.setFont(QtGui.QFont("Courier New", 9))
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    def set_min_level(self, level: int):
+        """Show records at or above level; re-renders what is still in the ring buffer."""
+        self.min_level = level
+        self.clear()
+        self._seq = 0
+        self.flush()
+
+    def show_debug(self, enabled: bool):
+        self.set_min_level(DEBUG if enabled else INFO)
+
+    def flush(self):
+        if not self.isVisible():
+            return  # catch up from the ring buffer when shown again
+        upto = self.log_bus.last_seq()
+        recs = [r for r in self.log_bus.records_since(self._seq, self.min_level) if r[0] <= upto]
+        self._seq = upto
+        if not recs:
+            return
+        recs = recs[-self.maximumBlockCount():]
+        bar = self.verticalScrollBar()
+        at_bottom = bar.value() >= bar.maximum() - 4
+        self.appendPlainText("\n".join(format_record(r) for r in recs))
+        if at_bottom:
+            bar.setValue(bar.maximum())
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.flush()
@@ -2,10 +2,14 @@ from PyQt5 import QtWidgets, QtCore
 from ..core.settings_store import SettingsStore
 from ..core.controller import ControllerClient
 from ..core.logger_bus import LogBus
+from ..core.tasks import TaskExecutor
+from ..core.refresh import RefreshScheduler
+from ..core.backup import SiteBackup, format_manifest, format_plan as format_restore_plan
 from .devices_view import DevicesView
 from .wifi_view import WiFiView
 from .wizard_page import WizardPage
 from .settings_dialog import SettingsDialog
+from .log_view import LogView
 
 class MainWindow(QtWidgets.QMainWindow):
     def __init__(self):
@@ -14,6 +18,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self.store = SettingsStore()
         self.log_bus = LogBus()
         self.ctrl = ControllerClient(self.store, self.log_bus)
+        # One executor for every view so controller I/O never runs on the GUI thread
+        self.tasks = TaskExecutor(parent=self)
+        # Polls visible views only; a site is fetched at most once per interval across views
+        self.scheduler = RefreshScheduler(self.tasks, parent=self)
 
         # Menus
         bar = self.menuBar()
@@ -21,6 +29,11 @@ class MainWindow(QtWidgets.QMainWindow):
         act_settings = m_file.addAction("Settings…")
         act_settings.triggered.connect(self.open_settings)
         m_file.addSeparator()
+        act_backup = m_file.addAction("Backup Sites…")
+        act_backup.triggered.connect(self.backup_sites)
+        act_restore = m_file.addAction("Restore from Backup…")
+        act_restore.triggered.connect(self.restore_backup)
+        m_file.addSeparator()
         act_quit = m_file.addAction("Quit")
         act_quit.triggered.connect(self.close)
         
@@ -29,6 +42,10 @@ class MainWindow(QtWidgets.QMainWindow):
         act_toggle_log = m_view.addAction("Toggle Log")
         act_toggle_log.setShortcut("Ctrl+L")
         act_toggle_log.triggered.connect(self.toggle_log)
+        self.act_debug_log = m_view.addAction("Show Debug Messages")
+        self.act_debug_log.setCheckable(True)
+        act_cache = m_view.addAction("Cache Statistics…")
+        act_cache.triggered.connect(self.show_cache_stats)
 
         # Sites toolbar with searchable combo
         tb = QtWidgets.QToolBar("Sites")
@@ -63,9 +80,9 @@ class MainWindow(QtWidgets.QMainWindow):
 
         # Central tabs
         self.tabs = QtWidgets.QTabWidget()
-        self.devices = DevicesView(self.ctrl, self.log_bus)
-        self.wifi = WiFiView(self.ctrl, self.store)
-        self.wizard = WizardPage(self.ctrl, self.devices, self.wifi)
+        self.devices = DevicesView(self.ctrl, self.log_bus, tasks=self.tasks, scheduler=self.scheduler)
+        self.wifi = WiFiView(self.ctrl, self.store, tasks=self.tasks)
+        self.wizard = WizardPage(self.ctrl, self.devices, self.wifi, tasks=self.tasks)
 
         self.tabs.addTab(self.devices, "Devices")
         self.tabs.addTab(self.wifi, "Wi‑Fi")
@@ -77,20 +94,22 @@ class MainWindow(QtWidgets.QMainWindow):
 
         # Log dock (hidden by default)
         self.log_dock = QtWidgets.QDockWidget("Log", self)
-        self.log_view = QtWidgets.QTextEdit()
-        self.log_view.setReadOnly(True)
+        self.log_view = LogView(self.log_bus)
         self.log_view.setMaximumHeight(200)  # Limit height when visible
         self.log_dock.setWidget(self.log_view)
         self.addDockWidget(QtCore.Qt.BottomDockWidgetArea, self.log_dock)
         self.log_dock.hide()  # Hide by default
-        self.log_bus.message.connect(self._append_log)
+        self.act_debug_log.toggled.connect(self.log_view.show_debug)
 
         self.status = self.statusBar()
+        self.busy = QtWidgets.QProgressBar()
+        self.busy.setRange(0, 0)  # Indeterminate while any controller call is running
+        self.busy.setMaximumWidth(120)
+        self.busy.hide()
+        self.status.addPermanentWidget(self.busy)
+        self.tasks.busy_changed.connect(self.busy.setVisible)
         self.load_sites()
 
-    def _append_log(self, text: str):
-        self.log_view.append(text)
-
     def toggle_log(self):
         """Toggle the log dock visibility"""
         if self.log_dock.isVisible():
@@ -102,6 +121,15 @@ class MainWindow(QtWidgets.QMainWindow):
             self.btn_toggle_log.setText("Hide Log")
             self.btn_toggle_log.setChecked(True)
 
+    def show_cache_stats(self):
+        m = self.ctrl.cache.metrics()
+        QtWidgets.QMessageBox.information(self, "Cache Statistics",
+            f"Entries: {m['entries']}\n"
+            f"Fresh hits: {m['hits']}    Stale hits (served, refreshed in background): {m['stale_hits']}\n"
+            f"Misses: {m['misses']}    Hit rate: {m['hit_rate'] * 100:.0f}%\n"
+            f"Background refreshes: {m['refreshes']} ({m['refresh_errors']} failed)\n"
+            f"Invalidations: {m['invalidations']}")
+
     # ----- actions -----
     def open_settings(self):
         dlg = SettingsDialog(self.store, self)
@@ -113,18 +141,120 @@ class MainWindow(QtWidgets.QMainWindow):
             self.wizard.ctrl = self.ctrl
             self.load_sites()
 
+    def backup_sites(self):
+        key = "backup"
+        if self.tasks.is_running(key):
+            QtWidgets.QMessageBox.information(self, "Backup", "A backup is already running.")
+            return
+        site = self.cmb_sites.currentData() or "default"
+        box = QtWidgets.QMessageBox(QtWidgets.QMessageBox.Question, "Backup", "Which sites should be backed up?",
+                                    QtWidgets.QMessageBox.Cancel, self)
+        btn_all = box.addButton("All Sites", QtWidgets.QMessageBox.AcceptRole)
+        btn_one = box.addButton(f"Current Site ({site})", QtWidgets.QMessageBox.AcceptRole)
+        box.exec_()
+        if box.clickedButton() not in (btn_all, btn_one):
+            return
+        site_keys = None if box.clickedButton() is btn_all else [site]
+        default = f"unifi_backup_{'all' if site_keys is None else site}_{QtCore.QDateTime.currentDateTime().toString('yyyyMMdd_HHmm')}.tar.gz"
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Backup", default, "Site backup (*.tar.gz)")
+        if not path:
+            return
+        job = SiteBackup(self.ctrl)
+        progress = QtWidgets.QProgressDialog("Backing up sites…", "Stop", 0, 0, self)
+        progress.setWindowTitle("Backup")
+        progress.setMinimumDuration(0)
+        progress.canceled.connect(job.stop)
+        count = [0]
+
+        def work():
+            self.ctrl.login()
+            return job.backup(path, site_keys, on_progress=lambda s, entry: self.tasks.report(key, s))
+
+        def on_progress(s):
+            count[0] += 1
+            progress.setLabelText(f"Backing up sites… {count[0]} done\nLast: {s}")
+
+        def done(manifest):
+            progress.close()
+            failed = [s for s, e in manifest["sites"].items() if e.get("error")]
+            msg = QtWidgets.QMessageBox(self)
+            msg.setWindowTitle("Backup")
+            msg.setText(f"Backed up {len(manifest['sites']) - len(failed)}/{len(manifest['sites'])} site(s) to\n{path}")
+            msg.setDetailedText(format_manifest(manifest))
+            msg.exec_()
+
+        def failed(e):
+            progress.close()
+            QtWidgets.QMessageBox.warning(self, "Backup", f"Backup failed:\n{e}")
+
+        self.tasks.submit(key, work, on_result=done, on_error=failed, on_progress=on_progress)
+
+    def restore_backup(self):
+        if self.tasks.is_running("restore-plan") or self.tasks.is_running("restore-apply"):
+            QtWidgets.QMessageBox.information(self, "Restore", "A restore is already running.")
+            return
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Open Backup", "", "Site backup (*.tar.gz);;All files (*)")
+        if not path:
+            return
+        job = SiteBackup(self.ctrl)
+
+        def work():
+            self.ctrl.login()
+            return job.plan(path)
+
+        self.tasks.submit("restore-plan", work, on_result=lambda plan: self._show_restore_plan(job, plan),
+                          on_error=lambda e: QtWidgets.QMessageBox.warning(self, "Restore", f"Could not compare backup:\n{e}"))
+
+    def _show_restore_plan(self, job: SiteBackup, plan, applied: bool = False):
+        writes = [a for a in plan if a["op"] in ("create", "update")]
+        dialog = QtWidgets.QDialog(self)
+        dialog.setWindowTitle("Restore — " + ("result" if applied else f"differences, {len(writes)} change(s)"))
+        dialog.resize(800, 600)
+        text = QtWidgets.QPlainTextEdit()
+        text.setReadOnly(True)
+        text.setPlainText(format_restore_plan(plan))
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Close)
+        buttons.rejected.connect(dialog.reject)
+        if writes and not applied:
+            btn_apply = buttons.addButton("Restore Differences", QtWidgets.QDialogButtonBox.AcceptRole)
+            btn_apply.clicked.connect(dialog.accept)
+        lay = QtWidgets.QVBoxLayout(dialog)
+        lay.addWidget(text)
+        lay.addWidget(buttons)
+        if dialog.exec_() != QtWidgets.QDialog.Accepted:
+            return
+        if self.tasks.is_running("restore-apply"):
+            QtWidgets.QMessageBox.information(self, "Restore", "A restore is already running.")
+            return
+
+        def done(result):
+            self.wifi.inventory.invalidate(sorted(set(a["site"] for a in writes)))
+            self.site_selected(self.cmb_sites.currentData())
+            self._show_restore_plan(job, result, applied=True)
+
+        self.tasks.submit("restore-apply", job.apply, plan, on_result=done,
+                          on_error=lambda e: QtWidgets.QMessageBox.warning(self, "Restore", f"Restore failed:\n{e}"))
+
     def login(self):
-        ok = self.ctrl.login()
-        self.status.showMessage("Login OK" if ok else "Login failed", 5000)
-        if ok:
-            self.load_sites()
+        def done(ok):
+            self.status.showMessage("Login OK" if ok else "Login failed", 5000)
+            if ok:
+                self.load_sites()
+
+        self.tasks.submit("login", self.ctrl.login, on_result=done)
 
     def load_sites(self):
+        def fetch():
+            # Try login implicitly for convenience
+            self.ctrl.login()
+            return self.ctrl.get_sites() or []
+
+        self.tasks.submit("sites", fetch, on_result=self._fill_sites,
+                          on_error=lambda e: self.status.showMessage(f"Failed to load sites: {e}", 5000), join=True)
+
+    def _fill_sites(self, sites):
         self.cmb_sites.blockSignals(True)
         self.cmb_sites.clear()
-        # Try login implicitly for convenience
-        self.ctrl.login()
-        sites = self.ctrl.get_sites() or []
         active_key = self.store.get_value("site_key", "default")
         idx_to_select = 0
         for i, s in enumerate(sites):
@@ -156,3 +286,7 @@ class MainWindow(QtWidgets.QMainWindow):
         """Called when the active tab changes. Triggers auto-discovery for wizard tab."""
         if index == 2:  # Wizard tab is at index 2
             self.wizard.on_tab_visible()
+
+    def closeEvent(self, event):
+        self.tasks.shutdown()
+        super().closeEvent(event)
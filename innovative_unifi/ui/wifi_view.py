@@ -1,25 +1,57 @@
 
 from PyQt5 import QtWidgets, QtCore
 from ..core.controller import ControllerClient
+from ..core.tasks import TaskExecutor
+from ..core.psk_rotation import PSKRotation, valid_psk, format_plan as format_rotation_plan, format_report as format_rotation_report
+from ..core.wlan_sync import WlanSync, load_desired, format_plan
+from ..core.wlan_deploy import WlanDeployer, make_template, format_report as format_deploy_report
+from ..core.wlan_inventory import WlanInventory
+from ..core.workers import run_bounded
+
+ANY = "Any"
 
 class WiFiView(QtWidgets.QWidget):
-    def __init__(self, ctrl: ControllerClient, store, parent=None):
+    def __init__(self, ctrl: ControllerClient, store, tasks: TaskExecutor = None, parent=None):
         super().__init__(parent)
         self.ctrl = ctrl
+        self.tasks = tasks or TaskExecutor(parent=self)
         self.store = store
         self.site_key = "default"
+        self.inventory = WlanInventory(ctrl)
 
         self.btn_refresh = QtWidgets.QPushButton("Refresh WLANs")
         self.btn_create = QtWidgets.QPushButton("Create New SSID")
         self.btn_enable = QtWidgets.QPushButton("Enable Selected")
         self.btn_disable = QtWidgets.QPushButton("Disable Selected")
         self.btn_verbose = QtWidgets.QPushButton("Toggle Selected (Verbose)")
+        self.btn_deploy = QtWidgets.QPushButton("Deploy SSID to Sites…")
+        self.btn_deploy.setToolTip("Create or update the same SSID on several sites at once")
+        self.btn_rotate = QtWidgets.QPushButton("Rotate PSK…")
+        self.btn_rotate.setToolTip("Set a new passphrase on every matching SSID across all sites")
+        self.btn_sync = QtWidgets.QPushButton("Sync from File…")
+        self.btn_sync.setToolTip("Compare sites against a desired WLAN file (JSON/YAML) and apply only the differences")
+
+        # Search/filter bar; in "All sites" mode it searches every site's cached wlanconf
+        self.chk_all_sites = QtWidgets.QCheckBox("All sites")
+        self.chk_all_sites.setToolTip("Show and search WLANs across every site (cached, refreshed in the background)")
+        self.ed_search = QtWidgets.QLineEdit()
+        self.ed_search.setPlaceholderText("Search SSID…")
+        self.ed_search.setClearButtonEnabled(True)
+        self.cmb_security = QtWidgets.QComboBox()
+        self.cmb_security.addItem(ANY)
+        self.cmb_enabled = QtWidgets.QComboBox()
+        self.cmb_enabled.addItems([ANY, "Yes", "No"])
+        self.ed_vlan = QtWidgets.QLineEdit()
+        self.ed_vlan.setPlaceholderText("VLAN")
+        self.ed_vlan.setMaximumWidth(70)
+        self.lbl_count = QtWidgets.QLabel("")
 
-        self.tbl = QtWidgets.QTableWidget(0, 5)
-        self.tbl.setHorizontalHeaderLabels(["Name", "Enabled", "Security", "Bands", "AP Group Mode"])
+        self.tbl = QtWidgets.QTableWidget(0, 7)
+        self.tbl.setHorizontalHeaderLabels(["Name", "Enabled", "Security", "VLAN", "Bands", "AP Group Mode", "Site"])
         self.tbl.horizontalHeader().setStretchLastSection(True)
         self.tbl.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
         self.tbl.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.tbl.setColumnHidden(6, True)
 
         top = QtWidgets.QHBoxLayout()
         top.addWidget(self.btn_refresh)
@@ -29,9 +61,23 @@ class WiFiView(QtWidgets.QWidget):
         top.addWidget(self.btn_verbose)
         top.addSpacing(10)
         top.addWidget(self.btn_create)
+        top.addWidget(self.btn_deploy)
+        top.addWidget(self.btn_rotate)
+        top.addWidget(self.btn_sync)
+
+        search = QtWidgets.QHBoxLayout()
+        search.addWidget(self.chk_all_sites)
+        search.addWidget(self.ed_search, 1)
+        search.addWidget(QtWidgets.QLabel("Security:"))
+        search.addWidget(self.cmb_security)
+        search.addWidget(QtWidgets.QLabel("Enabled:"))
+        search.addWidget(self.cmb_enabled)
+        search.addWidget(self.ed_vlan)
+        search.addWidget(self.lbl_count)
 
         lay = QtWidgets.QVBoxLayout(self)
         lay.addLayout(top)
+        lay.addLayout(search)
         lay.addWidget(self.tbl)
 
         self.btn_refresh.clicked.connect(self.refresh)
@@ -39,109 +85,211 @@ class WiFiView(QtWidgets.QWidget):
         self.btn_enable.clicked.connect(lambda: self._toggle_selected(True))
         self.btn_disable.clicked.connect(lambda: self._toggle_selected(False))
         self.btn_verbose.clicked.connect(self._toggle_selected_verbose)
+        self.btn_deploy.clicked.connect(self.on_deploy)
+        self.btn_rotate.clicked.connect(self.on_rotate_psk)
+        self.btn_sync.clicked.connect(self.on_sync)
+        self.chk_all_sites.toggled.connect(self._on_all_sites)
+        self.ed_search.textChanged.connect(self._render)
+        self.cmb_security.currentIndexChanged.connect(self._render)
+        self.cmb_enabled.currentIndexChanged.connect(self._render)
+        self.ed_vlan.textChanged.connect(self._render)
+
+    def _inventory(self) -> WlanInventory:
+        # MainWindow swaps self.ctrl when settings change; cached WLANs belong to the old controller
+        if self.inventory.ctrl is not self.ctrl:
+            self.inventory = WlanInventory(self.ctrl)
+        return self.inventory
+
+    def _all_sites(self) -> bool:
+        return self.chk_all_sites.isChecked()
 
     def set_site(self, key: str):
         self.site_key = key or "default"
-        self.refresh()
+        if self._all_sites():
+            self._render()
+        else:
+            self.refresh()
 
     def refresh(self):
-        self.ctrl.login()
-        wlans = self.ctrl.get_wlans(self.site_key) or []
+        if self._all_sites():
+            self._refresh_inventory(force=True)
+            return
+        site = self.site_key
+
+        def fetch():
+            self.ctrl.login()
+            return self.ctrl.get_wlans(site) or []
+
+        self.tasks.submit(f"wlans:{site}", fetch, on_result=lambda wlans: self._show_wlans(site, wlans),
+                          on_error=lambda e: QtWidgets.QMessageBox.warning(self, "Wi‑Fi", f"Failed to load WLANs:\n{e}"),
+                          join=True)
+
+    def _refresh_inventory(self, force: bool = False):
+        """Fetch wlanconf for every site not cached yet (or all of them with force) in the background."""
+        inventory = self._inventory()
+
+        def work():
+            self.ctrl.login()
+            return inventory.refresh(force=force)
+
+        self.tasks.submit("wlan-inventory", work, on_result=lambda fetched: self._render(),
+                          on_error=lambda e: QtWidgets.QMessageBox.warning(self, "Wi‑Fi", f"Failed to load WLANs:\n{e}"))
+
+    def _on_all_sites(self, on: bool):
+        self.tbl.setColumnHidden(6, not on)
+        if on:
+            self._render()  # whatever is cached shows immediately
+            self._refresh_inventory()
+        else:
+            self.refresh()
+
+    def _show_wlans(self, site: str, wlans):
+        self._inventory().put(site, wlans)
+        if site != self.site_key or self._all_sites():
+            return  # Site or mode changed while the fetch was in flight
+        self._render()
+
+    def _render(self, *_):
+        """Fill the table from the inventory using the current filters (no controller calls)."""
+        inventory = self._inventory()
+        current = self.cmb_security.currentText()
+        self.cmb_security.blockSignals(True)
+        self.cmb_security.clear()
+        self.cmb_security.addItems([ANY] + inventory.securities())
+        self.cmb_security.setCurrentIndex(max(self.cmb_security.findText(current), 0))
+        self.cmb_security.blockSignals(False)
+
+        security = self.cmb_security.currentText()
+        enabled = self.cmb_enabled.currentText()
+        vlan = self.ed_vlan.text().strip()
+        rows = inventory.search(self.ed_search.text(),
+                                security=None if security == ANY else security,
+                                vlan=vlan or None,
+                                enabled=None if enabled == ANY else enabled == "Yes")
+        if not self._all_sites():
+            rows = [r for r in rows if r["site"] == self.site_key]
+
+        self.tbl.setUpdatesEnabled(False)
         self.tbl.setRowCount(0)
-        for w in wlans:
-            r = self.tbl.rowCount()
-            self.tbl.insertRow(r)
-            name = w.get("name","")
-            enabled = w.get("enabled", True)
-            sec = w.get("security","")
-            bands = w.get("wlan_band","") or ("5g" if w.get("na_only") else "2g" if w.get("ng_only") else "both")
-            agm = w.get("ap_group_mode","")
-            wid = w.get("_id","")
-
-            name_item = QtWidgets.QTableWidgetItem(name)
-            name_item.setData(QtCore.Qt.UserRole, wid)  # stash WLAN id for toggles
+        self.tbl.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            name_item = QtWidgets.QTableWidgetItem(row["name"])
+            name_item.setData(QtCore.Qt.UserRole, row["_id"])  # stash WLAN id and site for toggles
+            name_item.setData(QtCore.Qt.UserRole + 1, row["site"])
             self.tbl.setItem(r, 0, name_item)
-            self.tbl.setItem(r, 1, QtWidgets.QTableWidgetItem("Yes" if enabled else "No"))
-            self.tbl.setItem(r, 2, QtWidgets.QTableWidgetItem(sec))
-            self.tbl.setItem(r, 3, QtWidgets.QTableWidgetItem(bands))
-            self.tbl.setItem(r, 4, QtWidgets.QTableWidgetItem(agm))
+            self.tbl.setItem(r, 1, QtWidgets.QTableWidgetItem("Yes" if row["enabled"] else "No"))
+            self.tbl.setItem(r, 2, QtWidgets.QTableWidgetItem(row["security"]))
+            self.tbl.setItem(r, 3, QtWidgets.QTableWidgetItem(row["vlan"]))
+            self.tbl.setItem(r, 4, QtWidgets.QTableWidgetItem(row["bands"]))
+            self.tbl.setItem(r, 5, QtWidgets.QTableWidgetItem(row["ap_group_mode"]))
+            self.tbl.setItem(r, 6, QtWidgets.QTableWidgetItem(f"{row['site_desc']} ({row['site']})"))
+        self.tbl.setUpdatesEnabled(True)
+        if self._all_sites():
+            self.lbl_count.setText(f"{len(rows)} SSID(s) on {len(set(r['site'] for r in rows))} site(s)")
+        else:
+            self.lbl_count.setText(f"{len(rows)} SSID(s)")
 
-    def _selected_wlan_ids(self):
-        ids = []
+    def _selected_wlans(self):
+        """{site: [wlan_id, ...]} for the selected rows."""
+        out = {}
         rows = set(i.row() for i in self.tbl.selectedIndexes())
-        for r in rows:
+        for r in sorted(rows):
             it = self.tbl.item(r, 0)
             if it:
                 wid = it.data(QtCore.Qt.UserRole)
                 if wid:
-                    ids.append(wid)
-        return ids
+                    out.setdefault(it.data(QtCore.Qt.UserRole + 1) or self.site_key, []).append(wid)
+        return out
+
+    def _after_write(self, sites=None):
+        """Mark written sites stale and reload what is on screen."""
+        self._inventory().invalidate(sites)
+        if self._all_sites():
+            self._refresh_inventory()
+        else:
+            self.refresh()
 
     def _toggle_selected(self, want_enabled: bool):
-        ids = self._selected_wlan_ids()
-        if not ids:
+        selected = self._selected_wlans()
+        if not selected:
             QtWidgets.QMessageBox.information(self, "Wi‑Fi", "Select one or more SSIDs first.")
             return
-        self.ctrl.login()
-        ok_count = 0
-        for wid in ids:
-            try:
-                if self.ctrl.set_wlan_enabled(self.site_key, wid, want_enabled):
-                    ok_count += 1
-            except Exception:
-                pass
-        self.refresh()
-        QtWidgets.QMessageBox.information(self, "Wi‑Fi",
-            f"{'Enabled' if want_enabled else 'Disabled'} {ok_count} SSID(s).")
+        total = sum(len(ids) for ids in selected.values())
+
+        def work():
+            self.ctrl.login()
+            # One wlanconf read per site, then the updates run concurrently
+            results = {}
+            for site, res, exc in run_bounded(lambda s: self.ctrl.set_wlans_enabled(s, {wid: want_enabled for wid in selected[s]}),
+                                              list(selected), 8):
+                results.update(res or {wid: False for wid in selected[site]})
+            return results
+
+        def done(results):
+            self._after_write(list(selected))
+            ok_count = sum(1 for ok in results.values() if ok)
+            QtWidgets.QMessageBox.information(self, "Wi‑Fi",
+                f"{'Enabled' if want_enabled else 'Disabled'} {ok_count}/{total} SSID(s).")
+
+        self.tasks.submit("wlan-toggle", work, on_result=done,
+                          on_error=lambda e: QtWidgets.QMessageBox.warning(self, "Wi‑Fi", f"Failed to update WLANs:\n{e}"))
 
     def _toggle_selected_verbose(self):
-        ids = self._selected_wlan_ids()
-        if not ids:
+        selected = self._selected_wlans()
+        if not selected:
             QtWidgets.QMessageBox.information(self, "Wi‑Fi", "Select one or more SSIDs first.")
             return
-        
-        self.ctrl.login()
-        success_count = 0
-        all_logs = []
-        
-        for wid in ids:
-            try:
-                # Get current state of the WLAN to determine what to toggle to
-                wlans = self.ctrl.get_wlans(self.site_key) or []
-                current_enabled = None
-                for w in wlans:
-                    if w.get("_id") == wid:
-                        current_enabled = w.get("enabled", True)
-                        break
-                
-                if current_enabled is None:
-                    all_logs.append(f"WLAN {wid}: Could not determine current state")
-                    continue
-                
-                # Toggle the state
-                new_state = not current_enabled
-                success, logs = self.ctrl.set_wlan_enabled_verbose(self.site_key, wid, new_state)
-                
-                if success:
-                    success_count += 1
-                    all_logs.append(f"WLAN {wid}: Successfully {'enabled' if new_state else 'disabled'}")
-                else:
-                    all_logs.append(f"WLAN {wid}: Failed to {'enable' if new_state else 'disable'}")
-                
-                all_logs.append(f"  Details: {logs}")
-                
-            except Exception as e:
-                all_logs.append(f"WLAN {wid}: Exception - {e}")
-        
-        self.refresh()
-        
-        # Show results in a detailed dialog
-        msg = QtWidgets.QMessageBox(self)
-        msg.setWindowTitle("Wi‑Fi Verbose Toggle")
-        msg.setText(f"Verbose toggle completed: {success_count}/{len(ids)} SSID(s) processed")
-        msg.setDetailedText("\n".join(all_logs))
-        msg.setStandardButtons(QtWidgets.QMessageBox.Ok)
-        msg.exec_()
+        total = sum(len(ids) for ids in selected.values())
+
+        def work():
+            self.ctrl.login()
+            success_count = 0
+            all_logs = []
+            
+            for site, ids in selected.items():
+                for wid in ids:
+                    try:
+                        # Get current state of the WLAN to determine what to toggle to
+                        wlans = self.ctrl.get_wlans(site) or []
+                        current_enabled = None
+                        for w in wlans:
+                            if w.get("_id") == wid:
+                                current_enabled = w.get("enabled", True)
+                                break
+
+                        if current_enabled is None:
+                            all_logs.append(f"WLAN {wid}: Could not determine current state")
+                            continue
+
+                        # Toggle the state
+                        new_state = not current_enabled
+                        success, logs = self.ctrl.set_wlan_enabled_verbose(site, wid, new_state)
+
+                        if success:
+                            success_count += 1
+                            all_logs.append(f"WLAN {wid}: Successfully {'enabled' if new_state else 'disabled'}")
+                        else:
+                            all_logs.append(f"WLAN {wid}: Failed to {'enable' if new_state else 'disable'}")
+
+                        all_logs.append(f"  Details: {logs}")
+
+                    except Exception as e:
+                        all_logs.append(f"WLAN {wid}: Exception - {e}")
+            return success_count, all_logs
+
+        def done(result):
+            success_count, all_logs = result
+            self._after_write(list(selected))
+            
+            # Show results in a detailed dialog
+            msg = QtWidgets.QMessageBox(self)
+            msg.setWindowTitle("Wi‑Fi Verbose Toggle")
+            msg.setText(f"Verbose toggle completed: {success_count}/{total} SSID(s) processed")
+            msg.setDetailedText("\n".join(all_logs))
+            msg.setStandardButtons(QtWidgets.QMessageBox.Ok)
+            msg.exec_()
+
+        self.tasks.submit("wlan-toggle-verbose", work, on_result=done)
 
     def on_create(self):
         name, ok = QtWidgets.QInputDialog.getText(self, "New SSID", "SSID name:")
@@ -150,13 +298,249 @@ class WiFiView(QtWidgets.QWidget):
         psk, ok2 = QtWidgets.QInputDialog.getText(self, "New SSID", "WPA2 password (8–255 chars or 64-hex):")
         if not ok2 or not psk:
             return
-        try:
+        site = self.site_key
+
+        def work():
             self.ctrl.login()
-            success = self.ctrl.create_wlan(self.site_key, name.strip(), psk.strip())
+            return self.ctrl.create_wlan(site, name.strip(), psk.strip())
+
+        def done(success):
             if success:
                 QtWidgets.QMessageBox.information(self, "Wi‑Fi", f"Successfully created SSID: {name}")
-                self.refresh()
+                self._after_write([site])
             else:
                 QtWidgets.QMessageBox.warning(self, "Wi‑Fi", "Failed to create WLAN: Unknown error")
+
+        self.tasks.submit(f"wlan-create:{site}", work, on_result=done,
+                          on_error=lambda e: QtWidgets.QMessageBox.warning(self, "Wi‑Fi", f"Controller rejected WLAN create:\n{e}"))
+
+    def on_deploy(self):
+        self.tasks.submit("sites", self.ctrl.get_sites, on_result=self._deploy_dialog,
+                          on_error=lambda e: QtWidgets.QMessageBox.warning(self, "Wi‑Fi", f"Failed to load sites:\n{e}"))
+
+    def _deploy_dialog(self, sites):
+        dialog = QtWidgets.QDialog(self)
+        dialog.setWindowTitle("Deploy SSID to Sites")
+        dialog.resize(480, 560)
+        form = QtWidgets.QFormLayout()
+        ed_ssid = QtWidgets.QLineEdit()
+        ed_psk = QtWidgets.QLineEdit()
+        ed_psk.setEchoMode(QtWidgets.QLineEdit.Password)
+        cb_band = QtWidgets.QComboBox()
+        cb_band.addItems(["both", "2g", "5g"])
+        chk_update = QtWidgets.QCheckBox("Update the SSID where it already exists")
+        chk_update.setChecked(True)
+        form.addRow("SSID:", ed_ssid)
+        form.addRow("WPA2 password:", ed_psk)
+        form.addRow("Bands:", cb_band)
+        form.addRow("", chk_update)
+
+        lst = QtWidgets.QListWidget()
+        for site in sites or []:
+            key = site.get("name") or site.get("key") or ""
+            it = QtWidgets.QListWidgetItem(f"{site.get('desc') or key} ({key})")
+            it.setData(QtCore.Qt.UserRole, key)
+            it.setFlags(it.flags() | QtCore.Qt.ItemIsUserCheckable)
+            it.setCheckState(QtCore.Qt.Checked if key == self.site_key else QtCore.Qt.Unchecked)
+            lst.addItem(it)
+        chk_all = QtWidgets.QCheckBox("All sites")
+        chk_all.toggled.connect(lambda on: [lst.item(i).setCheckState(QtCore.Qt.Checked if on else QtCore.Qt.Unchecked)
+                                            for i in range(lst.count())])
+
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        lay = QtWidgets.QVBoxLayout(dialog)
+        lay.addLayout(form)
+        lay.addWidget(chk_all)
+        lay.addWidget(lst)
+        lay.addWidget(buttons)
+        if dialog.exec_() != QtWidgets.QDialog.Accepted:
+            return
+        keys = [lst.item(i).data(QtCore.Qt.UserRole) for i in range(lst.count())
+                if lst.item(i).checkState() == QtCore.Qt.Checked]
+        ssid, psk = ed_ssid.text().strip(), ed_psk.text().strip()
+        if not ssid or not psk or not keys:
+            QtWidgets.QMessageBox.information(self, "Wi‑Fi", "Enter an SSID and password and pick at least one site.")
+            return
+        self._run_deploy(make_template(ssid, psk, band=cb_band.currentText()), keys, chk_update.isChecked())
+
+    def _run_deploy(self, template, keys, update_existing: bool):
+        key = "wlan-deploy"
+        if self.tasks.is_running(key):
+            QtWidgets.QMessageBox.information(self, "Wi‑Fi", "A deployment is already running.")
+            return
+        deployer = WlanDeployer(self.ctrl)
+        progress = QtWidgets.QProgressDialog(f"Deploying '{template['name']}'…", "Stop", 0, len(keys), self)
+        progress.setWindowTitle("Deploy SSID")
+        progress.setMinimumDuration(0)
+        progress.canceled.connect(deployer.stop)
+
+        def work():
+            self.ctrl.login()
+            return deployer.run(template, keys, update_existing,
+                                on_progress=lambda site, res: self.tasks.report(key, (site, res)))
+
+        def on_progress(msg):
+            site, res = msg
+            p = deployer.progress
+            progress.setValue(p["done"] + p["failed"])
+            progress.setLabelText(f"Deploying '{template['name']}'… {p['done'] + p['failed']}/{len(keys)} "
+                                  f"({p['per_min']} sites/min)\nLast: {site} {res['action']}")
+
+        def done(results):
+            progress.close()
+            self._after_write(keys)
+            p = deployer.progress
+            msg = QtWidgets.QMessageBox(self)
+            msg.setWindowTitle("Deploy SSID")
+            msg.setText(f"'{template['name']}': {p['done']}/{len(keys)} site(s) OK in {p['elapsed_s']}s "
+                        f"({p['per_min']} sites/min).")
+            msg.setDetailedText(format_deploy_report(results))
+            msg.exec_()
+
+        def failed(e):
+            progress.close()
+            QtWidgets.QMessageBox.warning(self, "Deploy SSID", f"Deployment failed:\n{e}")
+
+        self.tasks.submit(key, work, on_result=done, on_error=failed, on_progress=on_progress)
+
+    def on_sync(self):
+        if self.tasks.is_running("wlan-sync-apply"):
+            QtWidgets.QMessageBox.information(self, "Sync WLANs", "A sync is still applying changes; wait for it to finish.")
+            return
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Desired WLAN State", "",
+                                                        "WLAN state (*.json *.yaml *.yml);;All files (*)")
+        if not path:
+            return
+        try:
+            desired = load_desired(path)
         except Exception as e:
-            QtWidgets.QMessageBox.warning(self, "Wi‑Fi", f"Controller rejected WLAN create:\n{e}")
\ No newline at end of file
+            QtWidgets.QMessageBox.warning(self, "Sync WLANs", f"Could not read {path}:\n{e}")
+            return
+        sync = WlanSync(self.ctrl)
+
+        def work():
+            self.ctrl.login()
+            keys = [s for s in desired if s != "*"]
+            if "*" in desired:
+                keys = [s.get("name") or s.get("key") for s in self.ctrl.get_sites()]
+            return sync.plan(desired, [k for k in keys if k])
+
+        self.tasks.submit("wlan-sync-plan", work, on_result=lambda plan: self._show_sync_plan(sync, plan),
+                          on_error=lambda e: QtWidgets.QMessageBox.warning(self, "Sync WLANs", f"Sync failed:\n{e}"))
+
+    def _show_sync_plan(self, sync: WlanSync, plan, applied: bool = False):
+        writes = [a for a in plan if a["op"] in ("create", "update", "delete")]
+        dialog = QtWidgets.QDialog(self)
+        dialog.setWindowTitle("WLAN Sync — " + ("result" if applied else f"dry run, {len(writes)} change(s)"))
+        dialog.resize(800, 600)
+        text = QtWidgets.QPlainTextEdit()
+        text.setReadOnly(True)
+        text.setPlainText(format_plan(plan))
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Close)
+        buttons.rejected.connect(dialog.reject)
+        if writes and not applied:
+            btn_apply = buttons.addButton("Apply Changes", QtWidgets.QDialogButtonBox.AcceptRole)
+            btn_apply.clicked.connect(dialog.accept)
+        lay = QtWidgets.QVBoxLayout(dialog)
+        lay.addWidget(text)
+        lay.addWidget(buttons)
+        if dialog.exec_() != QtWidgets.QDialog.Accepted:
+            return
+        if self.tasks.is_running("wlan-sync-apply"):
+            QtWidgets.QMessageBox.information(self, "Sync WLANs", "A sync is still applying changes; wait for it to finish.")
+            return
+
+        def done(result):
+            self._after_write(sorted(set(a["site"] for a in result)))
+            self._show_sync_plan(sync, result, applied=True)
+
+        self.tasks.submit("wlan-sync-apply", sync.apply, plan, on_result=done,
+                          on_error=lambda e: QtWidgets.QMessageBox.warning(self, "Sync WLANs", f"Sync failed:\n{e}"))
+
+    def on_rotate_psk(self):
+        rows = set(i.row() for i in self.tbl.selectedIndexes())
+        default = self.tbl.item(min(rows), 0).text() if rows else ""
+        pattern, ok = QtWidgets.QInputDialog.getText(self, "Rotate PSK", "SSID name or pattern (e.g. Guest*) on all sites:", text=default)
+        if not ok or not pattern.strip():
+            return
+        psk, ok = QtWidgets.QInputDialog.getText(self, "Rotate PSK", "New WPA2 password (8–63 chars or 64-hex):",
+                                                 QtWidgets.QLineEdit.Password)
+        if not ok:
+            return
+        if not valid_psk(psk):
+            QtWidgets.QMessageBox.warning(self, "Rotate PSK", "Password must be 8–63 printable characters or 64 hex digits.")
+            return
+        confirm, ok = QtWidgets.QInputDialog.getText(self, "Rotate PSK", "Repeat the new password:", QtWidgets.QLineEdit.Password)
+        if not ok or confirm != psk:
+            QtWidgets.QMessageBox.warning(self, "Rotate PSK", "Passwords do not match.")
+            return
+        if self.tasks.is_running("psk-rotation-plan") or self.tasks.is_running("psk-rotation"):
+            QtWidgets.QMessageBox.information(self, "Rotate PSK", "A rotation is already running.")
+            return
+        job = PSKRotation(self.ctrl, pattern.strip(), psk)
+
+        def work():
+            self.ctrl.login()
+            return job.plan()
+
+        self.tasks.submit("psk-rotation-plan", work, on_result=lambda plan: self._confirm_rotation(job, plan),
+                          on_error=lambda e: QtWidgets.QMessageBox.warning(self, "Rotate PSK", f"Could not read WLANs:\n{e}"))
+
+    def _confirm_rotation(self, job: PSKRotation, plan):
+        todo = [p for p in plan if p["status"] not in ("verified", "unverified")]
+        if not todo:
+            QtWidgets.QMessageBox.information(self, "Rotate PSK",
+                f"No SSID left to rotate: {len(plan)} match '{job.pattern}' and all already have the new password."
+                if plan else f"No SSID matches '{job.pattern}' on any site.")
+            return
+        dialog = QtWidgets.QDialog(self)
+        dialog.setWindowTitle(f"Rotate PSK — {len(todo)} SSID(s) on {len(set(p['site'] for p in todo))} site(s)")
+        dialog.resize(640, 480)
+        text = QtWidgets.QPlainTextEdit()
+        text.setReadOnly(True)
+        text.setPlainText(format_rotation_plan(plan))
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Cancel)
+        buttons.rejected.connect(dialog.reject)
+        btn_apply = buttons.addButton(f"Rotate {len(todo)} SSID(s)", QtWidgets.QDialogButtonBox.AcceptRole)
+        btn_apply.clicked.connect(dialog.accept)
+        lay = QtWidgets.QVBoxLayout(dialog)
+        lay.addWidget(QtWidgets.QLabel(f"These SSIDs match '{job.pattern}' and will get the new password:"))
+        lay.addWidget(text)
+        lay.addWidget(buttons)
+        if dialog.exec_() != QtWidgets.QDialog.Accepted:
+            return
+        key = "psk-rotation"
+        if self.tasks.is_running(key):
+            QtWidgets.QMessageBox.information(self, "Rotate PSK", "A rotation is already running.")
+            return
+        progress = QtWidgets.QProgressDialog(f"Rotating passphrase on '{job.pattern}'…", "Stop", 0, 0, self)
+        progress.setWindowTitle("Rotate PSK")
+        progress.setMinimumDuration(0)
+        progress.canceled.connect(job.stop)
+
+        def work():
+            self.ctrl.login()
+            return job.apply(plan, on_progress=lambda k, rec: self.tasks.report(key, (k, rec)))
+
+        def on_progress(msg):
+            k, rec = msg
+            progress.setLabelText(f"Rotating passphrase on '{job.pattern}'…\nLast: {rec.get('site','')} {rec.get('ssid','')} {rec.get('status','')}")
+
+        def done(report):
+            progress.close()
+            self._after_write(sorted(set(r.get("site", "") for r in report)))
+            ok_count = sum(1 for r in report if r.get("status") in ("verified", "unverified"))
+            msg = QtWidgets.QMessageBox(self)
+            msg.setWindowTitle("Rotate PSK")
+            msg.setText(f"Rotated {ok_count}/{len(report)} matching SSID(s)."
+                        + ("" if ok_count == len(report) else "\nRun the same rotation again to retry the rest."))
+            msg.setDetailedText(format_rotation_report(report))
+            msg.exec_()
+
+        def failed(e):
+            progress.close()
+            QtWidgets.QMessageBox.warning(self, "Rotate PSK", f"Rotation failed:\n{e}")
+
+        self.tasks.submit(key, work, on_result=done, on_error=failed, on_progress=on_progress)
@@ -1,8 +1,10 @@
 from PyQt5 import QtWidgets, QtCore, QtGui
-import ipaddress, sys, subprocess, time, socket
+import ipaddress, sys, subprocess, time, socket, threading
 import psutil
 from ..core.controller import ControllerClient
 from ..core.discovery import ubnt_discover
+from ..core.tasks import TaskExecutor
+from ..core.workers import run_bounded
 
 def _is_windows():
     return sys.platform.startswith("win")
@@ -75,9 +77,10 @@ class WizardPage(QtWidgets.QWidget):
       1) Choose Existing Site or Create New
       2) Discover APs on the LOCAL connected network, Set-Inform + Adopt + Name
     '''
-    def __init__(self, ctrl: ControllerClient, devices_view, wifi_view, parent=None):
+    def __init__(self, ctrl: ControllerClient, devices_view, wifi_view, tasks: TaskExecutor = None, parent=None):
         super().__init__(parent)
         self.ctrl = ctrl
+        self.tasks = tasks or TaskExecutor(parent=self)
         self.devices_view = devices_view
         self.wifi_view = wifi_view
         self.site_key = "default"
@@ -180,14 +183,14 @@ class WizardPage(QtWidgets.QWidget):
 
         # Wiring
         self.btn_login.clicked.connect(self._login)
-        self.btn_load_sites.clicked.connect(self._load_sites)
+        self.btn_load_sites.clicked.connect(lambda: self._load_sites())
         self.btn_proceed.clicked.connect(self._proceed_site)
-        self.btn_discover.clicked.connect(self._discover_local)
+        self.btn_discover.clicked.connect(lambda: self._discover_local())
         self.btn_setinform.clicked.connect(self._setinform_and_adopt)
         self.btn_test_inform.clicked.connect(self.test_set_inform)
         self.btn_loc_on.clicked.connect(lambda: self._locate(True))
         self.btn_loc_off.clicked.connect(lambda: self._locate(False))
-        self.btn_refresh_devices.clicked.connect(self._refresh_from_controller)
+        self.btn_refresh_devices.clicked.connect(lambda: self._refresh_from_controller())
         
         # Connect site selection change
         self.cmb_sites.currentIndexChanged.connect(self._on_site_changed)
@@ -195,6 +198,42 @@ class WizardPage(QtWidgets.QWidget):
         self._load_sites()
         self._update_cidr_label()
 
+        # While adopting, the wizard waits on the shared devices poll instead of polling the
+        # controller itself; the latest snapshot is handed to the worker through _snap_cond
+        self.scheduler = self.devices_view.scheduler
+        self._snap_cond = threading.Condition()
+        self._snap_seq = 0
+        self._snap = ("", [])
+
+    def _on_devices(self, site: str, devices):
+        with self._snap_cond:
+            self._snap_seq += 1
+            self._snap = (site, devices)
+            self._snap_cond.notify_all()
+
+    def _wait_for_device(self, site: str, ip: str, key: str, timeout: float = 60.0):
+        """Worker side: the controller's record for ip once a devices snapshot shows it, or None.
+        While the wizard is hidden the scheduler pauses it, so this falls back to asking directly."""
+        deadline = time.monotonic() + timeout
+        with self._snap_cond:
+            seq = self._snap_seq
+        while time.monotonic() < deadline and not self.tasks.is_cancelled(key):
+            with self._snap_cond:
+                fresh = self._snap_cond.wait_for(lambda: self._snap_seq > seq, timeout=10)
+                seq = self._snap_seq
+                snap_site, devices = self._snap
+            if not fresh:
+                try:
+                    snap_site, devices = site, self.ctrl.get_device_records(site)
+                except Exception:
+                    continue
+            if snap_site != site:
+                continue
+            found = next((d for d in devices if (d.get("ip") or "") == ip), None)
+            if found:
+                return found
+        return None
+
     def on_tab_visible(self):
         """Called when the wizard tab becomes visible. Triggers automatic discovery if not done yet."""
         if not self.auto_discovery_done:
@@ -204,18 +243,17 @@ class WizardPage(QtWidgets.QWidget):
 
     def _auto_discover_on_show(self):
         """Perform automatic discovery when the tab is first shown."""
-        try:
-            # Update the CIDR label first
-            self._update_cidr_label()
-            # Run discovery
-            self._discover_local()
+        def report():
             # Update progress log instead of showing popup
             if self.table.rowCount() > 0:
                 self._update_progress(f"Auto-discovery found {self.table.rowCount()} device(s) on the local network.", "success")
             else:
                 self._update_progress("No devices found on the local network. You can try manual discovery.", "warning")
-        except Exception as e:
-            QtWidgets.QMessageBox.warning(self, "Auto Discovery", f"Discovery failed: {e}")
+
+        # Update the CIDR label first
+        self._update_cidr_label()
+        # Run discovery
+        self._discover_local(then=report)
 
     def _update_progress(self, message: str, status: str = "info"):
         """Update the progress log with a new message."""
@@ -238,27 +276,32 @@ class WizardPage(QtWidgets.QWidget):
         # Update the label with formatted message
         formatted_message = f"[{timestamp}] {icon} {message}"
         self.lbl_progress.setText(formatted_message)
-        
-        # Force UI update
-        QtWidgets.QApplication.processEvents()
 
     # --- Step 1: Site selection ---
     def _login(self):
-        ok = self.ctrl.login()
-        QtWidgets.QMessageBox.information(self, "Login", "Success." if ok else "Failed.")
-
-    def _load_sites(self):
-        # attempt login implicitly
-        self.ctrl.login()
-        self.cmb_sites.clear()
-        sites = self.ctrl.get_sites() or []
-        for s in sites:
-            name = s.get("desc") or s.get("name") or s.get("site_name") or "default"
-            key = s.get("name") or s.get("site_name") or "default"
-            self.cmb_sites.addItem(f"{name} ({key})", key)
-        if self.cmb_sites.count() == 0:
-            self.cmb_sites.addItem("default (default)", "default")
-        self.cmb_sites.setCurrentIndex(0)
+        self.tasks.submit("login", self.ctrl.login,
+                          on_result=lambda ok: QtWidgets.QMessageBox.information(self, "Login", "Success." if ok else "Failed."))
+
+    def _load_sites(self, then=None):
+        def fetch():
+            # attempt login implicitly
+            self.ctrl.login()
+            return self.ctrl.get_sites() or []
+
+        def fill(sites):
+            self.cmb_sites.clear()
+            for s in sites:
+                name = s.get("desc") or s.get("name") or s.get("site_name") or "default"
+                key = s.get("name") or s.get("site_name") or "default"
+                self.cmb_sites.addItem(f"{name} ({key})", key)
+            if self.cmb_sites.count() == 0:
+                self.cmb_sites.addItem("default (default)", "default")
+            self.cmb_sites.setCurrentIndex(0)
+            if then:
+                then()
+
+        self.tasks.submit("wizard:sites", fetch, on_result=fill,
+                          on_error=lambda e: self._update_progress(f"Failed to load sites: {e}", "error"), join=True)
 
     def _proceed_site(self):
         self._update_progress("Starting network setup process...", "info")
@@ -271,32 +314,36 @@ class WizardPage(QtWidgets.QWidget):
                 return
             
             self._update_progress(f"Creating new site: {newname}...", "info")
-            try:
-                new_key = self.ctrl.create_site_and_get_key(newname)
-                if new_key:
-                    self._update_progress(f"Successfully created site: {newname}", "success")
-                else:
+
+            def created(new_key):
+                if not new_key:
                     self._update_progress("Site created but could not resolve key. Please open UniFi UI once and retry.", "warning")
                     return
-            except Exception as e:
-                self._update_progress(f"Failed to create site: {str(e)}", "error")
-                return
-            
-            # Reload sites and select by the returned key
-            self._update_progress("Reloading site list...", "info")
-            self._load_sites()
-            pick = 0
-            for i in range(self.cmb_sites.count()):
-                if (self.cmb_sites.itemData(i) or "") == new_key:
-                    pick = i
-                    break
-            self.cmb_sites.setCurrentIndex(pick)
-            self.site_key = new_key
+                self._update_progress(f"Successfully created site: {newname}", "success")
+
+                def select_new():
+                    pick = 0
+                    for i in range(self.cmb_sites.count()):
+                        if (self.cmb_sites.itemData(i) or "") == new_key:
+                            pick = i
+                            break
+                    self.cmb_sites.setCurrentIndex(pick)
+                    self.site_key = new_key
+                    self._site_ready()
+
+                # Reload sites and select by the returned key
+                self._update_progress("Reloading site list...", "info")
+                self._load_sites(then=select_new)
+
+            self.tasks.submit(f"create-site:{newname}", self.ctrl.create_site_and_get_key, newname, on_result=created,
+                              on_error=lambda e: self._update_progress(f"Failed to create site: {str(e)}", "error"))
         else:
             key = self.cmb_sites.currentData()
             self.site_key = key or "default"
             self._update_progress(f"Using existing site: {self.site_key}", "info")
+            self._site_ready()
 
+    def _site_ready(self):
         # propagate to other views
         self._update_progress("Updating device and WiFi views...", "info")
         self.devices_view.set_site(self.site_key)
@@ -334,41 +381,49 @@ class WizardPage(QtWidgets.QWidget):
 
 
     # --- Step 2: Discovery & adoption ---
-    def _discover_local(self):
-        # UBNT discovery first
-        self._discover_ubnt()
-        # If nothing is found, fall back to scanning the detected local CIDR (if any)
-        if self.table.rowCount() == 0 and self.current_cidr:
-            self._discover_cidr(self.current_cidr)
+    def _discover_local(self, then=None):
+        def after_ubnt():
+            # If nothing is found, fall back to scanning the detected local CIDR (if any)
+            if self.table.rowCount() == 0 and self.current_cidr:
+                self._discover_cidr(self.current_cidr, then=then)
+            elif then:
+                then()
 
-    def _discover_ubnt(self):
+        # UBNT discovery first
+        self._discover_ubnt(then=after_ubnt)
+
+    def _add_discovered_row(self, ip: str, name: str, ping: str, ssh: str, mac: str):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(ip))
+        self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(name))
+        self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(ping))
+        self.table.setItem(row, 3, QtWidgets.QTableWidgetItem(ssh))
+        self.table.setItem(row, 4, QtWidgets.QTableWidgetItem(""))  # adopted (filled via controller refresh)
+        self.table.setItem(row, 5, QtWidgets.QTableWidgetItem(""))  # site (filled via controller refresh)
+        self.table.setItem(row, 6, QtWidgets.QTableWidgetItem(mac))
+
+    def _discover_ubnt(self, then=None):
         self.table.setRowCount(0)
         self.discovered = []
-        results = []
-        try:
-            results = ubnt_discover(timeout=2.5)
-        except Exception as e:
+
+        def show(results):
+            for r in results:
+                ip = r.get("ip","")
+                mac = r.get("mac","")
+                name = r.get("name", "") or r.get("hostname", "") or r.get("alias", "")
+                self._add_discovered_row(ip, name, "yes", "open/unknown", mac)
+            self._update_progress(f"Discovery complete. Found {self.table.rowCount()} device(s). Checking adoption status...", "info")
+            # Map to controller and show adoption status
+            self._refresh_from_controller(then=then)
+
+        def failed(e):
             QtWidgets.QMessageBox.warning(self, "UBNT Discovery", f"Discovery error:\n{e}")
-            results = []
-        for r in results:
-            ip = r.get("ip","")
-            mac = r.get("mac","")
-            name = r.get("name", "") or r.get("hostname", "") or r.get("alias", "")
-            # add row
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(ip))
-            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(name))
-            self.table.setItem(row, 2, QtWidgets.QTableWidgetItem("yes"))
-            self.table.setItem(row, 3, QtWidgets.QTableWidgetItem("open/unknown"))
-            self.table.setItem(row, 4, QtWidgets.QTableWidgetItem(""))  # adopted (filled via controller refresh)
-            self.table.setItem(row, 5, QtWidgets.QTableWidgetItem(""))  # site (filled via controller refresh)
-            self.table.setItem(row, 6, QtWidgets.QTableWidgetItem(mac))
-        # Map to controller and show adoption status
-        self._refresh_from_controller()
-        self._update_progress(f"Discovery complete. Found {self.table.rowCount()} device(s). Checking adoption status...", "info")
-
-    def _discover_cidr(self, cidr: str):
+            show([])
+
+        self.tasks.submit("wizard:discover", ubnt_discover, timeout=2.5, on_result=show, on_error=failed)
+
+    def _discover_cidr(self, cidr: str, then=None):
         try:
             net = ipaddress.ip_network(cidr, strict=False)
         except Exception:
@@ -377,35 +432,47 @@ class WizardPage(QtWidgets.QWidget):
         hosts = [str(ip) for ip in net.hosts()]
         self.table.setRowCount(0)
         self.discovered = []
+        key = "wizard:scan"
 
         progress = QtWidgets.QProgressDialog("Scanning local network…", "Cancel", 0, len(hosts), self)
         progress.setWindowModality(QtCore.Qt.ApplicationModal)
         progress.setMinimumDuration(0)
+        progress.canceled.connect(lambda: self.tasks.cancel(key))
 
-        for i, ip in enumerate(hosts, 1):
-            QtWidgets.QApplication.processEvents()
-            if progress.wasCanceled():
-                break
-            progress.setValue(i)
+        def probe(ip):
             alive = ping_host(ip, 700)
+            return alive, (tcp_check(ip, 22, 1.5) if alive else False)
+
+        def sweep():
+            # Pings run concurrently; each result is streamed back as it arrives
+            scanned = 0
+            gen = run_bounded(probe, hosts, max_workers=32)
+            try:
+                for ip, res, exc in gen:
+                    if self.tasks.is_cancelled(key):
+                        break
+                    scanned += 1
+                    alive, ssh = res if exc is None else (False, False)
+                    self.tasks.report(key, (scanned, ip, alive, ssh))
+            finally:
+                gen.close()
+
+        def on_progress(update):
+            scanned, ip, alive, ssh = update
+            progress.setValue(scanned)
             if not alive:
-                continue
-            ssh = tcp_check(ip, 22, 1.5)
-            row = {"ip": ip, "ping": alive, "ssh": ssh, "adopted": "", "site": "", "mac": "", "name": ""}
-            self.discovered.append(row)
-            r = self.table.rowCount()
-            self.table.insertRow(r)
-            self.table.setItem(r, 0, QtWidgets.QTableWidgetItem(ip))
-            self.table.setItem(r, 1, QtWidgets.QTableWidgetItem(""))  # name (filled via controller refresh)
-            self.table.setItem(r, 2, QtWidgets.QTableWidgetItem("yes" if alive else "no"))
-            self.table.setItem(r, 3, QtWidgets.QTableWidgetItem("open" if ssh else "closed"))
-            self.table.setItem(r, 4, QtWidgets.QTableWidgetItem(""))
-            self.table.setItem(r, 5, QtWidgets.QTableWidgetItem(""))
-            self.table.setItem(r, 6, QtWidgets.QTableWidgetItem(""))
-        progress.setValue(len(hosts))
-        # Try to map any already-known devices by IP and show adoption status
-        self._refresh_from_controller()
-        self._update_progress(f"Network scan complete. Found {self.table.rowCount()} device(s). Checking adoption status...", "info")
+                return
+            self.discovered.append({"ip": ip, "ping": alive, "ssh": ssh, "adopted": "", "site": "", "mac": "", "name": ""})
+            self._add_discovered_row(ip, "", "yes", "open" if ssh else "closed", "")
+
+        def finished(_=None):
+            progress.setValue(len(hosts))
+            self._update_progress(f"Network scan complete. Found {self.table.rowCount()} device(s). Checking adoption status...", "info")
+            # Try to map any already-known devices by IP and show adoption status
+            self._refresh_from_controller(then=then)
+
+        self.tasks.submit(key, sweep, on_result=finished, on_progress=on_progress,
+                          on_error=lambda e: finished())
 
     def _selected_ips(self):
         selrows = set(idx.row() for idx in self.table.selectedIndexes())
@@ -416,33 +483,43 @@ class WizardPage(QtWidgets.QWidget):
                 ips.append(it.text())
         return ips
 
-    def _refresh_from_controller(self):
-        # Get all sites to map device sites
-        try:
-            sites = self.ctrl.get_sites() or []
-            site_map = {}
-            for site in sites:
-                site_key = site.get("name") or site.get("site_name") or "default"
-                site_name = site.get("desc") or site.get("name") or site.get("site_name") or "default"
-                site_map[site_key] = site_name
-        except Exception:
-            site_map = {self.site_key: "Current Site"}
-        
-        # Check all sites for adopted devices
-        all_devices = {}
-        site_device_map = {}
-        
-        for site_key in site_map.keys():
+    def _refresh_from_controller(self, then=None):
+        current_site = self.site_key
+
+        def fetch():
+            # Get all sites to map device sites
             try:
-                devices = self.ctrl.get_devices(site_key)
-                for d in devices:
+                sites = self.ctrl.get_sites() or []
+                site_map = {}
+                for site in sites:
+                    site_key = site.get("name") or site.get("site_name") or "default"
+                    site_name = site.get("desc") or site.get("name") or site.get("site_name") or "default"
+                    site_map[site_key] = site_name
+            except Exception:
+                site_map = {current_site: "Current Site"}
+
+            # Check all sites for adopted devices, fetched concurrently
+            all_devices = {}
+            site_device_map = {}
+            for site_key, devices, exc in run_bounded(self.ctrl.get_device_records, list(site_map.keys())):
+                if exc is not None:
+                    continue
+                for d in devices or []:
                     ip = d.get("ip") or ""
                     if ip:
                         all_devices[ip] = d
                         site_device_map[ip] = site_key
-            except Exception:
-                continue
-        
+            return site_map, all_devices, site_device_map
+
+        def apply(result):
+            self._apply_controller_mapping(*result)
+            if then:
+                then()
+
+        self.tasks.submit("wizard:map", fetch, on_result=apply,
+                          on_error=lambda e: self._update_progress(f"Controller lookup failed: {e}", "error"), join=True)
+
+    def _apply_controller_mapping(self, site_map, all_devices, site_device_map):
         by_ip = all_devices
         
         # Track adopted devices for site selection
@@ -680,141 +757,174 @@ class WizardPage(QtWidgets.QWidget):
             return
         
         self._update_progress(f"Testing set-inform on {ip} using active site: {self.site_key}...", "info")
-        
+        site = self.site_key
+
+        def done(success):
+            if success:
+                self._update_progress(f"Set-inform test completed for {ip} in site {site}. Check the log for details.", "success")
+            else:
+                self._update_progress(f"Set-inform test failed for {ip} in site {site}. Check the log for details.", "error")
+
         # Test the set-inform command using active site
-        success = self.ctrl.ssh_set_inform(ip, site_key=self.site_key)
-        
-        if success:
-            self._update_progress(f"Set-inform test completed for {ip} in site {self.site_key}. Check the log for details.", "success")
-        else:
-            self._update_progress(f"Set-inform test failed for {ip} in site {self.site_key}. Check the log for details.", "error")
+        self.tasks.submit(f"set-inform:{ip}", self.ctrl.ssh_set_inform, ip, site_key=site, on_result=done,
+                          on_error=lambda e: self._update_progress(f"Set-inform test failed for {ip}: {e}", "error"))
 
     def _locate(self, enabled: bool):
         ips = self._selected_ips()
         if not ips:
             QtWidgets.QMessageBox.information(self, "Locate", "Select one or more rows first.")
             return
-        # Need MACs from controller mapping by IP
-        try:
-            devices = self.ctrl.get_devices(self.site_key)
-        except Exception as e:
-            QtWidgets.QMessageBox.warning(self, "Locate", f"Failed to fetch devices:\n{e}")
-            return
-        by_ip = { (d.get("ip") or ""): d for d in devices }
-        cnt = 0
-        for ip in ips:
-            d = by_ip.get(ip)
-            if not d:
-                continue
-            mac = d.get("mac") or ""
-            if mac and self.ctrl.set_locate(self.site_key, mac, enabled):
-                cnt += 1
-        QtWidgets.QMessageBox.information(self, "Locate", f"{'Enabled' if enabled else 'Disabled'} locate on {cnt} devices.")
+        site = self.site_key
+
+        def work():
+            # Need MACs from controller mapping by IP
+            devices = self.ctrl.get_devices(site)
+            by_ip = { (d.get("ip") or ""): d for d in devices }
+            macs = [by_ip[ip].get("mac") for ip in ips if ip in by_ip and by_ip[ip].get("mac")]
+            return self.ctrl.set_locate_many(site, macs, enabled)
+
+        def done(results):
+            cnt = sum(1 for v in results.values() if v)
+            QtWidgets.QMessageBox.information(self, "Locate", f"{'Enabled' if enabled else 'Disabled'} locate on {cnt} devices.")
+
+        self.tasks.submit(f"wizard:locate:{site}", work, on_result=done,
+                          on_error=lambda e: QtWidgets.QMessageBox.warning(self, "Locate", f"Failed to fetch devices:\n{e}"))
 
     def _setinform_and_adopt(self):
         ips = self._selected_ips()
         if not ips:
             self._update_progress("Error: No devices selected for adoption.", "error")
             return
+        site = self.site_key
+        key = f"wizard:adopt:{site}"
+        if self.tasks.is_running(key):
+            self._update_progress("An adoption run is already in progress.", "warning")
+            return
 
         self._update_progress(f"Starting adoption process for {len(ips)} device(s)...", "info")
+        # Poll quickly while devices are being adopted
+        self.scheduler.register("wizard-devices", self, "devices", site=lambda: site,
+                                fetch=lambda s: self.ctrl.get_device_records(s), apply=self._on_devices)
+        self.scheduler.boost("wizard-devices", 300)
 
         progress = QtWidgets.QProgressDialog("Setting inform & adopting…", "Cancel", 0, len(ips), self)
         progress.setWindowModality(QtCore.Qt.ApplicationModal)
         progress.setMinimumDuration(0)
+        progress.canceled.connect(lambda: self.tasks.cancel(key))
 
-        for i, ip in enumerate(ips, 1):
-            QtWidgets.QApplication.processEvents()
-            if progress.wasCanceled():
-                self._update_progress("Adoption process cancelled by user.", "warning")
-                break
-            
-            self._update_progress(f"Processing device {i}/{len(ips)}: {ip}", "info")
+        def say(i, message, status="info"):
+            self.tasks.report(key, (i, message, status))
+
+        def work():
+            found_devices = []
+            for i, ip in enumerate(ips, 1):
+                if self.tasks.is_cancelled(key):
+                    break
+                say(i, f"Processing device {i}/{len(ips)}: {ip}")
+
+                # 1) set-inform over SSH
+                say(i, f"Setting inform URL for {ip}...")
+                _ = self.ctrl.ssh_set_inform(ip, site_key=site)
+
+                # 2) poll controller for device by IP
+                say(i, f"Waiting for {ip} to appear in controller...")
+                found = self._wait_for_device(site, ip, key)
+                if not found:
+                    continue
+                mac = found.get("mac") or ""
+                say(i, f"Device {ip} found in controller (MAC: {mac})", "success")
+
+                # 3) adopt if present and unadopted
+                if not found.get("adopted"):
+                    say(i, f"Adopting device {ip}...")
+                    self.ctrl.adopt_device(site, mac)
+                    say(i, f"Device {ip} adoption initiated", "success")
+                else:
+                    say(i, f"Device {ip} is already adopted")
+                if mac:
+                    found_devices.append((ip, mac, found.get("model") or "AP"))
+            return found_devices
+
+        def on_progress(update):
+            i, message, status = update
             progress.setValue(i)
+            self._update_progress(message, status)
 
-            # 1) set-inform over SSH
-            self._update_progress(f"Setting inform URL for {ip}...", "info")
-            _ = self.ctrl.ssh_set_inform(ip, site_key=self.site_key)
+        def done(found_devices):
+            self.scheduler.unregister("wizard-devices")
+            progress.setValue(len(ips))
+            self._name_devices(site, list(found_devices))
 
-            # 2) poll controller for device by IP
-            self._update_progress(f"Waiting for {ip} to appear in controller...", "info")
-            mac = ""
-            found = None
-            for attempt in range(12):  # up to ~60s
-                try:
-                    devices = self.ctrl.get_devices(self.site_key)
-                except Exception:
-                    devices = []
-                match = None
-                for d in devices:
-                    if (d.get("ip") or "") == ip:
-                        match = d
-                        break
-                if match:
-                    found = match
-                    mac = match.get("mac") or ""
-                    self._update_progress(f"Device {ip} found in controller (MAC: {mac})", "success")
-                    break
-                QtWidgets.QApplication.processEvents()
-                time.sleep(5)
-
-            # 3) adopt if present and unadopted
-            if found and not found.get("adopted"):
-                self._update_progress(f"Adopting device {ip}...", "info")
-                self.ctrl.adopt_device(self.site_key, found.get("mac"))
-                self._update_progress(f"Device {ip} adoption initiated", "success")
-            elif found and found.get("adopted"):
-                self._update_progress(f"Device {ip} is already adopted", "info")
-
-            # 4) prompt alias (LED locate ON while naming)
-            if mac:
-                self._update_progress(f"Setting up device {ip} (turning on locate LED)...", "info")
-                self.ctrl.set_locate(self.site_key, mac, True)
-                try:
-                    model = found.get("model") or "AP"
-                except Exception:
-                    model = "AP"
-                alias, ok2 = QtWidgets.QInputDialog.getText(self, "Name AP", f"Enter name for {ip} ({model}):", text=model)
-                if ok2 and alias.strip():
-                    self.ctrl.set_alias(self.site_key, mac, alias.strip())
-                    self._update_progress(f"Device {ip} named: {alias.strip()}", "success")
-                self.ctrl.set_locate(self.site_key, mac, False)
-                self._update_progress(f"Device {ip} setup complete (locate LED off)", "success")
+        def failed(e):
+            self.scheduler.unregister("wizard-devices")
+            progress.close()
+            self._update_progress(f"Adoption process failed: {e}", "error")
+
+        self.tasks.submit(key, work, on_result=done, on_error=failed, on_progress=on_progress)
 
+    def _name_devices(self, site: str, queue):
+        """Prompt for a name for each adopted AP in turn, with its locate LED on while naming."""
+        if not queue:
             # Refresh displayed mapping
             self._refresh_from_controller()
+            self._update_progress("Device adoption process completed! Check the Devices tab for status.", "success")
+            return
+        ip, mac, model = queue.pop(0)
+
+        def prompt(_=None):
+            alias, ok2 = QtWidgets.QInputDialog.getText(self, "Name AP", f"Enter name for {ip} ({model}):", text=model)
+            alias = alias.strip() if ok2 else ""
+
+            def finish():
+                if alias:
+                    self.ctrl.set_alias(site, mac, alias)
+                self.ctrl.set_locate(site, mac, False)
+
+            def done(_=None):
+                if alias:
+                    self._update_progress(f"Device {ip} named: {alias}", "success")
+                self._update_progress(f"Device {ip} setup complete (locate LED off)", "success")
+                self._name_devices(site, queue)
+
+            self.tasks.submit(f"wizard:name:{mac}", finish, on_result=done, on_error=done)
 
-        progress.setValue(len(ips))
-        self._update_progress("Device adoption process completed! Check the Devices tab for status.", "success")
+        # 4) prompt alias (LED locate ON while naming)
+        self._update_progress(f"Setting up device {ip} (turning on locate LED)...", "info")
+        self.tasks.submit(f"wizard:name:{mac}", self.ctrl.set_locate, site, mac, True, on_result=prompt, on_error=prompt)
 
     def _auto_discover_and_adopt(self):
         self._update_progress("Scanning for UniFi devices on local network...", "info")
-        
-        # Run UBNT discovery first; fallback to local scan if empty
-        try:
-            self._discover_ubnt()
-            if self.table.rowCount() > 0:
-                self._update_progress(f"Found {self.table.rowCount()} device(s) via UBNT discovery", "success")
-            else:
-                self._update_progress("No devices found via UBNT discovery, trying network scan...", "warning")
-        except Exception as e:
-            self._update_progress(f"UBNT discovery failed: {str(e)}", "warning")
-        
-        if self.table.rowCount() == 0 and self.current_cidr:
-            self._update_progress(f"Scanning network range: {self.current_cidr}", "info")
-            self._discover_cidr(self.current_cidr)
+
+        def after_scan():
             if self.table.rowCount() > 0:
                 self._update_progress(f"Found {self.table.rowCount()} device(s) via network scan", "success")
             else:
                 self._update_progress("No devices found on local network", "warning")
-        
-        if self.table.rowCount() == 0:
-            self._update_progress("No devices found. Please check your network connection and try manual discovery.", "error")
-            return
-        
-        # Select all rows and run the same pipeline
-        self._update_progress("Selecting all discovered devices...", "info")
-        self.table.selectAll()
-        
-        self._update_progress("Starting device adoption process...", "info")
-        self._setinform_and_adopt()
+            adopt_all()
+
+        def after_ubnt():
+            if self.table.rowCount() > 0:
+                self._update_progress(f"Found {self.table.rowCount()} device(s) via UBNT discovery", "success")
+                adopt_all()
+            elif self.current_cidr:
+                self._update_progress("No devices found via UBNT discovery, trying network scan...", "warning")
+                self._update_progress(f"Scanning network range: {self.current_cidr}", "info")
+                self._discover_cidr(self.current_cidr, then=after_scan)
+            else:
+                self._update_progress("No devices found via UBNT discovery, trying network scan...", "warning")
+                adopt_all()
+
+        def adopt_all():
+            if self.table.rowCount() == 0:
+                self._update_progress("No devices found. Please check your network connection and try manual discovery.", "error")
+                return
+            
+            # Select all rows and run the same pipeline
+            self._update_progress("Selecting all discovered devices...", "info")
+            self.table.selectAll()
+            
+            self._update_progress("Starting device adoption process...", "info")
+            self._setinform_and_adopt()
+
+        # Run UBNT discovery first; fallback to local scan if empty
+        self._discover_ubnt(then=after_ubnt)
@@ -0,0 +1,16 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from innovative_unifi.core.logger_bus import LogBus, DEBUG
+from innovative_unifi.core.projection import DeviceProjector
+from innovative_unifi.ui.devices_view import view_logger
+
+
+def test_projector_logs_through_view_logger():
+    bus = LogBus()
+    projector = DeviceProjector(view_logger(bus))
+    # No capability entry for this model, so the projector logs while deriving
+    rec = projector.project({"mac": "aa", "model": "U6-Pro", "type": "uap", "uplink": {"speed": 100}})
+    assert rec is not None
+    assert any(r[2] == DEBUG for r in bus.records_since(0))